@@ -1,16 +1,54 @@
 """Entity Manager Integration."""
 import logging
+from typing import Any
+
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.components import frontend
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 
-from .websocket_api import async_setup_ws_api
-from .voice_assistant import async_setup_intents
+from .auto_disable import AutoDisabler
+from .change_log import ChangeLog
+from .concurrency import MutationQueue, MutationRejected, SharedReads
+from .const import (
+    DATA_AUTO_DISABLE,
+    DATA_CHANGE_LOG,
+    DATA_DEVICES,
+    DATA_FOOTPRINT,
+    DATA_INDEX,
+    DATA_JOBS,
+    DATA_JOURNAL,
+    DATA_METRICS,
+    DATA_MUTATIONS,
+    DATA_NAMES,
+    DATA_PROFILER,
+    DATA_READS,
+    DATA_SCHEDULER,
+    DATA_SEARCH,
+    DATA_STARTUP,
+    DOMAIN,
+)
+from .device_lookup import DeviceLookup
+from .entity_index import EntityIndex
+from .footprint import RecorderFootprint
+from .journal import OperationJournal
+from .metrics import Metrics, metered_service
+from .name_index import NameIndex
+from .profiler import StateChangeProfiler
+from .scheduler import ReenableScheduler
+from .search import SearchIndex
+from .startup import StagedStartup, async_ready
+from .transaction import RegistryTransaction
+from .websocket_api import async_setup_ws_api, async_stop_jobs
+from .voice_assistant import async_setup_intents, async_unload_intents
 
 _LOGGER = logging.getLogger(__name__)
 
-DOMAIN = "entity_manager"
+PLATFORMS = [Platform.SENSOR]
 
 SERVICE_ENABLE_ENTITY = "enable_entity"
 SERVICE_DISABLE_ENTITY = "disable_entity"
@@ -24,53 +62,141 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Entity Manager from a config entry."""
-    
-    # Register WebSocket API
+    # Setup only creates the structures and registers the handlers; the
+    # indexes are built and the stores read once Home Assistant has started
+    startup = StagedStartup(hass, entry)
+    entry.async_on_unload(startup.async_stop)
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][DATA_STARTUP] = startup
+    hass.data[DOMAIN][DATA_METRICS] = Metrics()
+
+    # The entity index is kept current from registry events once built
+    index = EntityIndex(hass)
+    startup.async_add_stage(DATA_INDEX, index.async_build, index.async_listen)
+    hass.data[DOMAIN][DATA_INDEX] = index
+
+    devices = DeviceLookup(hass)
+    startup.async_add_stage(DATA_DEVICES, devices.async_build, devices.async_listen)
+    hass.data[DOMAIN][DATA_DEVICES] = devices
+
+    # Revision the listings are stamped with; listens before any subscription
+    changes = ChangeLog(index, devices)
+    startup.async_add_stage(
+        DATA_CHANGE_LOG, changes.async_listen, after=(DATA_INDEX, DATA_DEVICES)
+    )
+    hass.data[DOMAIN][DATA_CHANGE_LOG] = changes
+
+    # Identical listings are computed once per registry state; websocket
+    # mutations run one at a time
+    hass.data[DOMAIN][DATA_READS] = SharedReads(
+        lambda: (index.version, devices.version, changes.revision)
+    )
+    hass.data[DOMAIN][DATA_MUTATIONS] = MutationQueue()
+
+    search = SearchIndex(hass, index, devices)
+    startup.async_add_stage(
+        DATA_SEARCH, search.async_build, search.async_listen, after=(DATA_INDEX, DATA_DEVICES)
+    )
+    hass.data[DOMAIN][DATA_SEARCH] = search
+
+    # Spoken names of the voice intents
+    names = NameIndex(hass, index, devices)
+    startup.async_add_stage(
+        DATA_NAMES, names.async_build, names.async_listen, after=(DATA_INDEX, DATA_DEVICES)
+    )
+    hass.data[DOMAIN][DATA_NAMES] = names
+
+    # Changes made through Entity Manager, kept for undo across restarts
+    journal = OperationJournal(hass)
+    startup.async_add_stage(DATA_JOURNAL, journal.async_load)
+    hass.data[DOMAIN][DATA_JOURNAL] = journal
+
+    # Re-enables of timed disables, persisted across restarts; the timer is
+    # armed once the index it re-enables through is built
+    scheduler = ReenableScheduler(hass, index, hass.data[DOMAIN][DATA_MUTATIONS])
+    startup.async_add_stage(
+        DATA_SCHEDULER,
+        scheduler.async_load,
+        scheduler.async_listen,
+        scheduler.async_start,
+        after=(DATA_INDEX,),
+    )
+    hass.data[DOMAIN][DATA_SCHEDULER] = scheduler
+
+    # Opt-in counting of state changes per entity
+    profiler = StateChangeProfiler(hass)
+    entry.async_on_unload(profiler.async_stop)
+    startup.async_add_stage(DATA_PROFILER, profiler.async_load)
+    hass.data[DOMAIN][DATA_PROFILER] = profiler
+
+    # Recorder database usage per entity, measured on request
+    hass.data[DOMAIN][DATA_FOOTPRINT] = RecorderFootprint(hass)
+
+    # Streamed bulk jobs, exports and imports, stopped on unload
+    hass.data[DOMAIN][DATA_JOBS] = set()
+
+    # New entities matching the rules stored in the options are disabled as
+    # they register; listens from setup on, as most entities are created then
+    auto_disable = AutoDisabler(
+        hass, entry, index, hass.data[DOMAIN][DATA_MUTATIONS], journal
+    )
+    entry.async_on_unload(auto_disable.async_listen())
+    hass.data[DOMAIN][DATA_AUTO_DISABLE] = auto_disable
+
+    # Register WebSocket API; commands stay registered after an unload and
+    # answer not_ready until the entry is set up again
     async_setup_ws_api(hass)
 
     # Set up voice assistant intents
     await async_setup_intents(hass)
 
-    # Register services
-    entity_reg = er.async_get(hass)
-
+    # Register services; their changes are queued and journaled like those
+    # of the websocket commands
     async def handle_enable_entity(call):
         """Handle enable entity service call."""
         entity_id = call.data.get("entity_id")
-        if entity_id:
-            try:
-                entity_reg.async_update_entity(entity_id, disabled_by=None)
-                _LOGGER.info("Enabled entity: %s", entity_id)
-            except ValueError as err:
-                _LOGGER.error("Failed to enable entity %s: %s", entity_id, err)
-            except Exception as err:
-                _LOGGER.error("Unexpected error enabling entity %s: %s", entity_id, err)
+        if entity_id and await _async_update_entity(hass, call, entity_id, disabled_by=None):
+            _LOGGER.info("Enabled entity: %s", entity_id)
 
     async def handle_disable_entity(call):
-        """Handle disable entity service call."""
+        """Handle disable entity service call.
+
+        With a duration, the entity is re-enabled once it has passed.
+        """
         entity_id = call.data.get("entity_id")
         if entity_id:
             try:
-                entity_reg.async_update_entity(
-                    entity_id, 
-                    disabled_by=er.RegistryEntryDisabler.USER
+                duration = call.data.get("duration")
+                reenable_at = (
+                    dt_util.utcnow() + cv.positive_time_period(duration)
+                    if duration is not None
+                    else None
                 )
-                _LOGGER.info("Disabled entity: %s", entity_id)
-            except ValueError as err:
-                _LOGGER.error("Failed to disable entity %s: %s", entity_id, err)
-            except Exception as err:
-                _LOGGER.error("Unexpected error disabling entity %s: %s", entity_id, err)
+            except vol.Invalid as err:
+                _LOGGER.error("Invalid duration for disabling %s: %s", entity_id, err)
+                return
+            if not await _async_update_entity(
+                hass, call, entity_id, disabled_by=er.RegistryEntryDisabler.USER
+            ):
+                return
+            _LOGGER.info("Disabled entity: %s", entity_id)
+            await async_ready(hass, f"{call.domain}.{call.service}", DATA_SCHEDULER)
+            scheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+            if reenable_at is None:
+                scheduler.async_cancel([entity_id])
+            else:
+                scheduler.async_schedule([entity_id], reenable_at)
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_ENABLE_ENTITY,
-        handle_enable_entity,
+        metered_service(hass, handle_enable_entity),
     )
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_DISABLE_ENTITY,
-        handle_disable_entity,
+        metered_service(hass, handle_disable_entity),
     )
 
     async def handle_rename_entity(call):
@@ -79,24 +205,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         name = call.data.get("name")
         new_entity_id = call.data.get("new_entity_id")
         if entity_id:
-            try:
-                kwargs = {}
-                if name is not None:
-                    kwargs["name"] = name
-                if new_entity_id is not None:
-                    kwargs["new_entity_id"] = new_entity_id
-                if kwargs:
-                    entity_reg.async_update_entity(entity_id, **kwargs)
-                    _LOGGER.info("Renamed entity %s: %s", entity_id, kwargs)
-            except ValueError as err:
-                _LOGGER.error("Failed to rename entity %s: %s", entity_id, err)
-            except Exception as err:
-                _LOGGER.error("Unexpected error renaming entity %s: %s", entity_id, err)
+            kwargs = {}
+            if name is not None:
+                kwargs["name"] = name
+            if new_entity_id is not None:
+                kwargs["new_entity_id"] = new_entity_id
+            if kwargs and await _async_update_entity(hass, call, entity_id, **kwargs):
+                _LOGGER.info("Renamed entity %s: %s", entity_id, kwargs)
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_RENAME_ENTITY,
-        handle_rename_entity,
+        metered_service(hass, handle_rename_entity),
     )
 
     # Register the sidebar panel
@@ -118,11 +238,70 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     _LOGGER.info("Entity Manager panel registered")
-    
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    startup.async_setup_done()
+    return True
+
+
+async def _async_update_entity(
+    hass: HomeAssistant, call: ServiceCall, entity_id: str, **changes: Any
+) -> bool:
+    """Apply a service call's change through the mutation queue and journal it.
+
+    Returns whether it was applied; failures are logged.
+    """
+    await async_ready(hass, f"{call.domain}.{call.service}", DATA_JOURNAL)
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    transaction = RegistryTransaction(hass, hold_notifications=index.async_hold)
+    transaction.async_update(entity_id, **changes)
+    mutations: MutationQueue = hass.data[DOMAIN][DATA_MUTATIONS]
+    try:
+        results = await mutations.async_run(
+            {entity_id, changes.get("new_entity_id", entity_id)}, transaction.async_commit
+        )
+    except MutationRejected as err:
+        _LOGGER.error("Cannot %s %s: %s", call.service, entity_id, err)
+        return False
+    journal: OperationJournal = hass.data[DOMAIN][DATA_JOURNAL]
+    journal.async_record(f"{call.domain}.{call.service}", results["success"])
+    if results["failed"]:
+        _LOGGER.error(
+            "Failed to %s %s: %s", call.service, entity_id, results["failed"][0]["error"]
+        )
+        return False
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry."""
+    """Unload a config entry.
+
+    Services and intents are removed; running jobs are stopped before the
+    data they use is dropped.
+    """
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
     frontend.async_remove_panel(hass, DOMAIN)
+    for service in (SERVICE_ENABLE_ENTITY, SERVICE_DISABLE_ENTITY, SERVICE_RENAME_ENTITY):
+        hass.services.async_remove(DOMAIN, service)
+    async_unload_intents(hass)
+    await async_stop_jobs(hass)
+    for key in (
+        DATA_INDEX,
+        DATA_DEVICES,
+        DATA_CHANGE_LOG,
+        DATA_READS,
+        DATA_MUTATIONS,
+        DATA_JOURNAL,
+        DATA_SCHEDULER,
+        DATA_SEARCH,
+        DATA_NAMES,
+        DATA_PROFILER,
+        DATA_FOOTPRINT,
+        DATA_AUTO_DISABLE,
+        DATA_JOBS,
+        DATA_METRICS,
+        DATA_STARTUP,
+    ):
+        hass.data.get(DOMAIN, {}).pop(key, None)
     return True
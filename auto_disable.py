@@ -0,0 +1,336 @@
+"""Rules disabling new entities as they are registered, for Entity Manager."""
+import fnmatch
+import logging
+import re
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from functools import partial
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+
+from .concurrency import MutationQueue, MutationRejected
+from .const import CONF_AUTO_DISABLE_RULES, DATA_JOURNAL
+from .entity_index import EntityIndex
+from .journal import OperationJournal
+from .startup import async_ready
+from .transaction import RegistryTransaction
+
+_LOGGER = logging.getLogger(__name__)
+
+# Conditions of a rule; a rule matches when all of its conditions do
+RULE_FIELDS = ("entity_id", "entity_id_regex", "platform", "domain", "entity_category", "model")
+
+# Seconds the first state of a new entity is waited for
+ADD_TIMEOUT = 60
+
+# Journaled operation of the entities disabled as they were created
+JOURNAL_COMMAND = "auto_disable"
+
+
+def _has_condition(rule: dict[str, Any]) -> dict[str, Any]:
+    """Reject rules without conditions, which would match every entity."""
+    if not any(rule.get(field) for field in RULE_FIELDS):
+        raise vol.Invalid(f"A rule needs at least one of {', '.join(RULE_FIELDS)}")
+    return rule
+
+
+RULE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional("entity_id"): str,
+            vol.Optional("entity_id_regex"): str,
+            vol.Optional("platform"): str,
+            vol.Optional("domain"): str,
+            vol.Optional("entity_category"): vol.In(
+                [category.value for category in EntityCategory]
+            ),
+            vol.Optional("model"): str,
+        }
+    ),
+    _has_condition,
+)
+
+# (rule position, entity_id pattern, model pattern) of a compiled rule
+CompiledRule = tuple[int, re.Pattern[str] | None, re.Pattern[str] | None]
+
+# (platform, domain, entity_category); None matches any value
+BucketKey = tuple[str | None, str | None, str | None]
+
+
+class AutoDisableRuleError(ValueError):
+    """Raised when an auto-disable rule cannot be compiled."""
+
+
+class RuleMatcher:
+    """Auto-disable rules compiled into one matcher.
+
+    Rules are bucketed by their platform, domain and entity_category
+    conditions, so an entity is only tested against the rules of the few
+    buckets its own values select: one dict lookup per combination of
+    conditions the rules use, usually finding nothing. Only the rules found
+    run their entity_id glob or regex, and the device model is only looked
+    up for rules with a model condition. The first matching rule wins.
+    """
+
+    def __init__(self, rules: list[dict[str, Any]]) -> None:
+        """Compile rules."""
+        self.rules = rules
+        self._buckets: dict[BucketKey, list[CompiledRule]] = {}
+        shapes: set[tuple[bool, bool, bool]] = set()
+        for position, rule in enumerate(rules):
+            key = (
+                rule.get("platform") or None,
+                rule.get("domain") or None,
+                rule.get("entity_category") or None,
+            )
+            shapes.add(tuple(value is not None for value in key))
+            self._buckets.setdefault(key, []).append(
+                (position, _entity_id_pattern(rule), _model_pattern(rule))
+            )
+        self._shapes = sorted(shapes)
+
+    def __bool__(self) -> bool:
+        """Return whether there are rules."""
+        return bool(self.rules)
+
+    def match(
+        self,
+        entity_id: str,
+        platform: str | None,
+        entity_category: str | None,
+        model: Callable[[], str | None],
+    ) -> int | None:
+        """Return the position of the first rule an entity matches, if any."""
+        domain = entity_id.partition(".")[0]
+        found: int | None = None
+        for has_platform, has_domain, has_category in self._shapes:
+            bucket = self._buckets.get(
+                (
+                    platform if has_platform else None,
+                    domain if has_domain else None,
+                    entity_category if has_category else None,
+                )
+            )
+            if bucket is None:
+                continue
+            for position, entity_id_pattern, model_pattern in bucket:
+                if found is not None and position > found:
+                    break
+                if entity_id_pattern is not None and not entity_id_pattern.search(entity_id):
+                    continue
+                if model_pattern is not None and not model_pattern.fullmatch(model() or ""):
+                    continue
+                found = position
+                break
+        return found
+
+
+def _entity_id_pattern(rule: dict[str, Any]) -> re.Pattern[str] | None:
+    """Return the pattern of a rule's entity_id glob or regex."""
+    try:
+        if rule.get("entity_id_regex"):
+            if rule.get("entity_id"):
+                raise AutoDisableRuleError("Use either entity_id or entity_id_regex, not both")
+            return re.compile(rule["entity_id_regex"])
+        if rule.get("entity_id"):
+            return re.compile(fnmatch.translate(rule["entity_id"]))
+    except re.error as err:
+        raise AutoDisableRuleError(f"Invalid entity_id_regex: {err}") from err
+    return None
+
+
+def _model_pattern(rule: dict[str, Any]) -> re.Pattern[str] | None:
+    """Return the case-insensitive pattern of a rule's device model glob."""
+    if not rule.get("model"):
+        return None
+    return re.compile(fnmatch.translate(rule["model"]), re.IGNORECASE)
+
+
+class AutoDisabler:
+    """Disables new entities matching the auto-disable rules of the config entry.
+
+    Entity registry create events are checked against the compiled rules
+    as they are fired. The matching entries created in one event loop
+    iteration are disabled on the next, usually before their platform has
+    added the entities, in one transaction through the mutation queue, and
+    journaled as one operation that entity_manager/undo can revert. An
+    entity the platform was already adding with the entry it held misses
+    that update and is removed from its platform on its first state; the
+    others see the update and remove themselves. Entries created disabled
+    are left alone.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        index: EntityIndex,
+        mutations: MutationQueue,
+        journal: OperationJournal,
+    ) -> None:
+        """Compile the stored rules."""
+        self.hass = hass
+        self.entry = entry
+        self.index = index
+        self.mutations = mutations
+        self.journal = journal
+        try:
+            self.matcher = RuleMatcher(list(entry.options.get(CONF_AUTO_DISABLE_RULES, [])))
+        except AutoDisableRuleError as err:
+            _LOGGER.error("Ignoring the stored auto-disable rules: %s", err)
+            self.matcher = RuleMatcher([])
+        self.disabled = 0
+        self._queued: list[str] = []
+        self._pending: dict[str, list[CALLBACK_TYPE]] = {}
+
+    @callback
+    def async_set_rules(self, rules: list[dict[str, Any]]) -> None:
+        """Compile rules and store them in the config entry."""
+        self.matcher = RuleMatcher(rules)
+        self.hass.config_entries.async_update_entry(
+            self.entry, options={**self.entry.options, CONF_AUTO_DISABLE_RULES: rules}
+        )
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Check created entities; return the unsubscribe."""
+        unsub = self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_create
+        )
+
+        @callback
+        def unsubscribe() -> None:
+            unsub()
+            for entity_id in list(self._pending):
+                self._async_forget(entity_id)
+
+        return unsubscribe
+
+    @callback
+    def async_matching(
+        self, matcher: RuleMatcher, entries: Iterable[er.RegistryEntry]
+    ) -> list[tuple[str, int]]:
+        """Return the (entity_id, rule position) of the enabled entries a matcher matches."""
+        device_registry = dr.async_get(self.hass)
+        matches: list[tuple[str, int]] = []
+        for entity in entries:
+            if entity.disabled:
+                continue
+            if (rule := _async_match(matcher, device_registry, entity)) is not None:
+                matches.append((entity.entity_id, rule))
+        return matches
+
+    @callback
+    def _async_handle_create(self, event: Event) -> None:
+        """Queue a created entity matching a rule for disabling."""
+        if event.data["action"] != "create" or not self.matcher:
+            return
+        entity_id = event.data["entity_id"]
+        entity = er.async_get(self.hass).async_get(entity_id)
+        if entity is None or entity.disabled:
+            return
+        if (rule := _async_match(self.matcher, dr.async_get(self.hass), entity)) is None:
+            return
+        _LOGGER.debug("New entity %s matches auto-disable rule %s", entity_id, rule)
+        self._pending[entity_id] = [
+            async_track_state_change_event(self.hass, [entity_id], self._async_handle_added),
+            async_call_later(
+                self.hass, ADD_TIMEOUT, partial(self._async_handle_timeout, entity_id)
+            ),
+        ]
+        self._queued.append(entity_id)
+        if len(self._queued) == 1:
+            self.entry.async_create_background_task(
+                self.hass, self._async_disable_queued(), "entity_manager auto-disable"
+            )
+
+    async def _async_disable_queued(self) -> None:
+        """Disable the queued entities that are still enabled, and journal them."""
+        entity_registry = er.async_get(self.hass)
+        entity_ids = [
+            entity_id
+            for entity_id in self._queued
+            if (entity := entity_registry.async_get(entity_id)) is not None
+            and not entity.disabled
+        ]
+        self._queued = []
+        if not entity_ids:
+            return
+        transaction = RegistryTransaction(self.hass, hold_notifications=self.index.async_hold)
+        for entity_id in entity_ids:
+            transaction.async_update(entity_id, disabled_by=er.RegistryEntryDisabler.USER)
+        try:
+            results = await self.mutations.async_run(entity_ids, transaction.async_commit)
+        except MutationRejected as err:
+            _LOGGER.warning("Cannot auto-disable %s: %s", ", ".join(entity_ids), err)
+            return
+        for failure in results["failed"]:
+            _LOGGER.error("Failed to auto-disable %s: %s", failure["entity_id"], failure["error"])
+        self.disabled += len(results["success"])
+        for record in results["success"]:
+            _LOGGER.info("Disabled new entity %s by auto-disable rule", record["entity_id"])
+        await async_ready(self.hass, JOURNAL_COMMAND, DATA_JOURNAL)
+        self.journal.async_record(JOURNAL_COMMAND, results["success"])
+
+    @callback
+    def _async_handle_added(self, event: Event) -> None:
+        """Remove a pending entity added with the registry entry it had before it was disabled."""
+        if (new_state := event.data["new_state"]) is None:
+            return
+        entity_id = new_state.entity_id
+        self._async_forget(entity_id)
+        entity = er.async_get(self.hass).async_get(entity_id)
+        if entity is None or not entity.disabled:
+            # Not disabled yet; the entity sees the update and removes itself
+            return
+        self.entry.async_create_background_task(
+            self.hass,
+            _async_remove_stale(self.hass, entity.platform, entity_id),
+            f"entity_manager auto-disable remove {entity_id}",
+        )
+
+    @callback
+    def _async_handle_timeout(self, entity_id: str, _now: datetime) -> None:
+        """Stop waiting for an entity that was not added in time."""
+        self._async_forget(entity_id)
+
+    @callback
+    def _async_forget(self, entity_id: str) -> None:
+        """Stop waiting for a pending entity."""
+        for unsub in self._pending.pop(entity_id, ()):
+            unsub()
+
+
+async def _async_remove_stale(hass: HomeAssistant, platform_name: str, entity_id: str) -> None:
+    """Remove a running entity whose registry entry was disabled before it listened."""
+    for platform in entity_platform.async_get_platforms(hass, platform_name):
+        entity = platform.entities.get(entity_id)
+        if entity is None or (entity.registry_entry and entity.registry_entry.disabled):
+            continue
+        await platform.async_remove_entity(entity_id)
+
+
+@callback
+def _async_match(
+    matcher: RuleMatcher, device_registry: dr.DeviceRegistry, entity: er.RegistryEntry
+) -> int | None:
+    """Return the first rule a registry entry matches, looking its model up if needed."""
+
+    def model() -> str | None:
+        device = device_registry.async_get(entity.device_id) if entity.device_id else None
+        return device.model if device else None
+
+    return matcher.match(
+        entity.entity_id,
+        entity.platform,
+        entity.entity_category.value if entity.entity_category else None,
+        model,
+    )
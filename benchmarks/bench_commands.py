@@ -0,0 +1,468 @@
+"""Benchmark Entity Manager websocket commands and services on synthetic registries.
+
+Builds registries of each size with synthetic_registry, then times every
+command against a real Home Assistant core (requires the homeassistant
+package):
+
+    python benchmarks/bench_commands.py [--sizes 1000,10000,50000,200000]
+        [--output bench_commands.json] [--compare previous.json]
+
+Each command reports p50/p99 latency, peak Python memory of one run
+(tracemalloc) and the JSON payload size of its response. Results are
+written as JSON; with --compare, p50 latencies are checked against an
+earlier results file and the exit status is 1 if any regressed by more
+than --threshold.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from importlib import import_module
+from typing import Any
+
+from homeassistant import const as ha_const
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+
+from synthetic_registry import (
+    REPO_ROOT,
+    async_make_hass,
+    load_custom_component,
+    load_integration,
+    populate,
+)
+
+DEFAULT_SIZES = "1000,10000,50000,200000"
+DEFAULT_BATCH = 1000
+
+
+class RecordingConnection:
+    """Stand-in websocket connection that keeps what a handler sends."""
+
+    def __init__(self) -> None:
+        """Initialize an empty connection."""
+        self.messages: list[Any] = []
+        self.subscriptions: dict[int, Callable[[], None]] = {}
+
+    def send_result(self, msg_id: int, result: Any = None) -> None:
+        """Record a result."""
+        self.messages.append(result)
+
+    def send_message(self, message: Any) -> None:
+        """Record a subscription event."""
+        self.messages.append(message)
+
+    def send_error(self, msg_id: int, code: str, message: str) -> None:
+        """Fail the benchmark; commands are only called with valid input."""
+        raise RuntimeError(f"{code}: {message}")
+
+
+async def async_command(hass: HomeAssistant, handler: Callable, **fields: Any) -> int:
+    """Run a websocket command handler; return the JSON size of what it sent."""
+    connection = RecordingConnection()
+    # pylint: disable-next=protected-access
+    msg = handler._ws_schema({"id": 1, "type": handler._ws_command, **fields})
+    result = inspect.unwrap(handler)(hass, connection, msg)
+    if inspect.isawaitable(result):
+        await result
+    for unsubscribe in connection.subscriptions.values():
+        unsubscribe()
+    # Shared listings are sent as serialized messages
+    return sum(
+        len(message if isinstance(message, bytes) else json_bytes(message))
+        for message in connection.messages
+    )
+
+
+def _revision() -> str | None:
+    """Return the git revision of the repository, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentile(samples: list[float], quantile: float) -> float:
+    """Return the nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(quantile * len(ordered)) - 1))]
+
+
+def _repeats(size: int, requested: int) -> int:
+    """Scale the repetitions down for large registries."""
+    return max(3, min(requested, requested * 10_000 // size))
+
+
+class Case:
+    """A timed command call with untimed steps that prepare and undo its changes."""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[int]],
+        restore: Callable[[], Awaitable[None]] | None = None,
+        setup: Callable[[], Awaitable[Any]] | None = None,
+    ) -> None:
+        """Initialize the case; run returns the payload size in bytes."""
+        self.name = name
+        self.run = run
+        self.restore = restore
+        self.setup = setup
+
+    async def async_measure(self, hass: HomeAssistant, repeats: int) -> dict[str, float]:
+        """Time the case and measure the memory of one more run."""
+        samples: list[float] = []
+        payload = 0
+        for _ in range(repeats):
+            await self._async_prepare(hass)
+            start = time.perf_counter()
+            payload = await self.run()
+            samples.append((time.perf_counter() - start) * 1000)
+            await self._async_settle(hass)
+
+        await self._async_prepare(hass)
+        tracemalloc.start()
+        await self.run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        await self._async_settle(hass)
+
+        return {
+            "runs": repeats,
+            "p50_ms": round(_percentile(samples, 0.5), 3),
+            "p99_ms": round(_percentile(samples, 0.99), 3),
+            "max_ms": round(max(samples), 3),
+            "peak_kib": round(peak / 1024, 1),
+            "payload_bytes": payload,
+        }
+
+    async def _async_prepare(self, hass: HomeAssistant) -> None:
+        """Apply the changes the run depends on."""
+        if self.setup is not None:
+            await self.setup()
+            await hass.async_block_till_done()
+
+    async def _async_settle(self, hass: HomeAssistant) -> None:
+        """Let listeners catch up and undo the run."""
+        await hass.async_block_till_done()
+        if self.restore is not None:
+            await self.restore()
+            await hass.async_block_till_done()
+
+
+def build_cases(hass: HomeAssistant, batch: int) -> list[Case]:
+    """Return the benchmark cases for a populated registry."""
+    const = import_module("entity_manager.const")
+    websocket_api = import_module("entity_manager.websocket_api")
+    entity_reg = er.async_get(hass)
+    entries = sorted(entity_reg.entities.values(), key=lambda entry: entry.entity_id)
+
+    enabled = [entry.entity_id for entry in entries if not entry.disabled][:batch]
+    disabled = [entry.entity_id for entry in entries if entry.disabled][:batch]
+    temperature_names = [
+        entry.entity_id
+        for entry in entries
+        if entry.name is None and entry.original_name == "Temperature"
+    ][:batch]
+    temperature_ids = [
+        entry.entity_id for entry in entries if "_temperature_" in entry.entity_id
+    ][:batch]
+    swaps = [entry.entity_id for entry in entries if entry.domain == "sensor"][: batch - batch % 2]
+
+    scoped = {handler._ws_command: handler for handler in websocket_api.SCOPED_COMMANDS}
+    device_id = next(entry.device_id for entry in entries if entry.device_id)
+
+    def command(handler: Callable, **fields: Any) -> Callable[[], Awaitable[int]]:
+        return lambda: async_command(hass, handler, **fields)
+
+    async def resolve(spoken: str) -> int:
+        hass.data[const.DOMAIN][const.DATA_NAMES].async_resolve(spoken)
+        return 0
+
+    async def forget_reads() -> None:
+        # Time listings as computed, not as served to the next identical read
+        hass.data[const.DOMAIN][const.DATA_READS].async_clear()
+
+    def set_disabled_by(
+        entity_ids: list[str], disabled_by: er.RegistryEntryDisabler | None
+    ) -> Callable[[], Awaitable[None]]:
+        async def restore() -> None:
+            for entity_id in entity_ids:
+                entity_reg.async_update_entity(entity_id, disabled_by=disabled_by)
+
+        return restore
+
+    async def restore_names() -> None:
+        for entity_id in temperature_names:
+            entity_reg.async_update_entity(entity_id, name=None)
+
+    async def restore_entity_ids() -> None:
+        for entity_id in temperature_ids:
+            entity_reg.async_update_entity(
+                entity_id.replace("_temperature_", "_temp_"), new_entity_id=entity_id
+            )
+
+    async def swap_service() -> int:
+        renames = [
+            {"entity_id": swaps[i], "new_entity_id": swaps[i + 1 - 2 * (i % 2)]}
+            for i in range(len(swaps))
+        ]
+        await hass.services.async_call(
+            "entity_manager", "bulk_rename", {"renames": renames}, blocking=True
+        )
+        return 0
+
+    return [
+        Case(
+            "get_disabled_entities[disabled]",
+            command(websocket_api.handle_get_disabled_entities, state="disabled"),
+            forget_reads,
+        ),
+        Case(
+            "get_disabled_entities[all]",
+            command(websocket_api.handle_get_disabled_entities, state="all"),
+            forget_reads,
+        ),
+        Case(
+            "get_disabled_entities[all, compact]",
+            command(websocket_api.handle_get_disabled_entities, state="all", format="compact"),
+            forget_reads,
+        ),
+        Case(
+            "get_disabled_entities[all, shared]",
+            command(websocket_api.handle_get_disabled_entities, state="all"),
+        ),
+        Case(
+            "subscribe[snapshot]",
+            command(websocket_api.handle_subscribe, state="all"),
+            forget_reads,
+        ),
+        Case(
+            "subscribe[snapshot, compact]",
+            command(websocket_api.handle_subscribe, state="all", format="compact"),
+            forget_reads,
+        ),
+        Case("list_entities[page]", command(websocket_api.handle_list_entities, state="all")),
+        Case(
+            "by_integration[hue]",
+            command(scoped["entity_manager/by_integration"], integration="hue"),
+        ),
+        Case(
+            "by_device",
+            command(scoped["entity_manager/by_device"], device_id=device_id),
+        ),
+        Case("by_area[kitchen]", command(scoped["entity_manager/by_area"], area_id="kitchen")),
+        Case(
+            "search[two words]",
+            command(websocket_api.handle_search, query="kitchen temperature"),
+        ),
+        Case("search[platform]", command(websocket_api.handle_search, query="zha")),
+        Case("resolve_name[exact]", lambda: resolve("kitchen temperature")),
+        Case("resolve_name[typo]", lambda: resolve("kitchn temprature")),
+        Case(
+            "bulk_disable",
+            command(websocket_api.handle_bulk_disable, entity_ids=enabled),
+            set_disabled_by(enabled, None),
+        ),
+        # Reverts a bulk_disable of the same entities
+        Case(
+            "undo[bulk_disable]",
+            command(websocket_api.handle_undo),
+            setup=command(websocket_api.handle_bulk_disable, entity_ids=enabled),
+        ),
+        Case(
+            "bulk_enable",
+            command(websocket_api.handle_bulk_enable, entity_ids=disabled),
+            set_disabled_by(disabled, er.RegistryEntryDisabler.USER),
+        ),
+        Case(
+            "bulk_rename[name]",
+            command(
+                websocket_api.handle_bulk_rename,
+                entity_ids=temperature_names,
+                find="Temperature",
+                replace="Temp",
+            ),
+            restore_names,
+        ),
+        Case(
+            "bulk_rename[entity_id]",
+            command(
+                websocket_api.handle_bulk_rename,
+                entity_ids=temperature_ids,
+                find="_temperature_",
+                replace="_temp_",
+                target="entity_id",
+            ),
+            restore_entity_ids,
+        ),
+        Case(
+            "bulk_rename_preview[regex template, all]",
+            command(
+                websocket_api.handle_bulk_rename_preview,
+                find=r"^(\w+)_(\d+)$",
+                replace=r"{area}_\1_\2",
+                regex=True,
+                template=True,
+                target="entity_id",
+            ),
+            forget_reads,
+        ),
+        # A swap is its own inverse
+        Case("service bulk_rename[swaps]", swap_service),
+    ]
+
+
+async def async_setup_integration(hass: HomeAssistant) -> dict[str, float]:
+    """Build the index, device lookup and search index; return their build times."""
+    const = import_module("entity_manager.const")
+    EntityIndex = import_module("entity_manager.entity_index").EntityIndex
+    DeviceLookup = import_module("entity_manager.device_lookup").DeviceLookup
+    SearchIndex = import_module("entity_manager.search").SearchIndex
+    ChangeLog = import_module("entity_manager.change_log").ChangeLog
+    NameIndex = import_module("entity_manager.name_index").NameIndex
+    OperationJournal = import_module("entity_manager.journal").OperationJournal
+    ReenableScheduler = import_module("entity_manager.scheduler").ReenableScheduler
+    concurrency = import_module("entity_manager.concurrency")
+    async_setup_services = import_module("entity_manager_component.services").async_setup_services
+
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    timings["entity_index_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    devices = DeviceLookup(hass)
+    devices.async_build()
+    devices.async_listen()
+    changes = ChangeLog(index, devices)
+    changes.async_listen()
+
+    start = time.perf_counter()
+    search = SearchIndex(hass, index, devices)
+    search.async_build()
+    search.async_listen()
+    timings["search_index_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    start = time.perf_counter()
+    names = NameIndex(hass, index, devices)
+    names.async_build()
+    names.async_listen()
+    timings["name_index_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    mutations = concurrency.MutationQueue()
+    scheduler = ReenableScheduler(hass, index, mutations)
+    scheduler.async_listen()
+    scheduler.async_start()
+    hass.data[const.DOMAIN] = {
+        const.DATA_INDEX: index,
+        const.DATA_DEVICES: devices,
+        const.DATA_CHANGE_LOG: changes,
+        const.DATA_SEARCH: search,
+        const.DATA_NAMES: names,
+        const.DATA_READS: concurrency.SharedReads(
+            lambda: (index.version, devices.version, changes.revision)
+        ),
+        const.DATA_MUTATIONS: mutations,
+        const.DATA_SCHEDULER: scheduler,
+        const.DATA_JOURNAL: OperationJournal(hass),
+    }
+    await async_setup_services(hass)
+    return timings
+
+
+async def async_bench_size(size: int, batch: int, requested: int) -> dict[str, Any]:
+    """Benchmark every command on a registry of one size."""
+    hass = await async_make_hass()
+    start = time.perf_counter()
+    registry = populate(hass, size)
+    registry["generate_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    setup = await async_setup_integration(hass)
+    await hass.async_block_till_done()
+
+    repeats = _repeats(size, requested)
+    commands: dict[str, dict[str, float]] = {}
+    for case in build_cases(hass, min(batch, size // 10)):
+        commands[case.name] = await case.async_measure(hass, repeats)
+        print(
+            f"{size:>8}  {case.name:<42}{commands[case.name]['p50_ms']:>10.2f}"
+            f"{commands[case.name]['p99_ms']:>10.2f}{commands[case.name]['peak_kib']:>12.1f}"
+            f"{commands[case.name]['payload_bytes']:>12}"
+        )
+
+    await hass.async_stop(force=True)
+    return {"registry": registry, "setup": setup, "commands": commands}
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> bool:
+    """Print p50 ratios against a baseline; return True if any regressed."""
+    regressed = False
+    print(f"\n{'size':>8}  {'command':<42}{'base p50':>10}{'p50':>10}{'ratio':>8}")
+    for size, result in results["sizes"].items():
+        base_commands = baseline.get("sizes", {}).get(size, {}).get("commands", {})
+        for name, stats in result["commands"].items():
+            if (base := base_commands.get(name)) is None or not base["p50_ms"]:
+                continue
+            ratio = stats["p50_ms"] / base["p50_ms"]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressed |= bool(flag)
+            print(
+                f"{size:>8}  {name:<42}{base['p50_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+                f"{ratio:>8.2f}{flag}"
+            )
+    return regressed
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    """Run the benchmark for every size and write the results."""
+    load_integration()
+    load_custom_component()
+    results: dict[str, Any] = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": _revision(),
+            "python": platform.python_version(),
+            "homeassistant": ha_const.__version__,
+            "batch": args.batch,
+            "repeats": args.repeats,
+        },
+        "sizes": {},
+    }
+    print(f"{'size':>8}  {'command':<42}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>12}{'bytes':>12}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        results["sizes"][str(size)] = await async_bench_size(size, args.batch, args.repeats)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            return int(compare(results, json.load(file), args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output", default="bench_commands.json")
+    parser.add_argument("--compare")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    sys.exit(asyncio.run(async_main(parser.parse_args())))
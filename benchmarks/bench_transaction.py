@@ -0,0 +1,138 @@
+"""Benchmark a 10k-entity bulk disable with and without a registry transaction.
+
+Runs against a real Home Assistant core and entity registry in a temporary
+config directory (requires the homeassistant package):
+
+    python benchmarks/bench_transaction.py [--entities 10000]
+
+For each strategy it reports wall time, the longest event loop stall,
+entity registry events fired, Entity Manager index notifications delivered
+and storage save requests.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from homeassistant import config_entries, core, loader
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from synthetic_registry import load_integration
+
+
+async def async_make_hass(entities: int) -> core.HomeAssistant:
+    """Return a Home Assistant core with a populated entity registry."""
+    hass = core.HomeAssistant(tempfile.mkdtemp())
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    entity_reg = er.async_get(hass)
+    for i in range(entities):
+        entity_reg.async_get_or_create(
+            "sensor", "bench", f"unique_{i}", suggested_object_id=f"bench_{i}"
+        )
+    return hass
+
+
+async def async_heartbeat(stalls: list[float], stop: asyncio.Event) -> None:
+    """Record the longest gap between event loop passes."""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0)
+        now = time.perf_counter()
+        stalls[0] = max(stalls[0], now - last)
+        last = now
+
+
+async def async_measure(entities: int, strategy: str) -> dict[str, float]:
+    """Disable every entity with one strategy and collect counters."""
+    from entity_manager.entity_index import EntityIndex
+    from entity_manager.transaction import RegistryTransaction
+
+    hass = await async_make_hass(entities)
+    entity_reg = er.async_get(hass)
+    entity_ids = list(entity_reg.entities)
+    await hass.async_block_till_done()
+
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    notifications = [0]
+    index.async_add_listener(lambda changes: notifications.__setitem__(0, notifications[0] + 1))
+
+    events = [0]
+
+    @core.callback
+    def count_event(event: core.Event) -> None:
+        events[0] += 1
+
+    hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, count_event)
+
+    saves = [0]
+    delay_save = entity_reg._store.async_delay_save  # pylint: disable=protected-access
+
+    def count_save(*args, **kwargs):
+        saves[0] += 1
+        return delay_save(*args, **kwargs)
+
+    entity_reg._store.async_delay_save = count_save  # pylint: disable=protected-access
+
+    stalls = [0.0]
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(async_heartbeat(stalls, stop))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    if strategy == "per-entity loop":
+        for entity_id in entity_ids:
+            entity_reg.async_update_entity(
+                entity_id, disabled_by=er.RegistryEntryDisabler.USER
+            )
+    else:
+        transaction = RegistryTransaction(
+            hass,
+            hold_notifications=index.async_hold if strategy == "transaction" else None,
+        )
+        for entity_id in entity_ids:
+            transaction.async_update(entity_id, disabled_by=er.RegistryEntryDisabler.USER)
+        await transaction.async_commit()
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+    await hass.async_stop(force=True)
+    return {
+        "wall_s": elapsed,
+        "max_stall_ms": stalls[0] * 1000,
+        "registry_events": events[0],
+        "index_notifications": notifications[0],
+        "save_requests": saves[0],
+    }
+
+
+async def async_main(entities: int) -> None:
+    """Run every strategy and print a table."""
+    load_integration()
+    print(
+        f"{'strategy':<22}{'wall s':>9}{'max stall ms':>14}{'reg events':>12}"
+        f"{'index notif':>13}{'save req':>10}"
+    )
+    for strategy in ("per-entity loop", "chunked", "transaction"):
+        result = await async_measure(entities, strategy)
+        print(
+            f"{strategy:<22}{result['wall_s']:>9.3f}{result['max_stall_ms']:>14.1f}"
+            f"{result['registry_events']:>12}{result['index_notifications']:>13}"
+            f"{result['save_requests']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=10000)
+    asyncio.run(async_main(parser.parse_args().entities))
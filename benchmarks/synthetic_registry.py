@@ -0,0 +1,194 @@
+"""Synthetic Home Assistant registries for Entity Manager benchmarks.
+
+Entries are generated from a seeded random distribution and inserted into
+real area, device and entity registries of a Home Assistant core running in
+a temporary config directory, without going through async_get_or_create,
+so 200k-entity registries build in seconds.
+"""
+import importlib.util
+import random
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+
+from homeassistant import config_entries, core, loader
+from homeassistant.const import EntityCategory
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# platform: (weight, entity domains drawn for its devices)
+PLATFORMS = {
+    "zha": (30, ("sensor", "sensor", "binary_sensor", "switch", "light")),
+    "mqtt": (20, ("sensor", "sensor", "sensor", "switch", "select")),
+    "esphome": (12, ("sensor", "sensor", "binary_sensor", "button", "number")),
+    "shelly": (10, ("sensor", "sensor", "switch", "button", "update")),
+    "hue": (8, ("light", "light", "sensor", "scene")),
+    "tplink": (6, ("switch", "sensor", "sensor", "light")),
+    "sonos": (4, ("media_player", "switch", "number", "sensor")),
+    "unifi": (6, ("device_tracker", "sensor", "switch", "button")),
+}
+# platform: (manufacturer, models)
+MANUFACTURERS = {
+    "zha": ("IKEA", ("TRADFRI", "STYRBAR")),
+    "mqtt": ("Zigbee2MQTT", ("SNZB-02", "WXKG11LM")),
+    "esphome": ("Espressif", ("ESP32", "ESP8266")),
+    "shelly": ("Shelly", ("Plus 1PM", "Pro 4PM")),
+    "hue": ("Signify", ("LCT015", "SML001")),
+    "tplink": ("TP-Link", ("KP115", "HS110")),
+    "sonos": ("Sonos", ("One", "Arc")),
+    "unifi": ("Ubiquiti", ("U6-Lite", "USW-24")),
+}
+# Platforms whose entities have no device
+DEVICELESS_PLATFORMS = ("template", "group", "utility_meter")
+DEVICELESS_SHARE = 0.15
+
+# (entities per device, weight)
+DEVICE_SIZES = ((1, 20), (2, 20), (3, 20), (4, 15), (6, 12), (8, 8), (12, 4), (24, 1))
+
+ORIGINAL_NAMES = (
+    "Temperature", "Humidity", "Battery", "Power", "Energy", "Voltage",
+    "Signal strength", "Illuminance", "Occupancy", "Update", "Restart", "Identify",
+)
+AREAS = (
+    "Living Room", "Kitchen", "Bedroom", "Office", "Garage", "Hallway", "Bathroom",
+    "Basement", "Attic", "Garden", "Dining Room", "Guest Room", "Laundry", "Porch",
+    "Nursery", "Workshop", "Patio", "Pantry", "Study", "Driveway",
+)
+
+DISABLED_BY = (
+    (None, 88),
+    (er.RegistryEntryDisabler.INTEGRATION, 8),
+    (er.RegistryEntryDisabler.USER, 4),
+)
+ENTITY_CATEGORIES = ((None, 75), (EntityCategory.DIAGNOSTIC, 20), (EntityCategory.CONFIG, 5))
+
+
+def load_integration() -> ModuleType:
+    """Import the repository root as the entity_manager package."""
+    spec = importlib.util.spec_from_file_location(
+        "entity_manager",
+        REPO_ROOT / "__init__.py",
+        submodule_search_locations=[str(REPO_ROOT)],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["entity_manager"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_custom_component() -> None:
+    """Register custom_components/entity_manager as entity_manager_component.
+
+    The package __init__ is not executed, so its modules (services, ...) can
+    be imported on their own.
+    """
+    path = REPO_ROOT / "custom_components" / "entity_manager"
+    spec = importlib.util.spec_from_file_location(
+        "entity_manager_component",
+        path / "__init__.py",
+        submodule_search_locations=[str(path)],
+    )
+    sys.modules["entity_manager_component"] = importlib.util.module_from_spec(spec)
+
+
+def _choice(rng: random.Random, weighted: tuple) -> object:
+    """Pick a value from (value, weight) pairs."""
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+async def async_make_hass() -> core.HomeAssistant:
+    """Return a Home Assistant core with loaded, empty registries."""
+    hass = core.HomeAssistant(tempfile.mkdtemp())
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    return hass
+
+
+def populate(hass: core.HomeAssistant, entities: int, seed: int = 0) -> dict[str, int]:
+    """Fill the registries with entities and their devices; return counts."""
+    rng = random.Random(seed)
+    area_reg = ar.async_get(hass)
+    device_reg = dr.async_get(hass)
+    entity_reg = er.async_get(hass)
+
+    area_ids = [area_reg.async_create(name).id for name in AREAS]
+    entry_ids: dict[str, str] = {}
+    for platform in (*PLATFORMS, *DEVICELESS_PLATFORMS):
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=platform,
+            title=platform,
+            data={},
+            source=config_entries.SOURCE_USER,
+            options={},
+        )
+        hass.config_entries._entries[entry.entry_id] = entry  # pylint: disable=protected-access
+        entry_ids[platform] = entry.entry_id
+    platforms = list(PLATFORMS)
+    platform_weights = [PLATFORMS[platform][0] for platform in platforms]
+    sizes, size_weights = zip(*DEVICE_SIZES)
+    counters: dict[str, int] = {}
+    devices = 0
+
+    def add_entity(
+        domain: str, platform: str, device_id: str | None, original_name: str
+    ) -> None:
+        index = len(entity_reg.entities)
+        counters[domain] = counters.get(domain, 0) + 1
+        object_id = f"{platform}_{original_name.lower().replace(' ', '_')}_{counters[domain]}"
+        entity_id = f"{domain}.{object_id}"
+        entity_reg.entities[entity_id] = er.RegistryEntry(
+            entity_id=entity_id,
+            unique_id=f"{platform}-{index}",
+            platform=platform,
+            config_entry_id=entry_ids[platform],
+            device_id=device_id,
+            original_name=original_name,
+            name=f"Custom {original_name}" if rng.random() < 0.05 else None,
+            disabled_by=_choice(rng, DISABLED_BY),
+            entity_category=_choice(rng, ENTITY_CATEGORIES),
+        )
+
+    deviceless = int(entities * DEVICELESS_SHARE)
+    for _ in range(deviceless):
+        add_entity(
+            rng.choice(("sensor", "binary_sensor", "switch")),
+            rng.choice(DEVICELESS_PLATFORMS),
+            None,
+            rng.choice(ORIGINAL_NAMES),
+        )
+
+    while len(entity_reg.entities) < entities:
+        platform = rng.choices(platforms, platform_weights)[0]
+        domains = PLATFORMS[platform][1]
+        manufacturer, models = MANUFACTURERS[platform]
+        devices += 1
+        device = dr.DeviceEntry(
+            config_entries={entry_ids[platform]},
+            identifiers={(platform, f"device-{devices}")},
+            manufacturer=manufacturer,
+            model=rng.choice(models),
+            name=f"{manufacturer} {platform} {devices}",
+            area_id=rng.choice(area_ids) if rng.random() < 0.7 else None,
+        )
+        device_reg.devices[device.id] = device
+        size = min(rng.choices(sizes, size_weights)[0], entities - len(entity_reg.entities))
+        for _ in range(size):
+            add_entity(rng.choice(domains), platform, device.id, rng.choice(ORIGINAL_NAMES))
+
+    return {
+        "entities": len(entity_reg.entities),
+        "devices": devices,
+        "areas": len(area_ids),
+        "config_entries": len(entry_ids),
+    }
@@ -0,0 +1,89 @@
+"""Registry revision and bounded change log for Entity Manager."""
+import time
+from collections import deque
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .device_lookup import DeviceLookup
+from .entity_index import EntityChange, EntityIndex
+
+# Entity changes kept for since_revision queries; older clients get a snapshot
+CHANGE_LOG_SIZE = 10000
+
+
+class ChangeLog:
+    """Revision counter bumped per batch of entity index and device changes.
+
+    The revision is seeded from the wall clock (in microseconds) when the log
+    is created, so revisions handed out before a restart are never reused.
+    """
+
+    def __init__(
+        self, index: EntityIndex, devices: DeviceLookup, size: int = CHANGE_LOG_SIZE
+    ) -> None:
+        """Initialize the log."""
+        self._index = index
+        self._devices = devices
+        self._size = size
+        self.revision = time.time_ns() // 1000
+        # Oldest revision a client may ask for changes since
+        self._floor = self.revision
+        self._log: deque[tuple[int, list[EntityChange], set[str]]] = deque()
+        self._logged = 0
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Log index and device changes; return the unsubscribe.
+
+        Call before other listeners are added, so they see the new revision.
+        """
+        unsubs = [
+            self._index.async_add_listener(self._async_handle_changes),
+            self._devices.async_add_listener(self._async_handle_device_changes),
+        ]
+
+        @callback
+        def unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return unsubscribe
+
+    @callback
+    def _async_handle_changes(self, changes: list[EntityChange]) -> None:
+        """Log a batch of entity changes."""
+        self._append(changes, set())
+
+    @callback
+    def _async_handle_device_changes(self, device_ids: set[str], area_ids: set[str]) -> None:
+        """Log devices whose metadata changed."""
+        if device_ids:
+            self._append([], set(device_ids))
+
+    def _append(self, changes: list[EntityChange], device_ids: set[str]) -> None:
+        """Bump the revision and drop the oldest batches beyond the size."""
+        self.revision += 1
+        self._log.append((self.revision, changes, device_ids))
+        self._logged += len(changes) + len(device_ids)
+        while self._logged > self._size and len(self._log) > 1:
+            revision, changes, device_ids = self._log.popleft()
+            self._logged -= len(changes) + len(device_ids)
+            self._floor = revision
+
+    @callback
+    def async_since(self, revision: int) -> tuple[list[EntityChange], set[str]] | None:
+        """Return the entity changes and changed device IDs after a revision.
+
+        Returns None if the revision is unknown or no longer covered by the
+        log.
+        """
+        if not self._floor <= revision <= self.revision:
+            return None
+        batches: list[list[EntityChange]] = []
+        device_ids: set[str] = set()
+        for batch_revision, batch, batch_devices in reversed(self._log):
+            if batch_revision <= revision:
+                break
+            batches.append(batch)
+            device_ids |= batch_devices
+        return [change for batch in reversed(batches) for change in batch], device_ids
@@ -0,0 +1,145 @@
+"""Shared reads and the serialized mutation queue of Entity Manager."""
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, TypeVar
+
+from homeassistant.core import callback
+from homeassistant.helpers.json import json_bytes
+
+_T = TypeVar("_T")
+
+# Results kept per registry state; they are dropped as soon as it changes
+MAX_SHARED_READS = 8
+
+# Backpressure: mutations waiting or running, and the entities they claim
+MAX_PENDING_MUTATIONS = 32
+MAX_PENDING_ENTITIES = 50000
+
+
+class SharedReads:
+    """Results of reads shared by every caller asking in the same state.
+
+    A read is keyed by what it asks for; the stamp identifies the registry
+    state it was computed in. Concurrent and repeated identical reads (other
+    tabs, other admins) get the stored result until the stamp changes, so
+    the listing is computed and serialized once per registry state.
+    """
+
+    def __init__(self, stamp: Callable[[], Hashable], size: int = MAX_SHARED_READS) -> None:
+        """Initialize an empty store."""
+        self._stamp = stamp
+        self._size = size
+        self._results: OrderedDict[Hashable, tuple[Hashable, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @callback
+    def async_shared(self, key: Hashable, compute: Callable[[], _T]) -> _T:
+        """Return the stored result of a read, computing it if it is stale."""
+        stamp = self._stamp()
+        if (stored := self._results.get(key)) is not None and stored[0] == stamp:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return stored[1]
+        self.misses += 1
+        result = compute()
+        # Results of older states can never be served again
+        for stale in [k for k, (s, _) in self._results.items() if s != stamp]:
+            del self._results[stale]
+        self._results[key] = (stamp, result)
+        if len(self._results) > self._size:
+            self._results.popitem(last=False)
+        return result
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop every stored result."""
+        self._results.clear()
+
+    @callback
+    def async_json(self, key: Hashable, compute: Callable[[], Any]) -> bytes:
+        """Return the stored JSON serialization of a read."""
+        return self.async_shared(("json", key), lambda: json_bytes(compute()))
+
+
+class MutationRejected(Exception):
+    """A mutation was refused before it was queued."""
+
+    code = "rejected"
+
+
+class MutationConflict(MutationRejected):
+    """Entities of a mutation have changes pending from another mutation."""
+
+    code = "conflict"
+
+    def __init__(self, entity_ids: list[str]) -> None:
+        """Initialize the error with the conflicting entity IDs."""
+        shown = ", ".join(entity_ids[:5])
+        more = f" and {len(entity_ids) - 5} more" if len(entity_ids) > 5 else ""
+        super().__init__(f"Changes to {shown}{more} are already pending")
+        self.entity_ids = entity_ids
+
+
+class MutationQueueFull(MutationRejected):
+    """Too many mutations or entities are pending."""
+
+    code = "busy"
+
+
+class MutationQueue:
+    """Runs registry mutations one at a time, in the order they arrive.
+
+    Each mutation claims the entities it changes while it waits and runs; a
+    mutation claiming an entity that is already claimed is rejected with
+    MutationConflict instead of silently overriding the pending change.
+    Mutations beyond the pending limits are rejected with MutationQueueFull,
+    except that a single mutation may always run when nothing is pending.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = MAX_PENDING_MUTATIONS,
+        max_pending_entities: int = MAX_PENDING_ENTITIES,
+    ) -> None:
+        """Initialize an empty queue."""
+        self._max_pending = max_pending
+        self._max_pending_entities = max_pending_entities
+        # asyncio.Lock wakes waiters first in, first out
+        self._lock = asyncio.Lock()
+        self._claimed: set[str] = set()
+        self.pending = 0
+
+    async def async_run(
+        self, entity_ids: Iterable[str], job: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Queue a mutation of some entities and return its result.
+
+        Raises MutationConflict or MutationQueueFull without running it.
+        Cancelling the caller while queued withdraws the mutation.
+        """
+        claim = set(entity_ids)
+        if conflicts := claim & self._claimed:
+            raise MutationConflict(sorted(conflicts))
+        if self.pending and (
+            self.pending >= self._max_pending
+            or len(self._claimed) + len(claim) > self._max_pending_entities
+        ):
+            raise MutationQueueFull(
+                f"{self.pending} mutations of {len(self._claimed)} entities are pending"
+            )
+
+        self._claimed |= claim
+        self.pending += 1
+        try:
+            async with self._lock:
+                return await job()
+        finally:
+            self._claimed -= claim
+            self.pending -= 1
+
+    @callback
+    def async_status(self) -> dict[str, int]:
+        """Return the pending mutation and entity counts."""
+        return {"pending": self.pending, "claimed_entities": len(self._claimed)}
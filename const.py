@@ -0,0 +1,21 @@
+"""Constants for the Entity Manager integration."""
+
+DOMAIN = "entity_manager"
+
+DATA_DEVICES = "devices"
+DATA_INDEX = "index"
+DATA_SEARCH = "search"
+DATA_METRICS = "metrics"
+DATA_CHANGE_LOG = "change_log"
+DATA_READS = "reads"
+DATA_MUTATIONS = "mutations"
+DATA_NAMES = "names"
+DATA_SCHEDULER = "scheduler"
+DATA_JOURNAL = "journal"
+DATA_PROFILER = "profiler"
+DATA_FOOTPRINT = "footprint"
+DATA_STARTUP = "startup"
+DATA_AUTO_DISABLE = "auto_disable"
+DATA_JOBS = "jobs"
+
+CONF_AUTO_DISABLE_RULES = "auto_disable_rules"
@@ -1,3 +1,5 @@
 """Constants for the Entity Manager integration."""
 
 DOMAIN = "entity_manager"
+
+DATA_METRICS = "metrics"
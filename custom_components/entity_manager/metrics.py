@@ -0,0 +1,303 @@
+"""Per-command metrics for Entity Manager."""
+import time
+from collections.abc import Callable, Coroutine, Mapping
+from functools import wraps
+from typing import Any
+
+from homeassistant.components.websocket_api import messages
+from homeassistant.core import HomeAssistant, ServiceCall, callback, is_callback
+from homeassistant.helpers import intent
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_METRICS, DOMAIN
+
+
+# Upper bounds of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class CommandStats:
+    """Counters and a latency histogram of one command, service or intent.
+
+    Blocking time is counted for @callback handlers, which hold the event
+    loop for their whole call. Coroutine handlers give the loop back at
+    every await, so only their latency is counted.
+    """
+
+    __slots__ = (
+        "calls",
+        "errors",
+        "total_ms",
+        "max_ms",
+        "blocking_ms",
+        "max_blocking_ms",
+        "entities",
+        "payload_bytes",
+        "buckets",
+    )
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.blocking_ms = 0.0
+        self.max_blocking_ms = 0.0
+        self.entities = 0
+        self.payload_bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, duration_ms: float, entities: int, blocking: bool = False) -> None:
+        """Count one call; blocking calls held the event loop throughout."""
+        self.calls += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if blocking:
+            self.blocking_ms += duration_ms
+            self.max_blocking_ms = max(self.max_blocking_ms, duration_ms)
+        self.entities += entities
+        for bucket, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                break
+        else:
+            bucket = len(LATENCY_BUCKETS_MS)
+        self.buckets[bucket] += 1
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return the bucket bound a quantile of the calls stays within."""
+        if not self.calls:
+            return None
+        rank = quantile * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as JSON-serializable values."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "blocking_ms": round(self.blocking_ms, 3),
+            "max_blocking_ms": round(self.max_blocking_ms, 3),
+            "entities": self.entities,
+            "payload_bytes": self.payload_bytes,
+            "histogram": self.buckets,
+        }
+
+
+class Metrics:
+    """Metrics of every instrumented command, service and intent handler."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.commands: dict[str, CommandStats] = {}
+        self.since = dt_util.utcnow()
+
+    @callback
+    def async_stats(self, name: str) -> CommandStats:
+        """Return the stats of a command, creating them on first use."""
+        if (stats := self.commands.get(name)) is None:
+            stats = self.commands[name] = CommandStats()
+        return stats
+
+    @callback
+    def async_reset(self) -> None:
+        """Drop all counters."""
+        self.commands.clear()
+        self.since = dt_util.utcnow()
+
+    @callback
+    def async_totals(self) -> dict[str, Any]:
+        """Return the counters summed over every command."""
+        totals = CommandStats()
+        for stats in self.commands.values():
+            totals.calls += stats.calls
+            totals.errors += stats.errors
+            totals.total_ms += stats.total_ms
+            totals.max_ms = max(totals.max_ms, stats.max_ms)
+            totals.blocking_ms += stats.blocking_ms
+            totals.max_blocking_ms = max(totals.max_blocking_ms, stats.max_blocking_ms)
+            totals.entities += stats.entities
+            totals.payload_bytes += stats.payload_bytes
+            totals.buckets = [a + b for a, b in zip(totals.buckets, stats.buckets)]
+        return totals.as_dict()
+
+    @callback
+    def async_snapshot(self) -> dict[str, Any]:
+        """Return every command's counters and the totals."""
+        return {
+            "since": self.since.isoformat(),
+            "latency_buckets_ms": LATENCY_BUCKETS_MS,
+            "totals": self.async_totals(),
+            "commands": {
+                name: stats.as_dict() for name, stats in sorted(self.commands.items())
+            },
+        }
+
+
+def _async_get_metrics(hass: HomeAssistant) -> Metrics | None:
+    """Return the metrics of the loaded config entry."""
+    return hass.data.get(DOMAIN, {}).get(DATA_METRICS)
+
+
+def _entity_count(data: Mapping[str, Any]) -> int:
+    """Return how many entities a command or service call addresses."""
+    for key in ("entity_ids", "renames"):
+        if isinstance(data.get(key), list):
+            return len(data[key])
+    return 1 if data.get("entity_id") or data.get("entity") else 0
+
+
+async def _async_measure(
+    stats: CommandStats, entities: int, coro: Coroutine[Any, Any, Any]
+) -> Any:
+    """Await a handler coroutine and record its latency."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    except Exception:
+        stats.errors += 1
+        raise
+    finally:
+        stats.record((time.perf_counter() - start) * 1000, entities)
+
+
+class _MeteredConnection:
+    """Websocket connection proxy that counts errors and payload bytes.
+
+    Messages are serialized here instead of by the connection, so the
+    payload is only encoded once. Metering stops when the handler returns:
+    subscriptions keep the proxy, and their later events are not part of
+    the call.
+    """
+
+    def __init__(self, connection: Any, stats: CommandStats) -> None:
+        """Wrap a connection."""
+        self._connection = connection
+        self._stats: CommandStats | None = stats
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else to the connection."""
+        return getattr(self._connection, name)
+
+    def stop(self) -> None:
+        """Send everything after the handler's call straight to the connection."""
+        self._stats = None
+
+    def send_message(self, message: bytes | str | dict[str, Any]) -> None:
+        """Send a message and count its size."""
+        if self._stats is None:
+            self._connection.send_message(message)
+            return
+        if isinstance(message, dict):
+            message = messages.message_to_json_bytes(message)
+        self._stats.payload_bytes += len(message)
+        self._connection.send_message(message)
+
+    def send_result(self, msg_id: int, result: Any = None) -> None:
+        """Send a result message."""
+        self.send_message(messages.result_message(msg_id, result))
+
+    def send_event(self, msg_id: int, event: Any = None) -> None:
+        """Send an event message."""
+        self.send_message(messages.event_message(msg_id, event))
+
+    def send_error(
+        self, msg_id: int, code: str, message: str, *args: Any, **kwargs: Any
+    ) -> None:
+        """Send an error message and count the error."""
+        if self._stats is not None:
+            self._stats.errors += 1
+        self._connection.send_error(msg_id, code, message, *args, **kwargs)
+
+
+def metered_command(func: Callable) -> Callable:
+    """Record metrics of a websocket command handler under its message type.
+
+    Apply below websocket_api.async_response; works for @callback handlers
+    too.
+    """
+    if is_callback(func):
+
+        @callback
+        @wraps(func)
+        def callback_wrapper(
+            hass: HomeAssistant, connection: Any, msg: dict[str, Any]
+        ) -> None:
+            if (metrics := _async_get_metrics(hass)) is None:
+                func(hass, connection, msg)
+                return
+            stats = metrics.async_stats(msg["type"])
+            metered = _MeteredConnection(connection, stats)
+            start = time.perf_counter()
+            try:
+                func(hass, metered, msg)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                metered.stop()
+                stats.record(
+                    (time.perf_counter() - start) * 1000, _entity_count(msg), blocking=True
+                )
+
+        return callback_wrapper
+
+    @wraps(func)
+    async def wrapper(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        if (metrics := _async_get_metrics(hass)) is None:
+            await func(hass, connection, msg)
+            return
+        stats = metrics.async_stats(msg["type"])
+        metered = _MeteredConnection(connection, stats)
+        try:
+            await _async_measure(stats, _entity_count(msg), func(hass, metered, msg))
+        finally:
+            metered.stop()
+
+    return wrapper
+
+
+def metered_service(
+    hass: HomeAssistant, handler: Callable[[ServiceCall], Coroutine[Any, Any, Any]]
+) -> Callable[[ServiceCall], Coroutine[Any, Any, Any]]:
+    """Record metrics of a service handler under domain.service."""
+
+    @wraps(handler)
+    async def wrapper(call: ServiceCall) -> Any:
+        if (metrics := _async_get_metrics(hass)) is None:
+            return await handler(call)
+        return await _async_measure(
+            metrics.async_stats(f"{call.domain}.{call.service}"),
+            _entity_count(call.data),
+            handler(call),
+        )
+
+    return wrapper
+
+
+def metered_intent(
+    func: Callable[[Any, intent.Intent], Coroutine[Any, Any, intent.IntentResponse]]
+) -> Callable[[Any, intent.Intent], Coroutine[Any, Any, intent.IntentResponse]]:
+    """Record metrics of an intent handler's async_handle under its intent type."""
+
+    @wraps(func)
+    async def wrapper(self: Any, intent_obj: intent.Intent) -> intent.IntentResponse:
+        if (metrics := _async_get_metrics(intent_obj.hass)) is None:
+            return await func(self, intent_obj)
+        return await _async_measure(
+            metrics.async_stats(f"intent.{intent_obj.intent_type}"),
+            _entity_count(intent_obj.slots),
+            func(self, intent_obj),
+        )
+
+    return wrapper
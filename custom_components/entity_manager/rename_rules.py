@@ -0,0 +1,383 @@
+"""Regex and token template rename rules for Entity Manager."""
+import re
+import time
+from collections import deque
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from homeassistant.core import HomeAssistant, valid_entity_id
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import slugify
+
+from .transaction import RegistryTransaction
+
+TARGETS = ("name", "entity_id")
+TEMPLATE_TOKENS = (
+    "name",
+    "original_name",
+    "device",
+    "area",
+    "domain",
+    "object_id",
+    "platform",
+)
+
+_TEMPLATE_RE = re.compile(r"\{\{|\}\}|\{(\w*)\}")
+_UNDERSCORES_RE = re.compile(r"_{2,}")
+
+# (literal text, token or None) pairs of a parsed template
+TemplateParts = tuple[tuple[str, str | None], ...]
+
+
+class RenameRuleError(ValueError):
+    """Raised when a rename rule cannot be compiled."""
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(find: str, regex: bool, ignore_case: bool) -> re.Pattern[str]:
+    """Return the compiled pattern of a find string."""
+    try:
+        return re.compile(
+            find if regex else re.escape(find), re.IGNORECASE if ignore_case else 0
+        )
+    except re.error as err:
+        raise RenameRuleError(f"Invalid pattern: {err}") from err
+
+
+@lru_cache(maxsize=128)
+def parse_template(template: str) -> TemplateParts:
+    """Split a template into literal text and {token} placeholders.
+
+    {{ and }} stand for literal braces.
+    """
+    parts: list[tuple[str, str | None]] = []
+    literal: list[str] = []
+    pos = 0
+    for match in _TEMPLATE_RE.finditer(template):
+        literal.append(template[pos : match.start()])
+        pos = match.end()
+        if match.group(0) in ("{{", "}}"):
+            literal.append(match.group(0)[0])
+            continue
+        token = match.group(1)
+        if token not in TEMPLATE_TOKENS:
+            raise RenameRuleError(
+                f"Unknown template token '{{{token}}}', "
+                f"expected one of {', '.join(TEMPLATE_TOKENS)}"
+            )
+        parts.append(("".join(literal), token))
+        literal = []
+    literal.append(template[pos:])
+    parts.append(("".join(literal), None))
+    return tuple(parts)
+
+
+@lru_cache(maxsize=1024)
+def _slug(value: str) -> str:
+    """Return the object_id form of a token value."""
+    return slugify(value)
+
+
+def current_name(entry: er.RegistryEntry) -> str:
+    """Return the name shown for an entity, as bulk rename edits it."""
+    return (
+        entry.name
+        or entry.original_name
+        or entry.entity_id.split(".", 1)[1].replace("_", " ")
+    )
+
+
+class RenameRule:
+    """A find/replace rule over entity names or object_ids.
+
+    find is a literal string or, with regex, a pattern whose groups the
+    replacement can reference (\\1, \\g<name>). With template, {token}
+    placeholders in the replacement are filled from the entity, its device
+    and its area; an empty find then replaces the whole value. Patterns and
+    templates are compiled once per distinct rule.
+    """
+
+    def __init__(
+        self,
+        find: str,
+        replace: str,
+        *,
+        target: str = "name",
+        regex: bool = False,
+        template: bool = False,
+        ignore_case: bool = False,
+    ) -> None:
+        """Compile the rule."""
+        if not find and not template:
+            raise RenameRuleError("Find string cannot be empty")
+        if target not in TARGETS:
+            raise RenameRuleError(f"Unknown rename target '{target}'")
+        self.target = target
+        self.regex = regex
+        self.pattern = compile_pattern(find, regex, ignore_case) if find else None
+        self.replace = replace
+        self.parts = parse_template(replace) if template else None
+
+    def async_apply(self, hass: HomeAssistant, entry: er.RegistryEntry) -> str | None:
+        """Return the new name or entity_id of an entry, or None if unchanged."""
+        if self.target == "name":
+            value = current_name(entry)
+        else:
+            domain, value = entry.entity_id.split(".", 1)
+
+        if self.pattern is not None and self.pattern.search(value) is None:
+            return None
+
+        replacement = self.replace
+        if self.parts is not None:
+            # Token values are filled in before the pattern expands group
+            # references, so their backslashes must stay literal
+            replacement = self._render(
+                hass, entry, escape=self.regex and self.pattern is not None
+            )
+        if self.pattern is None:
+            new_value = replacement
+        elif self.regex:
+            try:
+                new_value = self.pattern.sub(replacement, value)
+            except (re.error, IndexError) as err:
+                raise RenameRuleError(f"Invalid replacement: {err}") from err
+        else:
+            new_value = self.pattern.sub(lambda _match: replacement, value)
+
+        if self.parts is not None:
+            if self.target == "name":
+                new_value = " ".join(new_value.split())
+            else:
+                new_value = _UNDERSCORES_RE.sub("_", new_value).strip("_")
+
+        if self.target == "entity_id":
+            new_value = f"{domain}.{new_value}"
+            return None if new_value == entry.entity_id else new_value
+        return None if new_value == value else new_value
+
+    def _render(
+        self, hass: HomeAssistant, entry: er.RegistryEntry, escape: bool
+    ) -> str:
+        """Fill the template placeholders for one entry."""
+        context = _template_context(hass, entry)
+        rendered: list[str] = []
+        for literal, token in self.parts or ():
+            rendered.append(literal)
+            if token is None:
+                continue
+            value = context[token] or ""
+            if self.target == "entity_id":
+                value = _slug(value)
+            if escape:
+                value = value.replace("\\", "\\\\")
+            rendered.append(value)
+        return "".join(rendered)
+
+
+def _template_context(hass: HomeAssistant, entry: er.RegistryEntry) -> dict[str, str | None]:
+    """Return the template token values of an entry."""
+    domain, object_id = entry.entity_id.split(".", 1)
+    device_name = None
+    area_id = entry.area_id
+    if entry.device_id is not None and (
+        device := dr.async_get(hass).async_get(entry.device_id)
+    ) is not None:
+        device_name = device.name_by_user or device.name
+        area_id = area_id or device.area_id
+    area = ar.async_get(hass).async_get_area(area_id) if area_id else None
+    return {
+        "name": current_name(entry),
+        "original_name": entry.original_name,
+        "device": device_name,
+        "area": area.name if area is not None else None,
+        "domain": domain,
+        "object_id": object_id,
+        "platform": entry.platform,
+    }
+
+
+def async_plan_renames(
+    hass: HomeAssistant, rule: RenameRule, entity_ids: Iterable[str]
+) -> dict[str, Any]:
+    """Evaluate a rule over entities without changing the registry.
+
+    Returns the {entity_id, before, after} pairs under changes, unchanged
+    entities under skipped, {entity_id, error} dicts for unknown entities
+    under failed and {entity_id, target, error} dicts under collisions.
+    For entity_id rules, order holds the RenamePlan of the changes and
+    renames that collide are left out of changes.
+    """
+    start = time.perf_counter()
+    entity_reg = er.async_get(hass)
+    plan: dict[str, Any] = {
+        "changes": [],
+        "skipped": [],
+        "failed": [],
+        "collisions": [],
+        "order": None,
+    }
+    for entity_id in entity_ids:
+        if (entry := entity_reg.async_get(entity_id)) is None:
+            plan["failed"].append({"entity_id": entity_id, "error": "Entity not found"})
+            continue
+        if (after := rule.async_apply(hass, entry)) is None:
+            plan["skipped"].append(entity_id)
+            continue
+        before = current_name(entry) if rule.target == "name" else entity_id
+        plan["changes"].append({"entity_id": entity_id, "before": before, "after": after})
+    evaluated = _elapsed_ms(start)
+
+    if rule.target == "entity_id":
+        rename_map = {change["entity_id"]: change["after"] for change in plan["changes"]}
+        order = plan["order"] = RenamePlan(rename_map, async_taken_entity_ids(hass))
+        order.timings = {"evaluate": evaluated, **order.timings}
+        if order.collisions:
+            plan["changes"] = [
+                change
+                for change in plan["changes"]
+                if change["entity_id"] not in order.collisions
+            ]
+            plan["collisions"] = [
+                {"entity_id": old_id, "target": rename_map[old_id], "error": error}
+                for old_id, error in order.collisions.items()
+            ]
+    return plan
+
+
+def async_taken_entity_ids(hass: HomeAssistant) -> set[str]:
+    """Return a snapshot of the entity IDs in use by the registry or the state machine."""
+    taken = set(er.async_get(hass).entities)
+    taken.update(hass.states.async_entity_ids())
+    return taken
+
+
+def _elapsed_ms(start: float) -> float:
+    """Return the milliseconds since a perf_counter reading."""
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+class RenamePlan:
+    """Validated, ordered entity_id renames.
+
+    Validation runs against a snapshot of the entity IDs in use. Renames
+    are ordered so every target is free when its step runs: chains move
+    their last entity first, and each cycle (a swap, a rotation) is broken
+    by moving one entity to a temporary ID and moving it to its target
+    last. Validation and ordering are linear in the number of renames;
+    their timings in milliseconds are kept in timings.
+    """
+
+    def __init__(self, rename_map: dict[str, str], taken: set[str]) -> None:
+        """Validate and order a map of entity_id -> new entity_id."""
+        self.steps: list[tuple[str, str]] = []
+        self.collisions: dict[str, str] = {}
+        # temporary entity_id -> entity_id it was moved away from
+        self.temporary: dict[str, str] = {}
+        self.timings: dict[str, float] = {}
+
+        start = time.perf_counter()
+        renames = self._validate(
+            {old_id: new_id for old_id, new_id in rename_map.items() if old_id != new_id},
+            taken,
+        )
+        self.timings["validate"] = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        self._order(renames, taken)
+        self.timings["order"] = _elapsed_ms(start)
+
+    def __len__(self) -> int:
+        """Return the number of renames, not counting temporary steps."""
+        return len(self.steps) - len(self.temporary)
+
+    def _validate(self, rename_map: dict[str, str], taken: set[str]) -> dict[str, str]:
+        """Record colliding renames and return the valid ones.
+
+        A target collides when it is not a valid entity ID of the same
+        domain, when an entity that is not renamed away already uses it, or
+        when an earlier rename of the batch claims it. Renames into the ID
+        of a colliding rename collide too, as that ID stays in use.
+        """
+        claimed: dict[str, str] = {}
+        for old_id, new_id in rename_map.items():
+            if not valid_entity_id(new_id):
+                self.collisions[old_id] = f"Invalid entity ID '{new_id}'"
+            elif new_id.split(".", 1)[0] != old_id.split(".", 1)[0]:
+                self.collisions[old_id] = f"Target '{new_id}' is in another domain"
+            elif new_id in claimed or (new_id in taken and new_id not in rename_map):
+                self.collisions[old_id] = f"Target '{new_id}' already exists or conflicts"
+            else:
+                claimed[new_id] = old_id
+
+        stranded = list(self.collisions)
+        while stranded:
+            if (old_id := claimed.pop(stranded.pop(), None)) is not None:
+                self.collisions[old_id] = (
+                    f"Target '{rename_map[old_id]}' stays in use by a rename that failed"
+                )
+                stranded.append(old_id)
+
+        return {
+            old_id: new_id
+            for old_id, new_id in rename_map.items()
+            if old_id not in self.collisions
+        }
+
+    def _order(self, renames: dict[str, str], taken: set[str]) -> None:
+        """Fill steps with renames ordered so each target is free."""
+        # entity_id -> the rename waiting for it to be moved away
+        waiting = {new_id: old_id for old_id, new_id in renames.items() if new_id in renames}
+        ready = deque(old_id for old_id, new_id in renames.items() if new_id not in renames)
+
+        def drain() -> None:
+            while ready:
+                old_id = ready.popleft()
+                self.steps.append((old_id, renames.pop(old_id)))
+                if (next_id := waiting.pop(old_id, None)) is not None:
+                    ready.append(next_id)
+
+        drain()
+        # What is left are cycles; open each one with a temporary ID
+        used = taken | set(renames.values())
+        while renames:
+            old_id, new_id = next(iter(renames.items()))
+            temporary_id = _temporary_id(old_id, used)
+            used.add(temporary_id)
+            self.temporary[temporary_id] = old_id
+            self.steps.append((old_id, temporary_id))
+            del renames[old_id]
+            del waiting[new_id]
+            ready.append(waiting.pop(old_id))
+            drain()
+            self.steps.append((temporary_id, new_id))
+
+    def async_queue(self, transaction: RegistryTransaction) -> None:
+        """Queue the steps on a registry transaction."""
+        for old_id, new_id in self.steps:
+            transaction.async_update(old_id, new_entity_id=new_id)
+
+    def renames(self, records: list[dict[str, Any]]) -> list[dict[str, str]]:
+        """Return {entity_id, new_entity_id} per applied rename of transaction records."""
+        return [
+            {
+                "entity_id": self.temporary.get(record["entity_id"], record["entity_id"]),
+                "new_entity_id": record["after"]["entity_id"],
+            }
+            for record in records
+            if record["after"]["entity_id"] not in self.temporary
+        ]
+
+
+def _temporary_id(entity_id: str, used: set[str]) -> str:
+    """Return an unused entity_id to park an entity on while a cycle is renamed."""
+    base = f"{entity_id}_em_tmp"
+    temporary_id = base
+    suffix = 1
+    while temporary_id in used:
+        suffix += 1
+        temporary_id = f"{base}_{suffix}"
+    return temporary_id
@@ -0,0 +1,120 @@
+"""Diagnostic sensors reporting Entity Manager's own cost."""
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from .const import DATA_METRICS, DOMAIN
+from .metrics import Metrics
+
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True, kw_only=True)
+class MetricsSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading the metrics totals."""
+
+    value_fn: Callable[[dict[str, Any]], StateType]
+
+
+SENSORS: tuple[MetricsSensorEntityDescription, ...] = (
+    MetricsSensorEntityDescription(
+        key="calls",
+        name="Command calls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda totals: totals["calls"],
+    ),
+    MetricsSensorEntityDescription(
+        key="errors",
+        name="Command errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda totals: totals["errors"],
+    ),
+    MetricsSensorEntityDescription(
+        key="p95_latency",
+        name="Command latency p95",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda totals: totals["p95_ms"],
+    ),
+    MetricsSensorEntityDescription(
+        key="blocking",
+        name="Event loop blocking",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda totals: totals["blocking_ms"],
+    ),
+    MetricsSensorEntityDescription(
+        key="entities",
+        name="Entities touched",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda totals: totals["entities"],
+    ),
+    MetricsSensorEntityDescription(
+        key="payload",
+        name="Websocket payload",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda totals: totals["payload_bytes"],
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the metrics sensors."""
+    metrics: Metrics = hass.data[DOMAIN][DATA_METRICS]
+    async_add_entities(
+        MetricsSensor(entry, metrics, description) for description in SENSORS
+    )
+
+
+class MetricsSensor(SensorEntity):
+    """A metrics total, polled every minute.
+
+    Disabled by default; enable the sensors to graph the integration's cost.
+    """
+
+    entity_description: MetricsSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        metrics: Metrics,
+        description: MetricsSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name="Entity Manager",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_update(self) -> None:
+        """Read the current totals on the event loop, which owns them."""
+        self._attr_native_value = self.entity_description.value_fn(
+            self._metrics.async_totals()
+        )
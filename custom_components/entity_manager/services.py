@@ -1,5 +1,12 @@
-"""Services for the Entity Manager integration."""
+"""Services for the Entity Manager integration.
+
+These services are not journaled. This package has no undo command to
+replay an operation journal with, so they change the registry directly
+and log every change instead; the root integration journals its
+services and websocket commands for entity_manager/undo.
+"""
 import logging
+import time
 
 import voluptuous as vol
 
@@ -8,6 +15,15 @@ from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
 
 from .const import DOMAIN
+from .metrics import metered_service
+from .rename_rules import (
+    RenamePlan,
+    RenameRule,
+    RenameRuleError,
+    async_plan_renames,
+    async_taken_entity_ids,
+)
+from .transaction import RegistryTransaction
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,22 +32,48 @@ SERVICE_DISABLE_ENTITY = "disable_entity"
 SERVICE_RENAME_ENTITY = "rename_entity"
 SERVICE_BULK_RENAME = "bulk_rename"
 
-BULK_RENAME_SCHEMA = vol.Schema(
-    {
-        vol.Required("renames"): vol.All(
-            cv.ensure_list,
-            [
-                vol.Schema(
-                    {
-                        vol.Required("entity_id"): cv.entity_id,
-                        vol.Required("new_entity_id"): cv.entity_id,
-                    }
-                )
-            ],
-        ),
-        vol.Optional("dry_run", default=False): cv.boolean,
-        vol.Optional("skip_missing", default=True): cv.boolean,
-    }
+RULE_KEYS = ("entity_ids", "integration")
+
+
+def _has_one_rename_source(data: dict) -> dict:
+    """Require either explicit renames or a rule with the entities it covers."""
+    has_rule = any(key in data for key in RULE_KEYS)
+    if "renames" in data and (has_rule or "find" in data):
+        raise vol.Invalid("Use either renames or a find/replace rule, not both")
+    if "renames" not in data:
+        if not has_rule:
+            raise vol.Invalid("Provide renames, or entity_ids/integration with a rule")
+        if "replace" not in data:
+            raise vol.Invalid("A rename rule needs a replace value")
+    return data
+
+
+BULK_RENAME_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional("renames"): vol.All(
+                cv.ensure_list,
+                [
+                    vol.Schema(
+                        {
+                            vol.Required("entity_id"): cv.entity_id,
+                            vol.Required("new_entity_id"): cv.entity_id,
+                        }
+                    )
+                ],
+            ),
+            vol.Optional("entity_ids"): cv.entity_ids,
+            vol.Optional("integration"): cv.string,
+            vol.Optional("find"): cv.string,
+            vol.Optional("replace"): cv.string,
+            vol.Optional("regex", default=False): cv.boolean,
+            vol.Optional("template", default=False): cv.boolean,
+            vol.Optional("ignore_case", default=False): cv.boolean,
+            vol.Optional("dry_run", default=False): cv.boolean,
+            vol.Optional("skip_missing", default=True): cv.boolean,
+        }
+    ),
+    _has_one_rename_source,
 )
 
 
@@ -125,98 +167,111 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     async def async_bulk_rename(call: ServiceCall) -> None:
         """Bulk rename entities in the registry."""
         registry = er.async_get(hass)
-        renames = call.data["renames"]
         dry_run = call.data["dry_run"]
         skip_missing = call.data["skip_missing"]
 
-        sources = [rename["entity_id"] for rename in renames]
-        targets = [rename["new_entity_id"] for rename in renames]
-
-        if len(set(sources)) != len(sources):
-            _LOGGER.error("Duplicate entity_id values in renames; aborting")
-            return
+        if "renames" in call.data:
+            renames = call.data["renames"]
+            sources = [rename["entity_id"] for rename in renames]
+            if len(set(sources)) != len(sources):
+                _LOGGER.error("Duplicate entity_id values in renames; aborting")
+                return
 
-        if len(set(targets)) != len(targets):
-            _LOGGER.error("Duplicate new_entity_id values in renames; aborting")
+            rename_map: dict[str, str] = {}
+            for rename in renames:
+                entity_id = rename["entity_id"]
+                if not registry.async_get(entity_id):
+                    if skip_missing:
+                        _LOGGER.warning("Entity not found (skipping): %s", entity_id)
+                        continue
+                    _LOGGER.error("Entity not found: %s", entity_id)
+                    return
+                rename_map[entity_id] = rename["new_entity_id"]
+            plan = RenamePlan(rename_map, async_taken_entity_ids(hass))
+        elif (plan := _rule_rename_plan(hass, call)) is None:
             return
 
-        conflicts = [
-            target
-            for target in targets
-            if registry.async_get(target) and target not in sources
-        ]
-        if conflicts:
-            _LOGGER.error(
-                "Rename targets already exist and are not being renamed: %s",
-                ", ".join(conflicts),
-            )
+        if plan.collisions:
+            for entity_id, error in plan.collisions.items():
+                _LOGGER.error("Cannot rename %s: %s", entity_id, error)
             return
 
-        rename_map = {rename["entity_id"]: rename["new_entity_id"] for rename in renames}
-
-        order: list[str] = []
-        visit_state: dict[str, str] = {}
-
-        def visit(entity_id: str) -> bool:
-            state = visit_state.get(entity_id)
-            if state == "visiting":
-                return False
-            if state == "visited":
-                return True
-
-            visit_state[entity_id] = "visiting"
-            target = rename_map.get(entity_id)
-            if target in rename_map:
-                if not visit(target):
-                    return False
-            visit_state[entity_id] = "visited"
-            order.append(entity_id)
-            return True
-
-        for entity_id in rename_map:
-            if entity_id not in visit_state:
-                if not visit(entity_id):
-                    _LOGGER.error(
-                        "Cyclic rename detected (e.g., swap); use a temporary name first"
-                    )
-                    return
-
-        planned = []
-        for entity_id in order:
-            new_entity_id = rename_map[entity_id]
-            entry = registry.async_get(entity_id)
-            if not entry:
-                if skip_missing:
-                    _LOGGER.warning("Entity not found (skipping): %s", entity_id)
-                    continue
-                _LOGGER.error("Entity not found: %s", entity_id)
-                return
-            planned.append((entity_id, new_entity_id))
-
         if dry_run:
-            for entity_id, new_entity_id in planned:
+            for entity_id, new_entity_id in plan.steps:
                 _LOGGER.info("Dry run rename: %s -> %s", entity_id, new_entity_id)
+            _LOGGER.info("Dry run plan timings (ms): %s", plan.timings)
             return
 
-        for entity_id, new_entity_id in planned:
-            try:
-                registry.async_update_entity(entity_id, new_entity_id=new_entity_id)
-                _LOGGER.info("Renamed entity: %s -> %s", entity_id, new_entity_id)
-            except ValueError as err:
-                _LOGGER.error("Failed to rename %s -> %s: %s", entity_id, new_entity_id, err)
+        # Cycles are applied through temporary IDs; roll back rather than
+        # leave an entity parked on one
+        transaction = RegistryTransaction(hass, atomic=bool(plan.temporary))
+        plan.async_queue(transaction)
+        start = time.perf_counter()
+        results = await transaction.async_commit()
+        plan.timings["apply"] = round((time.perf_counter() - start) * 1000, 2)
+
+        for rename in plan.renames(results["success"]):
+            _LOGGER.info(
+                "Renamed entity: %s -> %s", rename["entity_id"], rename["new_entity_id"]
+            )
+        for failure in results["failed"]:
+            _LOGGER.error("Failed to rename %s: %s", failure["entity_id"], failure["error"])
+        _LOGGER.info(
+            "Bulk rename of %d entities (%d cycles broken), timings (ms): %s",
+            len(plan),
+            len(plan.temporary),
+            plan.timings,
+        )
 
     hass.services.async_register(
-        DOMAIN, SERVICE_ENABLE_ENTITY, async_enable_entity
+        DOMAIN, SERVICE_ENABLE_ENTITY, metered_service(hass, async_enable_entity)
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_DISABLE_ENTITY, async_disable_entity
+        DOMAIN, SERVICE_DISABLE_ENTITY, metered_service(hass, async_disable_entity)
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_RENAME_ENTITY, async_rename_entity
+        DOMAIN, SERVICE_RENAME_ENTITY, metered_service(hass, async_rename_entity)
     )
     hass.services.async_register(
         DOMAIN,
         SERVICE_BULK_RENAME,
-        async_bulk_rename,
+        metered_service(hass, async_bulk_rename),
         schema=BULK_RENAME_SCHEMA,
     )
+
+
+def _rule_rename_plan(hass: HomeAssistant, call: ServiceCall) -> RenamePlan | None:
+    """Return the rename plan of a find/replace rule, or None on error."""
+    registry = er.async_get(hass)
+    entity_ids = list(dict.fromkeys(call.data.get("entity_ids", [])))
+    if integration := call.data.get("integration"):
+        selected = set(entity_ids)
+        entity_ids.extend(
+            entry.entity_id
+            for entry in registry.entities.values()
+            if entry.platform == integration and entry.entity_id not in selected
+        )
+
+    try:
+        rule = RenameRule(
+            call.data.get("find", ""),
+            call.data["replace"],
+            target="entity_id",
+            regex=call.data["regex"],
+            template=call.data["template"],
+            ignore_case=call.data["ignore_case"],
+        )
+        plan = async_plan_renames(hass, rule, entity_ids)
+    except RenameRuleError as err:
+        _LOGGER.error("Invalid rename rule: %s", err)
+        return None
+
+    for failure in plan["failed"]:
+        if not call.data["skip_missing"]:
+            _LOGGER.error("Entity not found: %s", failure["entity_id"])
+            return None
+        _LOGGER.warning("Entity not found (skipping): %s", failure["entity_id"])
+    _LOGGER.debug(
+        "Rename rule matched %d of %d entities", len(plan["changes"]), len(entity_ids)
+    )
+    return plan["order"]
@@ -0,0 +1,144 @@
+"""Batched entity registry transactions for Entity Manager."""
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 1000
+
+# Called after every chunk with (results so far, failures of the chunk, remaining)
+ProgressCallback = Callable[[dict[str, list], list[dict[str, str]], int], None]
+
+
+def _record(entry: er.RegistryEntry, changes: dict[str, Any]) -> dict[str, Any]:
+    """Return the before/after record of applying changes to an entry."""
+    before: dict[str, Any] = {}
+    after: dict[str, Any] = {}
+    for key, value in changes.items():
+        if key == "new_entity_id":
+            before["entity_id"] = entry.entity_id
+            after["entity_id"] = value
+        else:
+            before[key] = getattr(entry, key)
+            after[key] = value
+    return {"entity_id": entry.entity_id, "before": before, "after": after}
+
+
+def inverse_changes(record: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """Return the (entity_id, changes) that revert a record."""
+    changes = {
+        "new_entity_id" if key == "entity_id" else key: value
+        for key, value in record["before"].items()
+    }
+    return record["after"].get("entity_id", record["entity_id"]), changes
+
+
+class RegistryTransaction:
+    """A batch of entity registry updates applied in one pass.
+
+    Updates are queued with async_update and applied by async_commit, which
+    yields to the event loop between chunks. Only Entity Manager's own
+    notifications are batched: while committing they are held, so its
+    listeners see the whole batch once. Each entry still goes through
+    async_update_entity, the only public way to change it, so Home
+    Assistant fires one registry event per entry; it debounces the
+    core.entity_registry write and config entry reloads on its own. An
+    atomic transaction reverts the entries it already applied when one
+    update fails.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        atomic: bool = False,
+        hold_notifications: Callable[[], CALLBACK_TYPE] | None = None,
+    ) -> None:
+        """Initialize an empty transaction."""
+        self.hass = hass
+        self.atomic = atomic
+        self._hold_notifications = hold_notifications
+        self._updates: list[tuple[str, dict[str, Any]]] = []
+        self.records: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        """Return the number of queued updates."""
+        return len(self._updates)
+
+    def async_update(self, entity_id: str, **changes: Any) -> None:
+        """Queue an update; changes are async_update_entity keyword arguments."""
+        self._updates.append((entity_id, changes))
+
+    async def async_commit(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: ProgressCallback | None = None,
+    ) -> dict[str, list]:
+        """Apply the queued updates.
+
+        Returns the applied records (entity_id, before, after) under success
+        and {entity_id, error} dicts under failed. When an atomic commit
+        fails, the updates it reverts are reported as failed too. Cancelling
+        the calling task stops the commit between two chunks.
+        """
+        entity_reg = er.async_get(self.hass)
+        results: dict[str, list] = {"success": self.records, "failed": []}
+        release = self._hold_notifications() if self._hold_notifications else None
+
+        try:
+            for start in range(0, len(self._updates), chunk_size):
+                failed: list[dict[str, str]] = []
+                for entity_id, changes in self._updates[start : start + chunk_size]:
+                    if (entry := entity_reg.async_get(entity_id)) is None:
+                        failed.append({"entity_id": entity_id, "error": "Entity not found"})
+                    else:
+                        try:
+                            entity_reg.async_update_entity(entity_id, **changes)
+                        except Exception as err:  # pylint: disable=broad-except
+                            _LOGGER.error("Error updating entity %s: %s", entity_id, err)
+                            failed.append({"entity_id": entity_id, "error": str(err)})
+                        else:
+                            self.records.append(_record(entry, changes))
+                    if failed and self.atomic:
+                        break
+                results["failed"].extend(failed)
+
+                if failed and self.atomic:
+                    results["failed"].extend(self._async_rollback())
+                    break
+                if progress_callback is not None:
+                    progress_callback(
+                        results, failed, max(len(self._updates) - start - chunk_size, 0)
+                    )
+                await asyncio.sleep(0)
+        finally:
+            if release is not None:
+                release()
+
+        return results
+
+    def _async_rollback(self) -> list[dict[str, str]]:
+        """Revert the applied records, newest first; return them as failures.
+
+        A record that cannot be reverted stays applied and stays in records.
+        """
+        entity_reg = er.async_get(self.hass)
+        reverted: list[dict[str, str]] = []
+        kept: list[dict[str, Any]] = []
+        for record in reversed(self.records):
+            entity_id, changes = inverse_changes(record)
+            try:
+                entity_reg.async_update_entity(entity_id, **changes)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Cannot roll back entity %s; its update stays applied", entity_id)
+                kept.append(record)
+            else:
+                reverted.append({"entity_id": record["entity_id"], "error": "Rolled back"})
+        self.records[:] = reversed(kept)
+        return reverted[::-1]
@@ -0,0 +1,160 @@
+"""Cached device and area metadata for Entity Manager."""
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+
+# (device_ids, area_ids) whose metadata changed
+LookupListener = Callable[[set[str], set[str]], None]
+
+
+class DeviceLookup:
+    """Device name/manufacturer/model/area table for entity responses.
+
+    Entries are resolved lazily and dropped on device and area registry
+    events, so listings join device metadata without fetching the device
+    registry. The devices of each area are indexed eagerly for area queries.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the lookup table."""
+        self.hass = hass
+        self._devices: dict[str, dict[str, Any] | None] = {}
+        self._areas: dict[str, str | None] = {}
+        self._listeners: list[LookupListener] = []
+        self._device_areas: dict[str, str | None] = {}
+        self._area_devices: dict[str, set[str]] = {}
+        # Bumped on every device or area change
+        self.version = 0
+
+    @callback
+    def async_build(self) -> None:
+        """Index the devices of each area from the current device registry."""
+        self._device_areas.clear()
+        self._area_devices.clear()
+        for device in dr.async_get(self.hass).devices.values():
+            self._set_area(device.id, device.area_id)
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Invalidate entries from registry events; return the unsubscribe."""
+        unsubs = [
+            self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_handle_device_event
+            ),
+            self.hass.bus.async_listen(
+                ar.EVENT_AREA_REGISTRY_UPDATED, self._async_handle_area_event
+            ),
+        ]
+
+        @callback
+        def unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return unsubscribe
+
+    @callback
+    def async_add_listener(self, listener: LookupListener) -> CALLBACK_TYPE:
+        """Register a listener for invalidated devices/areas; return the remover."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_handle_device_event(self, event: Event) -> None:
+        """Drop a changed device and re-index its area."""
+        device_id = event.data["device_id"]
+        self._devices.pop(device_id, None)
+        device = dr.async_get(self.hass).async_get(device_id)
+        self._set_area(device_id, device.area_id if device is not None else None)
+        if device is None:
+            del self._device_areas[device_id]
+        self._notify({device_id}, set())
+
+    @callback
+    def _async_handle_area_event(self, event: Event) -> None:
+        """Drop a changed area and every device that embeds its name."""
+        if (area_id := event.data.get("area_id")) is None:
+            return
+        self._areas.pop(area_id, None)
+        device_ids = {
+            device_id
+            for device_id, info in self._devices.items()
+            if info is not None and info["area_id"] == area_id
+        }
+        for device_id in device_ids:
+            del self._devices[device_id]
+        self._notify(device_ids, {area_id})
+
+    def _set_area(self, device_id: str, area_id: str | None) -> None:
+        """Move a device to the device set of an area."""
+        if (old_area_id := self._device_areas.get(device_id)) is not None:
+            self._area_devices[old_area_id].discard(device_id)
+            if not self._area_devices[old_area_id]:
+                del self._area_devices[old_area_id]
+        self._device_areas[device_id] = area_id
+        if area_id is not None:
+            self._area_devices.setdefault(area_id, set()).add(device_id)
+
+    def _notify(self, device_ids: set[str], area_ids: set[str]) -> None:
+        """Tell listeners which devices and areas changed."""
+        self.version += 1
+        for listener in list(self._listeners):
+            listener(device_ids, area_ids)
+
+    @callback
+    def async_area_name(self, area_id: str | None) -> str | None:
+        """Return the name of an area."""
+        if area_id is None:
+            return None
+        if area_id not in self._areas:
+            area = ar.async_get(self.hass).async_get_area(area_id)
+            self._areas[area_id] = area.name if area is not None else None
+        return self._areas[area_id]
+
+    @callback
+    def async_describe(
+        self, device_id: str | None, area_id: str | None
+    ) -> tuple[str | None, str | None, str | None]:
+        """Return the device name, area ID and area name of an entity.
+
+        The entity's own area_id wins over the area of its device.
+        """
+        device_name = None
+        if (device := self.async_device(device_id)) is not None:
+            device_name = device["name"]
+            if area_id is None:
+                area_id = device["area_id"]
+        return device_name, area_id, self.async_area_name(area_id)
+
+    @callback
+    def async_area_devices(self, area_id: str) -> set[str]:
+        """Return the IDs of the devices in an area; do not modify the set."""
+        return self._area_devices.get(area_id, set())
+
+    @callback
+    def async_device(self, device_id: str | None) -> dict[str, Any] | None:
+        """Return the display metadata of a device, or None if it is unknown."""
+        if device_id is None:
+            return None
+        if device_id not in self._devices:
+            device = dr.async_get(self.hass).async_get(device_id)
+            self._devices[device_id] = (
+                {
+                    "name": device.name_by_user or device.name,
+                    "manufacturer": device.manufacturer,
+                    "model": device.model,
+                    "area_id": device.area_id,
+                    "area": self.async_area_name(device.area_id),
+                }
+                if device is not None
+                else None
+            )
+        return self._devices[device_id]
@@ -0,0 +1,402 @@
+"""In-memory entity registry index for Entity Manager."""
+import logging
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+_LOGGER = logging.getLogger(__name__)
+
+NO_DEVICE = "no_device"
+
+# (old projection, new projection); either side is None for adds/removes
+EntityChange = tuple[dict[str, Any] | None, dict[str, Any] | None]
+IndexListener = Callable[[list[EntityChange]], None]
+
+# Stable listing order: (platform, device key, entity_id)
+SortKey = tuple[str, str, str]
+
+STATES = ("disabled", "enabled", "all")
+
+# Secondary indexes: scope -> key of a projected entity in that scope. None
+# is a key too (entities without device, area, config entry or disabler).
+SCOPES: dict[str, Callable[[dict[str, Any]], str | None]] = {
+    "integration": lambda projection: projection["platform"],
+    "device": lambda projection: projection["device_id"],
+    "area": lambda projection: projection["area_id"],
+    "domain": lambda projection: projection["entity_id"].partition(".")[0],
+    "config_entry": lambda projection: projection["config_entry_id"],
+    "disabled_by": lambda projection: projection["disabled_by"],
+}
+
+
+def entity_projection(entity: er.RegistryEntry) -> dict[str, Any]:
+    """Return the dict sent to the panel for a registry entry."""
+    return {
+        "entity_id": entity.entity_id,
+        "platform": entity.platform or "unknown",
+        "device_id": entity.device_id,
+        "area_id": entity.area_id,
+        "disabled_by": entity.disabled_by.value if entity.disabled_by else None,
+        "name": entity.name,
+        "original_name": entity.original_name,
+        "entity_category": entity.entity_category.value if entity.entity_category else None,
+        "config_entry_id": entity.config_entry_id,
+        "is_disabled": bool(entity.disabled),
+    }
+
+
+def sort_key(projection: dict[str, Any]) -> SortKey:
+    """Return the listing sort key of a projected entity."""
+    return (
+        projection["platform"],
+        projection["device_id"] or NO_DEVICE,
+        projection["entity_id"],
+    )
+
+
+def matches_state(projection: dict[str, Any], state: str) -> bool:
+    """Return whether a projected entity matches a disabled/enabled/all filter."""
+    if state == "all":
+        return True
+    return projection["is_disabled"] == (state == "disabled")
+
+
+class EntityGroup:
+    """Entity IDs of one integration, device or scope key, split by disabled state."""
+
+    __slots__ = ("entity_ids", "disabled_ids")
+
+    def __init__(self) -> None:
+        """Initialize an empty group."""
+        self.entity_ids: set[str] = set()
+        self.disabled_ids: set[str] = set()
+
+    def add(self, entity_id: str, is_disabled: bool) -> None:
+        """Add an entity to the group."""
+        self.entity_ids.add(entity_id)
+        if is_disabled:
+            self.disabled_ids.add(entity_id)
+
+    def discard(self, entity_id: str) -> None:
+        """Remove an entity from the group."""
+        self.entity_ids.discard(entity_id)
+        self.disabled_ids.discard(entity_id)
+
+    def has_matching(self, state: str) -> bool:
+        """Return whether any entity matches a disabled/enabled/all filter."""
+        if state == "disabled":
+            return bool(self.disabled_ids)
+        if state == "enabled":
+            return len(self.entity_ids) > len(self.disabled_ids)
+        return bool(self.entity_ids)
+
+    def matching(self, state: str) -> set[str]:
+        """Return the entity IDs matching a disabled/enabled/all filter."""
+        if state == "disabled":
+            return self.disabled_ids
+        if state == "enabled":
+            return self.entity_ids - self.disabled_ids
+        return self.entity_ids
+
+
+class EntityIndex:
+    """Integration -> device -> entity index kept current from registry events.
+
+    The index is built once from the entity registry and then patched per
+    EVENT_ENTITY_REGISTRY_UPDATED, so listing queries never rescan the
+    registry. Hash indexes per scope (see SCOPES) answer scoped queries in
+    time proportional to the result.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self.entities: dict[str, dict[str, Any]] = {}
+        self._integrations: dict[str, EntityGroup] = {}
+        self._devices: dict[str, dict[str, EntityGroup]] = {}
+        self._sorted: dict[str, list[SortKey]] = {state: [] for state in STATES}
+        self._scopes: dict[str, dict[str | None, EntityGroup]] = {
+            scope: {} for scope in SCOPES
+        }
+        self._listeners: list[IndexListener] = []
+        self._pending: list[EntityChange] = []
+        # Bumped on every insert/removal, as soon as the index changes
+        self.version = 0
+        self._holds = 0
+
+    @callback
+    def async_build(self) -> None:
+        """Populate the index from the current entity registry."""
+        self.entities.clear()
+        self._integrations.clear()
+        self._devices.clear()
+        for groups in self._scopes.values():
+            groups.clear()
+        for entity in er.async_get(self.hass).entities.values():
+            self._add(entity_projection(entity), keep_sorted=False)
+        for state, keys in self._sorted.items():
+            keys[:] = sorted(
+                sort_key(projection)
+                for projection in self.entities.values()
+                if matches_state(projection, state)
+            )
+        _LOGGER.debug("Entity index built with %d entities", len(self.entities))
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Keep the index current from registry events; return the unsubscribe."""
+        return self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_event
+        )
+
+    @callback
+    def async_add_listener(self, listener: IndexListener) -> CALLBACK_TYPE:
+        """Register a listener for batches of index changes; return the remover."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_handle_registry_event(self, event: Event) -> None:
+        """Apply a create/update/remove event to the index."""
+        entity_id = event.data["entity_id"]
+        old_entity_id = event.data.get("old_entity_id", entity_id)
+        if (old := self._remove(old_entity_id)) is not None:
+            self._record(old, None)
+        if event.data["action"] == "remove":
+            return
+        # Events are delivered after the fact; always project the current entry
+        # so out-of-order or superseded events converge on the registry state.
+        if (old := self._remove(entity_id)) is not None:
+            self._record(old, None)
+        if (entity := er.async_get(self.hass).async_get(entity_id)) is not None:
+            new = entity_projection(entity)
+            self._add(new)
+            self._record(None, new)
+
+    @callback
+    def async_hold(self) -> CALLBACK_TYPE:
+        """Defer listener notifications until the returned release is called.
+
+        Used by registry transactions so a whole batch reaches listeners as
+        one change list.
+        """
+        self._holds += 1
+
+        @callback
+        def release() -> None:
+            self._holds -= 1
+            if not self._holds:
+                # Registry events of the last updates are still queued on the
+                # loop; flush after them.
+                self.hass.loop.call_soon(self._async_flush)
+
+        return release
+
+    def _record(self, old: dict[str, Any] | None, new: dict[str, Any] | None) -> None:
+        """Queue a change for listeners, flushing once per event loop pass."""
+        if not self._listeners:
+            return
+        if not self._pending and not self._holds:
+            self.hass.loop.call_soon(self._async_flush)
+        self._pending.append((old, new))
+
+    @callback
+    def _async_flush(self) -> None:
+        """Deliver the queued changes to listeners as one batch."""
+        if self._holds:
+            return
+        changes, self._pending = self._pending, []
+        if not changes:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(changes)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in entity index listener")
+
+    def _add(self, projection: dict[str, Any], keep_sorted: bool = True) -> None:
+        """Insert a projected entity into the groups and sorted listings."""
+        entity_id = projection["entity_id"]
+        platform = projection["platform"]
+        device_key = projection["device_id"] or NO_DEVICE
+        is_disabled = projection["is_disabled"]
+
+        self.version += 1
+        self.entities[entity_id] = projection
+        if (integration := self._integrations.get(platform)) is None:
+            integration = self._integrations[platform] = EntityGroup()
+            self._devices[platform] = {}
+        integration.add(entity_id, is_disabled)
+
+        devices = self._devices[platform]
+        if (device := devices.get(device_key)) is None:
+            device = devices[device_key] = EntityGroup()
+        device.add(entity_id, is_disabled)
+
+        for scope, scope_key in SCOPES.items():
+            groups = self._scopes[scope]
+            if (group := groups.get(key := scope_key(projection))) is None:
+                group = groups[key] = EntityGroup()
+            group.add(entity_id, is_disabled)
+
+        if keep_sorted:
+            key = sort_key(projection)
+            for state, keys in self._sorted.items():
+                if matches_state(projection, state):
+                    insort(keys, key)
+
+    def _remove(self, entity_id: str) -> dict[str, Any] | None:
+        """Drop an entity from the groups, pruning empty ones."""
+        if (projection := self.entities.pop(entity_id, None)) is None:
+            return None
+        self.version += 1
+        platform = projection["platform"]
+        device_key = projection["device_id"] or NO_DEVICE
+
+        devices = self._devices[platform]
+        device = devices[device_key]
+        device.discard(entity_id)
+        if not device.entity_ids:
+            del devices[device_key]
+
+        integration = self._integrations[platform]
+        integration.discard(entity_id)
+        if not integration.entity_ids:
+            del self._integrations[platform]
+            del self._devices[platform]
+
+        for scope, scope_key in SCOPES.items():
+            groups = self._scopes[scope]
+            group = groups[key := scope_key(projection)]
+            group.discard(entity_id)
+            if not group.entity_ids:
+                del groups[key]
+
+        key = sort_key(projection)
+        for state, keys in self._sorted.items():
+            if matches_state(projection, state):
+                del keys[bisect_left(keys, key)]
+        return projection
+
+    @callback
+    def async_group_counts(self, platform: str, device_keys: set[str]) -> dict[str, Any]:
+        """Return the current counters of an integration and some of its devices.
+
+        Groups that no longer exist are reported with zero counts so clients
+        can drop them.
+        """
+        integration = self._integrations.get(platform) or EntityGroup()
+        devices = self._devices.get(platform, {})
+        device_counts: dict[str, dict[str, int]] = {}
+        for device_key in device_keys:
+            device = devices.get(device_key) or EntityGroup()
+            device_counts[device_key] = {
+                "total_entities": len(device.entity_ids),
+                "disabled_entities": len(device.disabled_ids),
+            }
+        return {
+            "integration": platform,
+            "total_entities": len(integration.entity_ids),
+            "disabled_entities": len(integration.disabled_ids),
+            "devices": device_counts,
+        }
+
+    @callback
+    def async_scope(self, scope: str, key: str | None, state: str) -> set[str]:
+        """Return the IDs of the entities of a scope matching a state filter.
+
+        The returned set may be the index's own; do not modify it.
+        """
+        if (group := self._scopes[scope].get(key)) is None:
+            return set()
+        return group.matching(state)
+
+    @callback
+    def async_scope_keys(self, scope: str) -> list[str | None]:
+        """Return the keys of a scope that have entities."""
+        return list(self._scopes[scope])
+
+    @callback
+    def async_area(self, area_id: str, device_ids: Iterable[str], state: str) -> set[str]:
+        """Return the IDs of the entities in an area matching a state filter.
+
+        device_ids are the devices in the area; their entities without an
+        area of their own are in it too.
+        """
+        entities = self.entities
+        return self.async_scope("area", area_id, state) | {
+            entity_id
+            for device_id in device_ids
+            for entity_id in self.async_scope("device", device_id, state)
+            if entities[entity_id]["area_id"] is None
+        }
+
+    @callback
+    def async_entities(self, entity_ids: Iterable[str]) -> list[dict[str, Any]]:
+        """Return the projections of entity IDs in listing order."""
+        entities = self.entities
+        return sorted(
+            (entities[entity_id] for entity_id in entity_ids if entity_id in entities),
+            key=sort_key,
+        )
+
+    @callback
+    def async_count(self, state: str) -> int:
+        """Return the number of entities matching a state filter."""
+        return len(self._sorted[state])
+
+    @callback
+    def async_page(
+        self, state: str, after: SortKey | None, limit: int
+    ) -> tuple[list[dict[str, Any]], SortKey | None]:
+        """Return up to limit entities sorted after a key, plus the next key.
+
+        The next key is None once the listing is exhausted.
+        """
+        keys = self._sorted[state]
+        start = bisect_right(keys, after) if after is not None else 0
+        page_keys = keys[start : start + limit]
+        next_key = page_keys[-1] if start + limit < len(keys) else None
+        return [self.entities[key[2]] for key in page_keys], next_key
+
+    @callback
+    def async_grouped(self, state: str) -> list[dict[str, Any]]:
+        """Return the grouped integration/device listing for a state filter.
+
+        Devices and integrations without matching entities are omitted; the
+        total/disabled counters always cover every entity in the group.
+        """
+        entities = self.entities
+        result: list[dict[str, Any]] = []
+        for platform, integration in self._integrations.items():
+            if not integration.has_matching(state):
+                continue
+            devices: dict[str, Any] = {}
+            for device_key, device in self._devices[platform].items():
+                if not device.has_matching(state):
+                    continue
+                devices[device_key] = {
+                    "device_id": device_key if device_key != NO_DEVICE else None,
+                    "entities": [
+                        entities[entity_id] for entity_id in sorted(device.matching(state))
+                    ],
+                    "total_entities": len(device.entity_ids),
+                    "disabled_entities": len(device.disabled_ids),
+                }
+            result.append(
+                {
+                    "integration": platform,
+                    "devices": devices,
+                    "total_entities": len(integration.entity_ids),
+                    "disabled_entities": len(integration.disabled_ids),
+                }
+            )
+        return result
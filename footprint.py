@@ -0,0 +1,116 @@
+"""Recorder database footprint of entities for Entity Manager."""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import StateAttributes, States, StatesMeta
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from sqlalchemy import func, select
+
+# Seconds an analysis is served from cache
+CACHE_TTL = 300
+
+# Entities aggregated per query, well below the SQLite bound parameter limit
+QUERY_BATCH_SIZE = 500
+
+# Estimated bytes of a states row besides its state string: the fixed-width
+# columns and the row's entries in the states indexes
+STATE_ROW_BYTES = 120
+
+# Usage per entity ID: [rows, estimated bytes]
+Usage = dict[str, list[int]]
+
+
+class RecorderFootprint:
+    """Measures the states rows and bytes entities hold in the recorder database.
+
+    The aggregates run on the recorder's database executor, one batch of
+    entity metadata IDs per query, so every batch is a range scan of the
+    (metadata_id, last_updated_ts) index and the event loop is never
+    blocked. Bytes are estimated from the state strings, a fixed row
+    overhead and the attribute rows the entity references in the window.
+    Results are cached per window for CACHE_TTL seconds, and concurrent
+    requests for the same window share one analysis.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty cache."""
+        self.hass = hass
+        self._cache: dict[int, tuple[float, datetime, Usage]] = {}
+        self._pending: dict[int, asyncio.Future[tuple[datetime, Usage]]] = {}
+
+    async def async_analyze(self, hours: int, refresh: bool = False) -> tuple[datetime, Usage]:
+        """Return when the usage of the last hours was measured, and the usage."""
+        cached = self._cache.get(hours)
+        if cached is not None and not refresh and time.monotonic() < cached[0]:
+            return cached[1], cached[2]
+        if (pending := self._pending.get(hours)) is None:
+            pending = get_instance(self.hass).async_add_executor_job(self._measure, hours)
+            pending.add_done_callback(partial(self._async_measured, hours))
+            self._pending[hours] = pending
+        # A cancelled request leaves the analysis running for the others
+        return await asyncio.shield(pending)
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop the cached analyses."""
+        self._cache.clear()
+
+    @callback
+    def _async_measured(
+        self, hours: int, future: asyncio.Future[tuple[datetime, Usage]]
+    ) -> None:
+        """Cache a finished analysis."""
+        del self._pending[hours]
+        if not future.cancelled() and future.exception() is None:
+            measured_at, usage = future.result()
+            self._cache[hours] = (time.monotonic() + CACHE_TTL, measured_at, usage)
+
+    def _measure(self, hours: int) -> tuple[datetime, Usage]:
+        """Aggregate the states of the last hours per entity; runs in the executor."""
+        measured_at = dt_util.utcnow()
+        start = (measured_at - timedelta(hours=hours)).timestamp()
+        usage: Usage = {}
+        with session_scope(hass=self.hass, read_only=True) as session:
+            entity_ids = dict(
+                session.execute(select(StatesMeta.metadata_id, StatesMeta.entity_id)).all()
+            )
+            metadata_ids = list(entity_ids)
+            for offset in range(0, len(metadata_ids), QUERY_BATCH_SIZE):
+                batch = metadata_ids[offset : offset + QUERY_BATCH_SIZE]
+                in_window = (States.metadata_id.in_(batch), States.last_updated_ts >= start)
+
+                for metadata_id, rows, state_bytes in session.execute(
+                    select(States.metadata_id, func.count(), func.sum(func.length(States.state)))
+                    .where(*in_window)
+                    .group_by(States.metadata_id)
+                ):
+                    usage[entity_ids[metadata_id]] = [
+                        rows,
+                        rows * STATE_ROW_BYTES + (state_bytes or 0),
+                    ]
+
+                # Attribute rows are deduplicated; count each one once per entity
+                attributes = (
+                    select(States.metadata_id, States.attributes_id)
+                    .where(*in_window)
+                    .distinct()
+                    .subquery()
+                )
+                for metadata_id, attribute_bytes in session.execute(
+                    select(
+                        attributes.c.metadata_id,
+                        func.sum(func.length(StateAttributes.shared_attrs)),
+                    )
+                    .join(
+                        StateAttributes,
+                        StateAttributes.attributes_id == attributes.c.attributes_id,
+                    )
+                    .group_by(attributes.c.metadata_id)
+                ):
+                    usage[entity_ids[metadata_id]][1] += attribute_bytes or 0
+        return measured_at, usage
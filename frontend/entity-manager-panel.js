@@ -1,3 +1,8 @@
+// Row heights of the virtualized list, in pixels
+const ROW_HEIGHTS = { integration: 76, device: 52, entity: 60 };
+// Rows rendered beyond the viewport on either side
+const OVERSCAN_ROWS = 10;
+
 class EntityManagerPanel extends HTMLElement {
   constructor() {
     super();
@@ -9,6 +14,18 @@ class EntityManagerPanel extends HTMLElement {
     this.selectedEntities = new Set();
     this.searchTerm = '';
     this.viewState = 'disabled';
+    this.entityMap = new Map();
+    // Per view state: last listing received and the revision it is at
+    this.listings = {};
+    this.unsubscribeData = null;
+    this.searchMatches = new Set();
+    this.searchTimer = null;
+    // Virtualized list: the flattened rows of the expanded tree, their top
+    // offsets, and the DOM rows currently rendered by row key
+    this.rows = [];
+    this.rowOffsets = new Float64Array(1);
+    this.renderedRows = new Map();
+    this.renderFrame = null;
   }
 
   set panel(info) {
@@ -19,37 +36,190 @@ class EntityManagerPanel extends HTMLElement {
     }
   }
 
+  connectedCallback() {
+    if (this.content && !this.unsubscribeData) {
+      this.loadData();
+    }
+  }
+
+  disconnectedCallback() {
+    this.unsubscribe();
+  }
+
   async loadData() {
-    try {
-      const result = await this.hass.callWS({
-        type: 'entity_manager/get_disabled_entities',
-        state: this.viewState,
-      });
-      
-      this.data = result;
-      
-      // Load device information
-      await this.loadDeviceInfo();
-      
+    // (Re)subscribe: the server sends one snapshot, then per-entity deltas.
+    // A cached listing is shown at once and only the changes since its
+    // revision are fetched.
+    this.unsubscribe();
+    const state = this.viewState;
+    const cached = this.listings[state];
+    if (cached) {
+      ({ data: this.data, entityMap: this.entityMap, deviceInfo: this.deviceInfo } = cached);
       this.updateView();
+    }
+    try {
+      this.unsubscribeData = await this.hass.connection.subscribeMessage(
+        (message) => this.handleDataMessage(state, message),
+        {
+          type: 'entity_manager/subscribe',
+          state,
+          format: 'compact',
+          since_revision: cached ? cached.revision : null,
+        },
+      );
     } catch (err) {
       console.error('Error loading disabled entities:', err);
       this.showError('Failed to load disabled entities');
     }
   }
 
-  async loadDeviceInfo() {
-    try {
-      const deviceRegistry = await this.hass.callWS({
-        type: 'config/device_registry/list',
-      });
-      
+  unsubscribe() {
+    if (this.unsubscribeData) {
+      this.unsubscribeData();
+      this.unsubscribeData = null;
+    }
+  }
+
+  handleDataMessage(state, message) {
+    if (message.devices) {
+      Object.assign(this.deviceInfo, message.devices);
+    }
+    if (message.snapshot) {
+      this.data = message.snapshot.format === 'compact'
+        ? this.decodeCompactListing(message.snapshot)
+        : message.snapshot;
+      this.entityMap = new Map();
       this.deviceInfo = {};
-      deviceRegistry.forEach(device => {
-        this.deviceInfo[device.id] = device;
+      this.data.forEach(integration => {
+        Object.entries(integration.devices).forEach(([deviceKey, device]) => {
+          this.deviceInfo[deviceKey] = device;
+          device.entities.forEach(entity => this.entityMap.set(entity.entity_id, entity));
+        });
       });
-    } catch (err) {
-      console.error('Error loading device info:', err);
+    } else if (message.upserted) {
+      this.applyDelta(message);
+    }
+    this.listings[state] = {
+      data: this.data,
+      entityMap: this.entityMap,
+      deviceInfo: this.deviceInfo,
+      revision: message.revision,
+    };
+    if (!message.not_modified) {
+      this.updateView();
+    }
+  }
+
+  decodeCompactListing(listing) {
+    // Rebuild the grouped listing from the lookup tables and columns
+    const { platforms, devices, integrations, groups, entities } = listing;
+    const deviceFields = Object.keys(devices);
+    const deviceKey = index => devices.device_id[index] || 'no_device';
+    const byPlatform = new Map();
+    integrations.platform.forEach((platform, i) => {
+      byPlatform.set(platform, {
+        integration: platforms[platform],
+        devices: {},
+        total_entities: integrations.total_entities[i],
+        disabled_entities: integrations.disabled_entities[i],
+      });
+    });
+    groups.platform.forEach((platform, i) => {
+      const device = groups.device[i];
+      byPlatform.get(platform).devices[deviceKey(device)] = {
+        ...Object.fromEntries(deviceFields.map(field => [field, devices[field][device]])),
+        entities: [],
+        total_entities: groups.total_entities[i],
+        disabled_entities: groups.disabled_entities[i],
+      };
+    });
+    entities.entity_id.forEach((entityId, i) => {
+      const disabledBy = listing.disabled_by[entities.disabled_by[i]];
+      const device = entities.device[i];
+      const entity = {
+        entity_id: entityId,
+        platform: platforms[entities.platform[i]],
+        device_id: devices.device_id[device],
+        area_id: listing.areas[entities.area_id[i]],
+        disabled_by: disabledBy,
+        name: entities.name[i],
+        original_name: listing.original_names[entities.original_name[i]],
+        entity_category: listing.entity_categories[entities.entity_category[i]],
+        config_entry_id: listing.config_entries[entities.config_entry_id[i]],
+        is_disabled: disabledBy !== null,
+      };
+      byPlatform.get(entities.platform[i]).devices[deviceKey(device)].entities.push(entity);
+    });
+    return Array.from(byPlatform.values());
+  }
+
+  applyDelta({ upserted, removed, counts }) {
+    const integrations = new Map(this.data.map(int => [int.integration, int]));
+
+    removed.forEach(entityId => this.removeLocalEntity(integrations, entityId));
+
+    upserted.forEach(entity => {
+      this.removeLocalEntity(integrations, entity.entity_id);
+      let integration = integrations.get(entity.platform);
+      if (!integration) {
+        integration = {
+          integration: entity.platform,
+          devices: {},
+          total_entities: 0,
+          disabled_entities: 0,
+        };
+        integrations.set(entity.platform, integration);
+      }
+      const deviceKey = entity.device_id || 'no_device';
+      if (!integration.devices[deviceKey]) {
+        integration.devices[deviceKey] = {
+          device_id: entity.device_id || null,
+          entities: [],
+          total_entities: 0,
+          disabled_entities: 0,
+        };
+      }
+      integration.devices[deviceKey].entities.push(entity);
+      this.entityMap.set(entity.entity_id, entity);
+    });
+
+    counts.forEach(count => {
+      const integration = integrations.get(count.integration);
+      if (!integration) return;
+      integration.total_entities = count.total_entities;
+      integration.disabled_entities = count.disabled_entities;
+      Object.entries(count.devices).forEach(([deviceKey, deviceCount]) => {
+        this.deviceInfo[deviceKey] = deviceCount;
+        const device = integration.devices[deviceKey];
+        if (!device) return;
+        device.total_entities = deviceCount.total_entities;
+        device.disabled_entities = deviceCount.disabled_entities;
+      });
+    });
+
+    // Prune devices and integrations left without entities
+    integrations.forEach((integration, platform) => {
+      Object.keys(integration.devices).forEach(deviceKey => {
+        if (integration.devices[deviceKey].entities.length === 0) {
+          delete integration.devices[deviceKey];
+        }
+      });
+      if (Object.keys(integration.devices).length === 0) {
+        integrations.delete(platform);
+      }
+    });
+
+    this.data = Array.from(integrations.values());
+  }
+
+  removeLocalEntity(integrations, entityId) {
+    const entity = this.entityMap.get(entityId);
+    if (!entity) return;
+    this.entityMap.delete(entityId);
+    const integration = integrations.get(entity.platform);
+    const device = integration && integration.devices[entity.device_id || 'no_device'];
+    if (device) {
+      device.entities = device.entities.filter(e => e.entity_id !== entityId);
     }
   }
 
@@ -328,6 +498,18 @@ class EntityManagerPanel extends HTMLElement {
           color: var(--primary-text-color);
           box-sizing: border-box;
         }
+        .modal-options {
+          display: flex;
+          flex-wrap: wrap;
+          gap: 16px;
+          margin-bottom: 8px;
+          font-size: 13px;
+        }
+        .modal-hint {
+          font-size: 12px;
+          color: var(--secondary-text-color);
+          margin-bottom: 12px;
+        }
         .modal-actions {
           display: flex;
           gap: 8px;
@@ -381,6 +563,48 @@ class EntityManagerPanel extends HTMLElement {
         .btn-rename:hover {
           filter: brightness(0.9);
         }
+        .bulk-progress {
+          display: flex;
+          align-items: center;
+          gap: 12px;
+          margin-bottom: 16px;
+          font-size: 14px;
+          color: var(--secondary-text-color);
+        }
+        .bulk-progress:empty {
+          display: none;
+        }
+        .vlist {
+          position: relative;
+          height: calc(100vh - 320px);
+          min-height: 320px;
+          overflow-y: auto;
+          contain: strict;
+        }
+        .vlist-row {
+          position: absolute;
+          top: 0;
+          left: 0;
+          right: 0;
+          box-sizing: border-box;
+          overflow: hidden;
+          will-change: transform;
+        }
+        .vlist-row .integration-header {
+          height: 68px;
+          box-sizing: border-box;
+          background: var(--card-background-color);
+          border-radius: 8px;
+          border-bottom: none;
+        }
+        .vlist-row .device-item {
+          margin-bottom: 0;
+        }
+        .vlist-row .entity-item {
+          height: 56px;
+          box-sizing: border-box;
+          margin: 0 0 0 60px;
+        }
       </style>
       
       <div class="header">
@@ -411,10 +635,16 @@ class EntityManagerPanel extends HTMLElement {
         <button class="btn btn-rename" id="rename-selected">
           Rename Selected (<span id="selected-count-3">0</span>)
         </button>
+        <button class="btn btn-secondary" id="hot-entities">Hot Entities</button>
         <button class="btn btn-secondary" id="refresh">Refresh</button>
       </div>
-      
-      <div id="content"></div>
+
+      <div class="bulk-progress" id="bulk-progress"></div>
+
+      <div id="message"></div>
+      <div class="vlist" id="content">
+        <div id="vlist-spacer"></div>
+      </div>
     `;
     
     this.appendChild(this.content);
@@ -422,7 +652,8 @@ class EntityManagerPanel extends HTMLElement {
     // Event listeners
     this.content.querySelector('#search-input').addEventListener('input', (e) => {
       this.searchTerm = e.target.value.toLowerCase();
-      this.updateView();
+      clearTimeout(this.searchTimer);
+      this.searchTimer = setTimeout(() => this.runSearch(), 150);
     });
     
     this.content.querySelector('#enable-selected').addEventListener('click', () => {
@@ -437,7 +668,12 @@ class EntityManagerPanel extends HTMLElement {
       this.openBulkRenameModal();
     });
 
+    this.content.querySelector('#hot-entities').addEventListener('click', () => {
+      this.openHotEntitiesModal();
+    });
+
     this.content.querySelector('#refresh').addEventListener('click', () => {
+      this.listings = {};
       this.loadData();
     });
 
@@ -446,15 +682,44 @@ class EntityManagerPanel extends HTMLElement {
         this.viewState = btn.dataset.filter;
         this.setActiveFilter();
         this.loadData();
+        this.runSearch();
       });
     });
 
+    // One delegated listener per event type for every row, rendered or not
+    const listEl = this.content.querySelector('#content');
+    listEl.addEventListener('click', (e) => this.handleListClick(e));
+    listEl.addEventListener('change', (e) => this.handleListChange(e));
+    listEl.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+    window.addEventListener('resize', () => this.scheduleRender());
+
     this.setActiveFilter();
   }
 
+  async runSearch() {
+    const query = this.searchTerm;
+    if (!query) {
+      this.updateView();
+      return;
+    }
+    try {
+      const result = await this.hass.callWS({
+        type: 'entity_manager/search',
+        query,
+        state: this.viewState,
+        limit: 1000,
+      });
+      // Ignore responses for queries the user has already typed past
+      if (query !== this.searchTerm) return;
+      this.searchMatches = new Set(result.hits.map(hit => hit.entity_id));
+      this.updateView();
+    } catch (err) {
+      console.error('Error searching entities:', err);
+    }
+  }
+
   updateView() {
     const statsEl = this.content.querySelector('#stats');
-    const contentEl = this.content.querySelector('#content');
     
     // Filter data based on search
     let filteredData = this.data;
@@ -462,11 +727,8 @@ class EntityManagerPanel extends HTMLElement {
       filteredData = this.data.map(integration => {
         const filteredDevices = {};
         Object.entries(integration.devices).forEach(([deviceId, device]) => {
-          const filteredEntities = device.entities.filter(entity => 
-            entity.entity_id.toLowerCase().includes(this.searchTerm) ||
-            (entity.original_name && entity.original_name.toLowerCase().includes(this.searchTerm)) ||
-            integration.integration.toLowerCase().includes(this.searchTerm) ||
-            (this.getDeviceName(deviceId).toLowerCase().includes(this.searchTerm))
+          const filteredEntities = device.entities.filter(entity =>
+            this.searchMatches.has(entity.entity_id)
           );
           
           if (filteredEntities.length > 0) {
@@ -496,45 +758,149 @@ class EntityManagerPanel extends HTMLElement {
       0,
     );
     
-    statsEl.innerHTML = `
-      <div class="stat-card">
-        <div class="stat-label">Integrations</div>
-        <div class="stat-value">${totalIntegrations}</div>
-      </div>
-      <div class="stat-card">
-        <div class="stat-label">Devices</div>
-        <div class="stat-value">${totalDevices}</div>
-      </div>
-      <div class="stat-card">
-        <div class="stat-label">Disabled Entities</div>
-        <div class="stat-value">${totalEntities}</div>
-      </div>
-      <div class="stat-card">
-        <div class="stat-label">Selected</div>
-        <div class="stat-value">${this.selectedEntities.size}</div>
-      </div>
-    `;
-    
-    // Update selected count in buttons
-    this.content.querySelector('#selected-count').textContent = this.selectedEntities.size;
-    this.content.querySelector('#selected-count-2').textContent = this.selectedEntities.size;
-    this.content.querySelector('#selected-count-3').textContent = this.selectedEntities.size;
-    
-    // Render integrations
-    if (filteredData.length === 0) {
-      contentEl.innerHTML = `
-        <div class="empty-state">
-          <h2>🎉 No disabled entities found</h2>
-          <p>All your entities are enabled, or they match your search criteria.</p>
+    if (!statsEl.firstElementChild) {
+      statsEl.innerHTML = `
+        <div class="stat-card">
+          <div class="stat-label">Integrations</div>
+          <div class="stat-value" id="stat-integrations"></div>
+        </div>
+        <div class="stat-card">
+          <div class="stat-label">Devices</div>
+          <div class="stat-value" id="stat-devices"></div>
+        </div>
+        <div class="stat-card">
+          <div class="stat-label">Disabled Entities</div>
+          <div class="stat-value" id="stat-entities"></div>
+        </div>
+        <div class="stat-card">
+          <div class="stat-label">Selected</div>
+          <div class="stat-value" id="stat-selected"></div>
         </div>
       `;
-      return;
     }
+    statsEl.querySelector('#stat-integrations').textContent = totalIntegrations;
+    statsEl.querySelector('#stat-devices').textContent = totalDevices;
+    statsEl.querySelector('#stat-entities').textContent = totalEntities;
+    this.updateSelectedCount();
     
-    contentEl.innerHTML = filteredData.map(integration => this.renderIntegration(integration)).join('');
+    const messageEl = this.content.querySelector('#message');
+    messageEl.innerHTML = filteredData.length === 0 ? `
+      <div class="empty-state">
+        <h2>🎉 No disabled entities found</h2>
+        <p>All your entities are enabled, or they match your search criteria.</p>
+      </div>
+    ` : '';
     
-    // Attach event listeners
-    this.attachEventListeners();
+    this.buildRows(filteredData);
+    this.renderRows();
+  }
+
+  updateSelectedCount() {
+    const count = this.selectedEntities.size;
+    this.content.querySelector('#stat-selected').textContent = count;
+    this.content.querySelector('#selected-count').textContent = count;
+    this.content.querySelector('#selected-count-2').textContent = count;
+    this.content.querySelector('#selected-count-3').textContent = count;
+  }
+
+  buildRows(filteredData) {
+    // Flatten the expanded part of the tree into fixed-height rows
+    const rows = [];
+    filteredData.forEach(integration => {
+      rows.push({ type: 'integration', key: `i:${integration.integration}`, integration });
+      if (!this.expandedIntegrations.has(integration.integration)) return;
+      Object.entries(integration.devices).forEach(([deviceId, device]) => {
+        rows.push({
+          type: 'device',
+          key: `d:${integration.integration}:${deviceId}`,
+          deviceId,
+          device,
+          integrationName: integration.integration,
+        });
+        if (!this.expandedDevices.has(deviceId)) return;
+        device.entities.forEach(entity => {
+          rows.push({ type: 'entity', key: `e:${entity.entity_id}`, entity });
+        });
+      });
+    });
+
+    const offsets = new Float64Array(rows.length + 1);
+    rows.forEach((row, i) => {
+      offsets[i + 1] = offsets[i] + ROW_HEIGHTS[row.type];
+    });
+    this.rows = rows;
+    this.rowOffsets = offsets;
+    this.content.querySelector('#vlist-spacer').style.height = `${offsets[rows.length]}px`;
+  }
+
+  scheduleRender() {
+    if (this.renderFrame !== null) return;
+    this.renderFrame = requestAnimationFrame(() => {
+      this.renderFrame = null;
+      this.renderRows();
+    });
+  }
+
+  rowAt(offset) {
+    // Index of the row containing a vertical offset
+    const offsets = this.rowOffsets;
+    let low = 0;
+    let high = this.rows.length;
+    while (low < high) {
+      const mid = (low + high) >> 1;
+      if (offsets[mid + 1] <= offset) {
+        low = mid + 1;
+      } else {
+        high = mid;
+      }
+    }
+    return low;
+  }
+
+  renderRows() {
+    // Render the rows in and near the viewport. Rows already in the DOM are
+    // kept and only rewritten when their markup changed; rows scrolled out
+    // are removed.
+    const listEl = this.content.querySelector('#content');
+    const top = listEl.scrollTop;
+    const start = Math.max(0, this.rowAt(top) - OVERSCAN_ROWS);
+    const end = Math.min(this.rows.length, this.rowAt(top + listEl.clientHeight) + OVERSCAN_ROWS + 1);
+
+    const rendered = new Map();
+    for (let i = start; i < end; i++) {
+      const row = this.rows[i];
+      let entry = this.renderedRows.get(row.key);
+      if (entry) {
+        this.renderedRows.delete(row.key);
+      } else {
+        const el = document.createElement('div');
+        el.className = 'vlist-row';
+        listEl.appendChild(el);
+        entry = { el, html: null, top: null, type: null };
+      }
+      const html = this.renderRow(row);
+      if (entry.html !== html) {
+        entry.el.innerHTML = html;
+        entry.html = html;
+      }
+      if (entry.top !== this.rowOffsets[i]) {
+        entry.el.style.transform = `translateY(${this.rowOffsets[i]}px)`;
+        entry.top = this.rowOffsets[i];
+      }
+      if (entry.type !== row.type) {
+        entry.el.style.height = `${ROW_HEIGHTS[row.type]}px`;
+        entry.type = row.type;
+      }
+      rendered.set(row.key, entry);
+    }
+    this.renderedRows.forEach(entry => entry.el.remove());
+    this.renderedRows = rendered;
+  }
+
+  renderRow(row) {
+    if (row.type === 'integration') return this.renderIntegration(row.integration);
+    if (row.type === 'device') return this.renderDevice(row.deviceId, row.device, row.integrationName);
+    return this.renderEntity(row.entity);
   }
 
   renderIntegration(integration) {
@@ -548,29 +914,20 @@ class EntityManagerPanel extends HTMLElement {
     const totalCount = integration.total_entities ?? shownEntities;
     
     return `
-      <div class="integration-group">
-        <div class="integration-header" data-integration="${integration.integration}">
-          <div class="integration-icon ${isExpanded ? 'expanded' : ''}">▶</div>
-          <div class="integration-info">
-            <div class="integration-name">${integration.integration}</div>
-            <div class="integration-stats">
-              ${deviceCount} device${deviceCount !== 1 ? 's' : ''} • 
-              ${shownEntities} shown • ${disabledCount} disabled • ${totalCount} total
-            </div>
-          </div>
-          <div class="integration-actions">
-            <button class="btn btn-primary" data-action="enable-integration" data-integration="${integration.integration}">
-              Enable All
-            </button>
+      <div class="integration-header" data-integration="${integration.integration}">
+        <div class="integration-icon ${isExpanded ? 'expanded' : ''}">▶</div>
+        <div class="integration-info">
+          <div class="integration-name">${integration.integration}</div>
+          <div class="integration-stats">
+            ${deviceCount} device${deviceCount !== 1 ? 's' : ''} • 
+            ${shownEntities} shown • ${disabledCount} disabled • ${totalCount} total
           </div>
         </div>
-        ${isExpanded ? `
-          <div class="device-list">
-            ${Object.entries(integration.devices).map(([deviceId, device]) => 
-              this.renderDevice(deviceId, device, integration.integration)
-            ).join('')}
-          </div>
-        ` : ''}
+        <div class="integration-actions">
+          <button class="btn btn-primary" data-action="enable-integration" data-integration="${integration.integration}">
+            Enable All
+          </button>
+        </div>
       </div>
     `;
   }
@@ -588,15 +945,10 @@ class EntityManagerPanel extends HTMLElement {
           <div class="integration-icon ${isExpanded ? 'expanded' : ''}">▶</div>
           <div class="device-name">${deviceName}</div>
           <div class="device-count">${entityCount} shown • ${disabledCount} disabled • ${totalCount} total</div>
-          <button class="btn btn-primary" data-action="enable-device" data-device="${deviceId}">
+          <button class="btn btn-primary" data-action="enable-device" data-device="${deviceId}" data-integration="${integrationName}">
             Enable All
           </button>
         </div>
-        ${isExpanded ? `
-          <div class="entity-list">
-            ${device.entities.map(entity => this.renderEntity(entity)).join('')}
-          </div>
-        ` : ''}
       </div>
     `;
   }
@@ -640,74 +992,64 @@ class EntityManagerPanel extends HTMLElement {
       return '(No Device)';
     }
     const device = this.deviceInfo[deviceId];
-    return device ? (device.name_by_user || device.name || deviceId) : deviceId;
+    return (device && device.name) || deviceId;
   }
 
-  attachEventListeners() {
-    // Integration toggle
-    this.content.querySelectorAll('[data-integration]').forEach(el => {
-      if (el.classList.contains('integration-header')) {
-        el.addEventListener('click', (e) => {
-          if (e.target.closest('button')) return;
-          const integration = el.dataset.integration;
-          if (this.expandedIntegrations.has(integration)) {
-            this.expandedIntegrations.delete(integration);
-          } else {
-            this.expandedIntegrations.add(integration);
-          }
-          this.updateView();
-        });
+  handleListClick(e) {
+    const btn = e.target.closest('[data-action]');
+    if (btn) {
+      e.stopPropagation();
+      const action = btn.dataset.action;
+      
+      if (action === 'enable-entity') {
+        this.enableEntity(btn.dataset.entity);
+      } else if (action === 'enable-device') {
+        this.enableDevice(btn.dataset.device, btn.dataset.integration);
+      } else if (action === 'enable-integration') {
+        this.enableIntegration(btn.dataset.integration);
+      } else if (action === 'disable-entity') {
+        this.disableEntity(btn.dataset.entity);
+      } else if (action === 'rename-entity') {
+        this.openSingleRenameModal(btn.dataset.entity);
       }
-    });
-    
-    // Device toggle
-    this.content.querySelectorAll('[data-device]').forEach(el => {
-      if (el.classList.contains('device-header')) {
-        el.addEventListener('click', (e) => {
-          if (e.target.closest('button')) return;
-          const deviceId = el.dataset.device;
-          if (this.expandedDevices.has(deviceId)) {
-            this.expandedDevices.delete(deviceId);
-          } else {
-            this.expandedDevices.add(deviceId);
-          }
-          this.updateView();
-        });
+      return;
+    }
+
+    // Integration and device toggles
+    const integrationHeader = e.target.closest('.integration-header');
+    if (integrationHeader) {
+      const integration = integrationHeader.dataset.integration;
+      if (this.expandedIntegrations.has(integration)) {
+        this.expandedIntegrations.delete(integration);
+      } else {
+        this.expandedIntegrations.add(integration);
       }
-    });
-    
-    // Entity checkboxes
-    this.content.querySelectorAll('.entity-checkbox').forEach(checkbox => {
-      checkbox.addEventListener('change', (e) => {
-        const entityId = e.target.dataset.entity;
-        if (e.target.checked) {
-          this.selectedEntities.add(entityId);
-        } else {
-          this.selectedEntities.delete(entityId);
-        }
-        this.updateView();
-      });
-    });
-    
-    // Action buttons
-    this.content.querySelectorAll('[data-action]').forEach(btn => {
-      btn.addEventListener('click', async (e) => {
-        e.stopPropagation();
-        const action = btn.dataset.action;
-        
-        if (action === 'enable-entity') {
-          await this.enableEntity(btn.dataset.entity);
-        } else if (action === 'enable-device') {
-          await this.enableDevice(btn.dataset.device);
-        } else if (action === 'enable-integration') {
-          await this.enableIntegration(btn.dataset.integration);
-        } else if (action === 'disable-entity') {
-          await this.disableEntity(btn.dataset.entity);
-        } else if (action === 'rename-entity') {
-          this.openSingleRenameModal(btn.dataset.entity);
-        }
-      });
-    });
+      this.updateView();
+      return;
+    }
+    const deviceHeader = e.target.closest('.device-header');
+    if (deviceHeader) {
+      const deviceId = deviceHeader.dataset.device;
+      if (this.expandedDevices.has(deviceId)) {
+        this.expandedDevices.delete(deviceId);
+      } else {
+        this.expandedDevices.add(deviceId);
+      }
+      this.updateView();
+    }
+  }
+
+  handleListChange(e) {
+    // Entity checkboxes; the checkbox already shows its state, so only the
+    // counters change
+    if (!e.target.classList.contains('entity-checkbox')) return;
+    const entityId = e.target.dataset.entity;
+    if (e.target.checked) {
+      this.selectedEntities.add(entityId);
+    } else {
+      this.selectedEntities.delete(entityId);
+    }
+    this.updateSelectedCount();
   }
 
   async enableEntity(entityId) {
@@ -717,33 +1059,36 @@ class EntityManagerPanel extends HTMLElement {
         entity_id: entityId,
       });
       this.selectedEntities.delete(entityId);
-      await this.loadData();
+      this.updateView();
     } catch (err) {
       console.error('Error enabling entity:', err);
       alert(`Failed to enable ${entityId}: ${err.message}`);
     }
   }
 
-  async enableDevice(deviceId) {
-    const integration = this.data.find(int => int.devices[deviceId]);
-    if (!integration) return;
-    
-    const entityIds = integration.devices[deviceId].entities.map(e => e.entity_id);
-    await this.bulkEnableEntities(entityIds);
+  async enableDevice(deviceId, integrationName) {
+    // Entities without device are grouped per integration
+    const entities = deviceId === 'no_device'
+      ? (await this.fetchScope('integration', { integration: integrationName }))
+        .filter(entity => entity.device_id === null)
+      : await this.fetchScope('device', { device_id: deviceId });
+    await this.bulkEnableEntities(entities.map(entity => entity.entity_id));
   }
 
   async enableIntegration(integrationName) {
-    const integration = this.data.find(int => int.integration === integrationName);
-    if (!integration) return;
-    
-    const entityIds = [];
-    Object.values(integration.devices).forEach(device => {
-      device.entities.forEach(entity => {
-        entityIds.push(entity.entity_id);
-      });
+    const entities = await this.fetchScope('integration', { integration: integrationName });
+    await this.bulkEnableEntities(entities.map(entity => entity.entity_id));
+  }
+
+  async fetchScope(scope, params) {
+    // Disabled entities of one integration/device, answered from the
+    // server's hash indexes instead of walking the listing
+    const result = await this.hass.callWS({
+      type: `entity_manager/by_${scope}`,
+      state: 'disabled',
+      ...params,
     });
-    
-    await this.bulkEnableEntities(entityIds);
+    return result.entities;
   }
 
   async bulkEnable() {
@@ -762,16 +1107,13 @@ class EntityManagerPanel extends HTMLElement {
     }
     
     try {
-      const result = await this.hass.callWS({
-        type: 'entity_manager/bulk_disable',
-        entity_ids: Array.from(this.selectedEntities),
-      });
-      
+      const result = await this.runBulkJob('disable', Array.from(this.selectedEntities));
+
       this.selectedEntities.clear();
-      await this.loadData();
-      
-      if (result.failed.length > 0) {
-        alert(`Disabled ${result.success.length} entities. Failed: ${result.failed.length}`);
+      this.updateView();
+
+      if (result.failed > 0) {
+        alert(`Disabled ${result.done} entities. Failed: ${result.failed}`);
       }
     } catch (err) {
       console.error('Error bulk disabling:', err);
@@ -781,16 +1123,13 @@ class EntityManagerPanel extends HTMLElement {
 
   async bulkEnableEntities(entityIds) {
     try {
-      const result = await this.hass.callWS({
-        type: 'entity_manager/bulk_enable',
-        entity_ids: entityIds,
-      });
-      
+      const result = await this.runBulkJob('enable', entityIds);
+
       entityIds.forEach(id => this.selectedEntities.delete(id));
-      await this.loadData();
-      
-      if (result.failed.length > 0) {
-        alert(`Enabled ${result.success.length} entities. Failed: ${result.failed.length}`);
+      this.updateView();
+
+      if (result.failed > 0) {
+        alert(`Enabled ${result.done} entities. Failed: ${result.failed}`);
       }
     } catch (err) {
       console.error('Error bulk enabling:', err);
@@ -798,6 +1137,58 @@ class EntityManagerPanel extends HTMLElement {
     }
   }
 
+  runBulkJob(action, entityIds) {
+    // Streams chunk progress; resolves with the last progress event.
+    // Cancelling unsubscribes, which stops the job between chunks.
+    const progressEl = this.content.querySelector('#bulk-progress');
+    return new Promise((resolve, reject) => {
+      let unsubscribe = null;
+      let lastEvent = { done: 0, failed: 0, remaining: entityIds.length };
+      let settled = false;
+
+      const finish = (cancelled) => {
+        if (settled) return;
+        settled = true;
+        progressEl.innerHTML = '';
+        if (unsubscribe) unsubscribe();
+        resolve({ ...lastEvent, cancelled });
+      };
+
+      const render = () => {
+        const label = action === 'enable' ? 'Enabling' : 'Disabling';
+        progressEl.innerHTML = `
+          <span>${label}: ${lastEvent.done} done • ${lastEvent.failed} failed • ${lastEvent.remaining} remaining</span>
+          <button class="btn btn-secondary" id="bulk-cancel">Cancel</button>
+        `;
+        progressEl.querySelector('#bulk-cancel').addEventListener('click', () => finish(true));
+      };
+      render();
+
+      this.hass.connection.subscribeMessage(
+        (event) => {
+          lastEvent = event;
+          if (event.finished) {
+            finish(false);
+          } else {
+            render();
+          }
+        },
+        {
+          type: 'entity_manager/bulk_job',
+          action,
+          entity_ids: entityIds,
+        },
+      ).then((unsub) => {
+        unsubscribe = unsub;
+        if (settled) unsub();
+      }).catch((err) => {
+        settled = true;
+        progressEl.innerHTML = '';
+        reject(err);
+      });
+    });
+  }
+
   async disableEntity(entityId) {
     try {
       await this.hass.callWS({
@@ -805,7 +1196,7 @@ class EntityManagerPanel extends HTMLElement {
         entity_id: entityId,
       });
       this.selectedEntities.delete(entityId);
-      await this.loadData();
+      this.updateView();
     } catch (err) {
       console.error('Error disabling entity:', err);
       alert(`Failed to disable ${entityId}: ${err.message}`);
@@ -815,13 +1206,7 @@ class EntityManagerPanel extends HTMLElement {
   // --- Rename methods ---
 
   findEntityData(entityId) {
-    for (const integration of this.data) {
-      for (const device of Object.values(integration.devices)) {
-        const entity = device.entities.find(e => e.entity_id === entityId);
-        if (entity) return entity;
-      }
-    }
-    return null;
+    return this.entityMap.get(entityId) || null;
   }
 
   openSingleRenameModal(entityId) {
@@ -873,7 +1258,7 @@ class EntityManagerPanel extends HTMLElement {
 
         await this.hass.callWS(params);
         resultEl.innerHTML = '<div class="rename-result success">Renamed successfully.</div>';
-        setTimeout(() => { overlay.remove(); this.loadData(); }, 800);
+        setTimeout(() => overlay.remove(), 800);
       } catch (err) {
         resultEl.innerHTML = `<div class="rename-result error">Error: ${err.message}</div>`;
       }
@@ -908,6 +1293,14 @@ class EntityManagerPanel extends HTMLElement {
           <label>Replace with</label>
           <input type="text" id="bulk-rename-replace" placeholder="Replacement text..." />
         </div>
+        <div class="modal-options">
+          <label><input type="checkbox" id="bulk-rename-regex" /> Regular expression</label>
+          <label><input type="checkbox" id="bulk-rename-template" /> Template tokens</label>
+          <label><input type="checkbox" id="bulk-rename-ignore-case" /> Ignore case</label>
+        </div>
+        <div class="modal-hint">
+          Regex replacements may use groups (\\1). Templates may use {device}, {area}, {name}, {original_name}, {domain}, {object_id} and {platform}; an empty Find replaces the whole value.
+        </div>
         <button class="btn btn-secondary" id="bulk-rename-preview">Preview Changes</button>
         <div id="bulk-rename-preview-list"></div>
         <div id="bulk-rename-result"></div>
@@ -927,14 +1320,18 @@ class EntityManagerPanel extends HTMLElement {
       this.renderBulkRenamePreview(overlay, selectedIds);
     });
 
-    // Also update preview on input change
-    ['#bulk-rename-find', '#bulk-rename-replace', '#bulk-rename-target'].forEach(sel => {
-      overlay.querySelector(sel).addEventListener('input', () => {
-        this.renderBulkRenamePreview(overlay, selectedIds);
-      });
-      overlay.querySelector(sel).addEventListener('change', () => {
-        this.renderBulkRenamePreview(overlay, selectedIds);
-      });
+    // Also update preview on input change, debounced to one server round trip
+    let previewTimer = null;
+    const schedulePreview = () => {
+      clearTimeout(previewTimer);
+      previewTimer = setTimeout(() => this.renderBulkRenamePreview(overlay, selectedIds), 250);
+    };
+    [
+      '#bulk-rename-find', '#bulk-rename-replace', '#bulk-rename-target',
+      '#bulk-rename-regex', '#bulk-rename-template', '#bulk-rename-ignore-case',
+    ].forEach(sel => {
+      overlay.querySelector(sel).addEventListener('input', schedulePreview);
+      overlay.querySelector(sel).addEventListener('change', schedulePreview);
     });
 
     overlay.querySelector('#bulk-rename-apply').addEventListener('click', async () => {
@@ -942,68 +1339,79 @@ class EntityManagerPanel extends HTMLElement {
     });
   }
 
-  renderBulkRenamePreview(overlay, selectedIds) {
-    const target = overlay.querySelector('#bulk-rename-target').value;
-    const findStr = overlay.querySelector('#bulk-rename-find').value;
-    const replaceStr = overlay.querySelector('#bulk-rename-replace').value;
+  getBulkRenameRule(overlay) {
+    return {
+      target: overlay.querySelector('#bulk-rename-target').value,
+      find: overlay.querySelector('#bulk-rename-find').value,
+      replace: overlay.querySelector('#bulk-rename-replace').value,
+      regex: overlay.querySelector('#bulk-rename-regex').checked,
+      template: overlay.querySelector('#bulk-rename-template').checked,
+      ignore_case: overlay.querySelector('#bulk-rename-ignore-case').checked,
+    };
+  }
+
+  async renderBulkRenamePreview(overlay, selectedIds) {
+    const rule = this.getBulkRenameRule(overlay);
     const previewEl = overlay.querySelector('#bulk-rename-preview-list');
     const applyBtn = overlay.querySelector('#bulk-rename-apply');
 
-    if (!findStr) {
+    if (!rule.find && !rule.template) {
       previewEl.innerHTML = '';
       applyBtn.disabled = true;
       return;
     }
 
-    let matchCount = 0;
-    const items = selectedIds.map(entityId => {
-      const entity = this.findEntityData(entityId);
-
-      if (target === 'name') {
-        const currentName = entity
-          ? (entity.name || entity.original_name || entityId.split('.')[1].replace(/_/g, ' '))
-          : entityId.split('.')[1].replace(/_/g, ' ');
-        if (currentName.includes(findStr)) {
-          const newName = currentName.replace(findStr, replaceStr);
-          matchCount++;
-          return `<div class="preview-item">
-            <div><strong>${entityId}</strong></div>
-            <div><span class="preview-old">${this.escapeHtml(currentName)}</span></div>
-            <div><span class="preview-new">${this.escapeHtml(newName)}</span></div>
-          </div>`;
-        }
-        return `<div class="preview-item preview-skip">${entityId} — no match</div>`;
-      } else {
-        // Only replace within the object_id (after domain.)
-        const dotIdx = entityId.indexOf('.');
-        const domain = entityId.substring(0, dotIdx);
-        const objectId = entityId.substring(dotIdx + 1);
-        if (objectId.includes(findStr)) {
-          const newObjectId = objectId.replace(findStr, replaceStr);
-          const newId = `${domain}.${newObjectId}`;
-          matchCount++;
-          return `<div class="preview-item">
-            <div><span class="preview-old">${this.escapeHtml(entityId)}</span></div>
-            <div><span class="preview-new">${this.escapeHtml(newId)}</span></div>
-          </div>`;
-        }
-        return `<div class="preview-item preview-skip">${entityId} — no match</div>`;
+    // Drop responses of superseded previews
+    const request = (this.bulkRenamePreviewRequest || 0) + 1;
+    this.bulkRenamePreviewRequest = request;
+
+    let result;
+    try {
+      result = await this.hass.callWS({
+        type: 'entity_manager/bulk_rename_preview',
+        entity_ids: selectedIds,
+        ...rule,
+        limit: 200,
+      });
+    } catch (err) {
+      if (request !== this.bulkRenamePreviewRequest) return;
+      previewEl.innerHTML = `<div class="rename-result error">${this.escapeHtml(err.message)}</div>`;
+      applyBtn.disabled = true;
+      return;
+    }
+    if (request !== this.bulkRenamePreviewRequest) return;
+
+    const items = result.changes.map(change => {
+      if (rule.target === 'name') {
+        return `<div class="preview-item">
+          <div><strong>${change.entity_id}</strong></div>
+          <div><span class="preview-old">${this.escapeHtml(change.before)}</span></div>
+          <div><span class="preview-new">${this.escapeHtml(change.after)}</span></div>
+        </div>`;
       }
+      return `<div class="preview-item">
+        <div><span class="preview-old">${this.escapeHtml(change.before)}</span></div>
+        <div><span class="preview-new">${this.escapeHtml(change.after)}</span></div>
+      </div>`;
     });
+    if (result.total > result.changes.length) {
+      items.push(`<div class="preview-item preview-skip">…and ${result.total - result.changes.length} more</div>`);
+    }
+    const conflicts = [...result.collisions, ...result.failed].map(item =>
+      `<div class="preview-item preview-skip">${this.escapeHtml(item.entity_id)} — ${this.escapeHtml(item.error)}</div>`
+    );
 
     previewEl.innerHTML = `
       <div style="margin: 12px 0 4px; font-size: 13px; color: var(--secondary-text-color);">
-        ${matchCount} of ${selectedIds.length} entities will be renamed
+        ${result.total} of ${selectedIds.length} entities will be renamed${conflicts.length ? `, ${conflicts.length} cannot be` : ''}
       </div>
-      <div class="preview-list">${items.join('')}</div>
+      <div class="preview-list">${items.join('')}${conflicts.join('')}</div>
     `;
-    applyBtn.disabled = matchCount === 0;
+    applyBtn.disabled = result.total === 0;
   }
 
   async executeBulkRename(overlay, selectedIds) {
-    const target = overlay.querySelector('#bulk-rename-target').value;
-    const findStr = overlay.querySelector('#bulk-rename-find').value;
-    const replaceStr = overlay.querySelector('#bulk-rename-replace').value;
+    const rule = this.getBulkRenameRule(overlay);
     const resultEl = overlay.querySelector('#bulk-rename-result');
     const applyBtn = overlay.querySelector('#bulk-rename-apply');
 
@@ -1014,9 +1422,7 @@ class EntityManagerPanel extends HTMLElement {
       const result = await this.hass.callWS({
         type: 'entity_manager/bulk_rename',
         entity_ids: selectedIds,
-        find: findStr,
-        replace: replaceStr,
-        target: target,
+        ...rule,
       });
 
       const successCount = result.success.length;
@@ -1032,7 +1438,8 @@ class EntityManagerPanel extends HTMLElement {
 
       if (successCount > 0) {
         this.selectedEntities.clear();
-        setTimeout(() => { overlay.remove(); this.loadData(); }, 1200);
+        this.updateView();
+        setTimeout(() => overlay.remove(), 1200);
       } else {
         applyBtn.disabled = false;
         applyBtn.textContent = 'Apply Rename';
@@ -1044,6 +1451,119 @@ class EntityManagerPanel extends HTMLElement {
     }
   }
 
+  // --- Hot entity profiler ---
+
+  openHotEntitiesModal() {
+    const overlay = document.createElement('div');
+    overlay.className = 'modal-overlay';
+    overlay.innerHTML = `
+      <div class="modal">
+        <h2>Hot Entities</h2>
+        <div class="modal-hint">
+          Entities with the most state changes in the last hour. Counting runs until it is stopped, also across restarts.
+        </div>
+        <button class="btn btn-secondary" id="hot-toggle"></button>
+        <div id="hot-list"></div>
+        <div id="hot-result"></div>
+        <div class="modal-actions">
+          <button class="btn btn-secondary" id="hot-close">Close</button>
+          <button class="btn btn-secondary" id="hot-disable" disabled>Disable Selected</button>
+        </div>
+      </div>
+    `;
+
+    this.appendChild(overlay);
+
+    overlay.querySelector('#hot-close').addEventListener('click', () => overlay.remove());
+    overlay.addEventListener('click', (e) => { if (e.target === overlay) overlay.remove(); });
+
+    overlay.querySelector('#hot-toggle').addEventListener('click', async () => {
+      try {
+        await this.hass.callWS({
+          type: 'entity_manager/profiler',
+          enabled: !this.hotEntitiesEnabled,
+        });
+      } catch (err) {
+        overlay.querySelector('#hot-result').innerHTML =
+          `<div class="rename-result error">Error: ${this.escapeHtml(err.message)}</div>`;
+      }
+      this.renderHotEntities(overlay);
+    });
+
+    overlay.querySelector('#hot-disable').addEventListener('click', async () => {
+      const entityIds = Array.from(overlay.querySelectorAll('[data-hot-entity]:checked'))
+        .map(el => el.dataset.hotEntity);
+      const resultEl = overlay.querySelector('#hot-result');
+      try {
+        const result = await this.runBulkJob('disable', entityIds);
+        resultEl.innerHTML = `<div class="rename-result ${result.failed ? 'error' : 'success'}">
+          Disabled ${result.done} entities.${result.failed ? ` Failed: ${result.failed}.` : ''}
+        </div>`;
+      } catch (err) {
+        resultEl.innerHTML = `<div class="rename-result error">Error: ${this.escapeHtml(err.message)}</div>`;
+      }
+      this.renderHotEntities(overlay);
+    });
+
+    this.renderHotEntities(overlay);
+  }
+
+  async renderHotEntities(overlay) {
+    const listEl = overlay.querySelector('#hot-list');
+    const toggleBtn = overlay.querySelector('#hot-toggle');
+    const disableBtn = overlay.querySelector('#hot-disable');
+
+    let result;
+    try {
+      result = await this.hass.callWS({ type: 'entity_manager/hot_entities', limit: 50 });
+    } catch (err) {
+      listEl.innerHTML = `<div class="rename-result error">${this.escapeHtml(err.message)}</div>`;
+      return;
+    }
+
+    this.hotEntitiesEnabled = result.enabled;
+    toggleBtn.textContent = result.enabled ? 'Stop Counting' : 'Start Counting';
+
+    if (!result.entities.length) {
+      listEl.innerHTML = `<div class="modal-hint">${
+        result.enabled ? 'No state changes counted yet.' : 'Counting is stopped.'
+      }</div>`;
+      disableBtn.disabled = true;
+      return;
+    }
+
+    const minutes = Math.max(1, Math.round(result.window_seconds / 60));
+    const items = result.entities.map(entity => {
+      // Only registered, enabled entities can be disabled
+      const selectable = entity.registered && !entity.is_disabled;
+      const where = [entity.platform, entity.device, entity.area].filter(Boolean)
+        .map(part => this.escapeHtml(part)).join(' • ');
+      const approx = entity.error ? '~' : '';
+      return `<div class="preview-item${selectable ? '' : ' preview-skip'}">
+        <label>
+          <input type="checkbox" data-hot-entity="${entity.entity_id}" ${selectable ? '' : 'disabled'} />
+          <strong>${entity.entity_id}</strong>
+        </label>
+        <div>${approx}${entity.count} changes • ${entity.per_minute}/min${where ? ` • ${where}` : ''}</div>
+      </div>`;
+    });
+
+    listEl.innerHTML = `
+      <div style="margin: 12px 0 4px; font-size: 13px; color: var(--secondary-text-color);">
+        ${result.events} state changes in the last ${minutes} min
+      </div>
+      <div class="preview-list">${items.join('')}</div>
+    `;
+
+    const updateDisable = () => {
+      disableBtn.disabled = !listEl.querySelector('[data-hot-entity]:checked');
+    };
+    listEl.querySelectorAll('[data-hot-entity]').forEach(el => {
+      el.addEventListener('change', updateDisable);
+    });
+    updateDisable();
+  }
+
   escapeHtml(str) {
     const div = document.createElement('div');
     div.textContent = str;
@@ -1057,8 +1577,10 @@ class EntityManagerPanel extends HTMLElement {
   }
 
   showError(message) {
-    const contentEl = this.content.querySelector('#content');
-    contentEl.innerHTML = `
+    this.buildRows([]);
+    this.renderRows();
+    const messageEl = this.content.querySelector('#message');
+    messageEl.innerHTML = `
       <div class="empty-state">
         <h2>⚠️ Error</h2>
         <p>${message}</p>
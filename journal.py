@@ -0,0 +1,186 @@
+"""Operation journal and undo of Entity Manager registry changes."""
+import time
+from collections import deque
+from enum import Enum
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+
+from .transaction import inverse_changes
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "entity_manager.journal"
+
+# Seconds journal changes are batched before they are written
+SAVE_DELAY = 30
+
+# Operations kept, and entity changes kept across them; the oldest go first
+JOURNAL_SIZE = 50
+JOURNAL_MAX_CHANGES = 50000
+
+# Registry fields stored as the value of their enum
+ENUM_FIELDS: dict[str, type[Enum]] = {
+    "disabled_by": er.RegistryEntryDisabler,
+    "hidden_by": er.RegistryEntryHider,
+}
+
+
+def _encode(values: dict[str, Any]) -> dict[str, Any]:
+    """Return record values with enums replaced by their values."""
+    return {key: value.value if isinstance(value, Enum) else value for key, value in values.items()}
+
+
+def _decode(values: dict[str, Any]) -> dict[str, Any]:
+    """Return stored record values with their enums restored."""
+    return {
+        key: ENUM_FIELDS[key](value) if key in ENUM_FIELDS and value is not None else value
+        for key, value in values.items()
+    }
+
+
+class OperationJournal:
+    """Append-only ring of the registry changes made through Entity Manager.
+
+    Each operation stores the before/after records of the transaction that
+    applied it as compact [entity_id, before, after] lists. Undoing an
+    operation replays the inverse records in reverse order, so entity ID
+    chains and swaps unwind through the same steps, and is journaled as an
+    operation of its own. The oldest operations are dropped once the ring
+    holds too many operations or changes. The ring is persisted with a Store.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        size: int = JOURNAL_SIZE,
+        max_changes: int = JOURNAL_MAX_CHANGES,
+    ) -> None:
+        """Initialize an empty journal."""
+        self.hass = hass
+        self._size = size
+        self._max_changes = max_changes
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._operations: deque[dict[str, Any]] = deque()
+        self._changes = 0
+        self._next_id = 1
+
+    async def async_load(self) -> None:
+        """Load the persisted journal."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._operations = deque(data["operations"])
+        self._changes = sum(len(operation["changes"]) for operation in self._operations)
+        self._next_id = data["next_id"]
+
+    @callback
+    def async_record(
+        self,
+        command: str,
+        records: list[dict[str, Any]],
+        undoes: dict[str, Any] | None = None,
+    ) -> int | None:
+        """Append the applied records of a transaction; return the operation ID.
+
+        Nothing is journaled, and None is returned, when nothing changed.
+        When the records undo an operation it is marked undone; undoing an
+        undo makes the operation it undid undoable again.
+        """
+        changes = [
+            [record["entity_id"], _encode(record["before"]), _encode(record["after"])]
+            for record in records
+            if record["before"] != record["after"]
+        ]
+        if not changes:
+            return None
+        operation_id = self._next_id
+        self._next_id += 1
+        self._operations.append(
+            {
+                "id": operation_id,
+                "time": time.time(),
+                "command": command,
+                "changes": changes,
+                "undoes": undoes["id"] if undoes else None,
+                "undone_by": None,
+            }
+        )
+        self._changes += len(changes)
+        if undoes is not None:
+            undoes["undone_by"] = operation_id
+            if (redone := self.async_get(undoes["undoes"])) is not None:
+                redone["undone_by"] = None
+        while len(self._operations) > 1 and (
+            len(self._operations) > self._size or self._changes > self._max_changes
+        ):
+            self._changes -= len(self._operations.popleft()["changes"])
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return operation_id
+
+    @callback
+    def async_operations(self) -> list[dict[str, Any]]:
+        """Return a summary of the journaled operations, newest first."""
+        return [
+            {
+                "id": operation["id"],
+                "time": operation["time"],
+                "command": operation["command"],
+                "entities": len(operation["changes"]),
+                "undoes": operation["undoes"],
+                "undone_by": operation["undone_by"],
+            }
+            for operation in reversed(self._operations)
+        ]
+
+    @callback
+    def async_get(self, operation_id: int | None) -> dict[str, Any] | None:
+        """Return a journaled operation by ID."""
+        if operation_id is None:
+            return None
+        for operation in reversed(self._operations):
+            if operation["id"] == operation_id:
+                return operation
+        return None
+
+    @callback
+    def async_latest(self) -> dict[str, Any] | None:
+        """Return the newest operation that is neither undone nor an undo."""
+        for operation in reversed(self._operations):
+            if operation["undone_by"] is None and operation["undoes"] is None:
+                return operation
+        return None
+
+    @callback
+    def async_inverse(
+        self, operation: dict[str, Any]
+    ) -> tuple[list[tuple[str, dict[str, Any]]], list[dict[str, str]]]:
+        """Return the (entity_id, changes) that revert an operation, in order.
+
+        Entities changed again since the operation are left alone and
+        reported as skipped, as are entities that no longer exist.
+        """
+        entity_reg = er.async_get(self.hass)
+        inverse: list[tuple[str, dict[str, Any]]] = []
+        skipped: list[dict[str, str]] = []
+        for entity_id, before, after in reversed(operation["changes"]):
+            current_id = after.get("entity_id", entity_id)
+            if (entry := entity_reg.async_get(current_id)) is None:
+                skipped.append({"entity_id": current_id, "error": "Entity not found"})
+                continue
+            after = _decode(after)
+            if any(
+                getattr(entry, key) != value for key, value in after.items() if key != "entity_id"
+            ):
+                skipped.append({"entity_id": current_id, "error": "Changed since"})
+                continue
+            inverse.append(
+                inverse_changes(
+                    {"entity_id": entity_id, "before": _decode(before), "after": after}
+                )
+            )
+        return inverse, skipped
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the journal to persist."""
+        return {"next_id": self._next_id, "operations": list(self._operations)}
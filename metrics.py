@@ -0,0 +1,21 @@
+"""Per-command metrics for Entity Manager.
+
+Kept in the services package, which is also installed on its own.
+"""
+from .custom_components.entity_manager.metrics import (
+    LATENCY_BUCKETS_MS,
+    CommandStats,
+    Metrics,
+    metered_command,
+    metered_intent,
+    metered_service,
+)
+
+__all__ = [
+    "LATENCY_BUCKETS_MS",
+    "CommandStats",
+    "Metrics",
+    "metered_command",
+    "metered_intent",
+    "metered_service",
+]
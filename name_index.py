@@ -0,0 +1,376 @@
+"""Spoken name resolution for Entity Manager intents."""
+import heapq
+import logging
+from bisect import bisect_left, insort
+from itertools import repeat
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from .device_lookup import DeviceLookup
+from .entity_index import EntityChange, EntityIndex
+from .search import tokenize
+
+_LOGGER = logging.getLogger(__name__)
+
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_FUZZY = "fuzzy"
+
+# Candidates collected before a resolution is reported as ambiguous anyway
+MAX_CANDIDATES = 50
+
+# Words shorter than this only match exactly or by prefix, never with a typo
+MIN_TYPO_LENGTH = 4
+
+# Token match qualities of the fuzzy stage
+_TOKEN_EXACT = 3
+_TOKEN_PREFIX = 2
+_TOKEN_TYPO = 1
+
+
+def normalize(text: str | None) -> str:
+    """Return text lowercased, without punctuation and with single spaces."""
+    return " ".join(tokenize(text))
+
+
+def _deletes(word: str) -> set[str]:
+    """Return the word with each one of its characters deleted."""
+    return {word[:i] + word[i + 1 :] for i in range(len(word))}
+
+
+class NameIndex:
+    """Resolves spoken entity names to entity IDs.
+
+    Every entity is known by normalized phrases: its name, original name,
+    device name followed by its name, aliases and object ID. A query is
+    resolved by the first stage that matches:
+
+    - exact: the query is one of the phrases;
+    - prefix: the query starts one or more phrases;
+    - fuzzy: every query word matches a word of the entity's name, original
+      name, device, area, aliases or entity ID exactly, by prefix, or with
+      one typo (one character deleted, added or substituted). Entities with
+      the best total match quality win.
+
+    Typos are looked up in an index of each word with one character
+    deleted, so no stage scans the vocabulary or the entities.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, index: EntityIndex, devices: DeviceLookup
+    ) -> None:
+        """Initialize the name index."""
+        self.hass = hass
+        self.index = index
+        self.devices = devices
+        self._phrases: dict[str, set[str]] = {}
+        self._sorted_phrases: list[str] = []
+        self._words: dict[str, set[str]] = {}
+        self._sorted_words: list[str] = []
+        self._typos: dict[str, set[str]] = {}
+        self._entity_phrases: dict[str, tuple[str, ...]] = {}
+        self._entity_words: dict[str, tuple[str, ...]] = {}
+        self._entity_device: dict[str, str] = {}
+        self._entity_area: dict[str, str] = {}
+        self._device_entities: dict[str, set[str]] = {}
+        self._area_entities: dict[str, set[str]] = {}
+        # Normalized device name -> device IDs, for scoped intents
+        self._device_names: dict[str, set[str]] = {}
+        self._device_name: dict[str, str] = {}
+
+    @callback
+    def async_build(self) -> None:
+        """Index every entity currently in the entity index."""
+        for entity_id in list(self._entity_words):
+            self._remove(entity_id)
+        for projection in self.index.entities.values():
+            self._add(projection, keep_sorted=False)
+        self._sorted_phrases[:] = sorted(self._phrases)
+        self._sorted_words[:] = sorted(self._words)
+        for device_id in dr.async_get(self.hass).devices:
+            self._set_device_name(device_id)
+        _LOGGER.debug(
+            "Name index built with %d phrases and %d words",
+            len(self._phrases),
+            len(self._words),
+        )
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Follow entity index, device and area changes; return the unsubscribe."""
+        unsubs = [
+            self.index.async_add_listener(self._async_handle_changes),
+            self.devices.async_add_listener(self._async_handle_lookup_changes),
+        ]
+
+        @callback
+        def unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return unsubscribe
+
+    @callback
+    def _async_handle_changes(self, changes: list[EntityChange]) -> None:
+        """Reindex entities changed in the entity index."""
+        for old, new in changes:
+            if old is not None:
+                self._remove(old["entity_id"])
+            if new is not None:
+                self._remove(new["entity_id"])
+                self._add(new)
+
+    @callback
+    def _async_handle_lookup_changes(self, device_ids: set[str], area_ids: set[str]) -> None:
+        """Reindex the entities of changed devices and areas."""
+        entity_ids: set[str] = set()
+        for device_id in device_ids:
+            entity_ids.update(self._device_entities.get(device_id, ()))
+        for area_id in area_ids:
+            entity_ids.update(self._area_entities.get(area_id, ()))
+        for entity_id in entity_ids:
+            self._remove(entity_id)
+            if (projection := self.index.entities.get(entity_id)) is not None:
+                self._add(projection)
+        for device_id in device_ids:
+            self._set_device_name(device_id)
+
+    def _set_device_name(self, device_id: str) -> None:
+        """Index the current name of a device, or drop a removed device."""
+        if (old := self._device_name.pop(device_id, None)) is not None:
+            self._device_names[old].discard(device_id)
+            if not self._device_names[old]:
+                del self._device_names[old]
+        if (device := self.devices.async_device(device_id)) is None:
+            return
+        if name := normalize(device["name"]):
+            self._device_name[device_id] = name
+            self._device_names.setdefault(name, set()).add(device_id)
+
+    def _add(self, projection: dict[str, Any], keep_sorted: bool = True) -> None:
+        """Index the phrases and words of one entity."""
+        entity_id = projection["entity_id"]
+        device_name, area_id, area_name = self.devices.async_describe(
+            projection["device_id"], projection["area_id"]
+        )
+        entry = er.async_get(self.hass).async_get(entity_id)
+        aliases = entry.aliases if entry is not None else ()
+        name = projection["name"] or projection["original_name"]
+
+        phrases = {
+            normalize(text)
+            for text in (
+                projection["name"],
+                projection["original_name"],
+                f"{device_name} {name}" if device_name and name else device_name,
+                entity_id.partition(".")[2],
+                *aliases,
+            )
+        }
+        phrases.discard("")
+        # The phrases hold every word but those of the area and domain
+        words = set(" ".join(phrases).split(" "))
+        words.update(tokenize(area_name), tokenize(entity_id.partition(".")[0]))
+
+        for phrase in phrases:
+            if (entity_ids := self._phrases.get(phrase)) is None:
+                entity_ids = self._phrases[phrase] = set()
+                if keep_sorted:
+                    insort(self._sorted_phrases, phrase)
+            entity_ids.add(entity_id)
+        for word in words:
+            if (entity_ids := self._words.get(word)) is None:
+                entity_ids = self._words[word] = set()
+                if keep_sorted:
+                    insort(self._sorted_words, word)
+                if len(word) >= MIN_TYPO_LENGTH:
+                    for typo in _deletes(word) | {word}:
+                        self._typos.setdefault(typo, set()).add(word)
+            entity_ids.add(entity_id)
+        # Tuples are not tracked by the garbage collector
+        self._entity_phrases[entity_id] = tuple(phrases)
+        self._entity_words[entity_id] = tuple(words)
+
+        if (device_id := projection["device_id"]) is not None:
+            self._entity_device[entity_id] = device_id
+            self._device_entities.setdefault(device_id, set()).add(entity_id)
+        if area_id is not None:
+            self._entity_area[entity_id] = area_id
+            self._area_entities.setdefault(area_id, set()).add(entity_id)
+
+    def _remove(self, entity_id: str) -> None:
+        """Drop one entity from the index."""
+        if (words := self._entity_words.pop(entity_id, None)) is None:
+            return
+        for phrase in self._entity_phrases.pop(entity_id):
+            entity_ids = self._phrases[phrase]
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self._phrases[phrase]
+                del self._sorted_phrases[bisect_left(self._sorted_phrases, phrase)]
+        for word in words:
+            entity_ids = self._words[word]
+            entity_ids.discard(entity_id)
+            if entity_ids:
+                continue
+            del self._words[word]
+            del self._sorted_words[bisect_left(self._sorted_words, word)]
+            if len(word) >= MIN_TYPO_LENGTH:
+                for typo in _deletes(word) | {word}:
+                    typo_words = self._typos[typo]
+                    typo_words.discard(word)
+                    if not typo_words:
+                        del self._typos[typo]
+
+        for entity_map, reverse in (
+            (self._entity_device, self._device_entities),
+            (self._entity_area, self._area_entities),
+        ):
+            if (key := entity_map.pop(entity_id, None)) is not None:
+                members = reverse[key]
+                members.discard(entity_id)
+                if not members:
+                    del reverse[key]
+
+    @callback
+    def async_resolve(self, query: str) -> tuple[str | None, list[str]]:
+        """Return the match stage and the sorted entity IDs a spoken name matches.
+
+        At most MAX_CANDIDATES + 1 entity IDs are returned; the stage is None
+        when nothing matches.
+        """
+        if not (phrase := normalize(query)):
+            return None, []
+        for stage, entity_ids in (
+            (MATCH_EXACT, lambda: self._phrases.get(phrase)),
+            (MATCH_PREFIX, lambda: self._prefixed(phrase)),
+            (MATCH_FUZZY, lambda: self._fuzzy(phrase.split(" "))),
+        ):
+            if matched := entity_ids():
+                return stage, heapq.nsmallest(MAX_CANDIDATES + 1, matched)
+        return None, []
+
+    def _prefixed(self, phrase: str) -> set[str]:
+        """Return the entities with a phrase starting with the query phrase."""
+        entity_ids: set[str] = set()
+        sorted_phrases = self._sorted_phrases
+        position = bisect_left(sorted_phrases, phrase)
+        while position < len(sorted_phrases) and sorted_phrases[position].startswith(phrase):
+            entity_ids |= self._phrases[sorted_phrases[position]]
+            if len(entity_ids) > MAX_CANDIDATES:
+                break
+            position += 1
+        return entity_ids
+
+    def _token_matches(self, token: str) -> dict[str, int]:
+        """Return the words a query word matches, with match quality."""
+        matches: dict[str, int] = {}
+        if len(token) >= MIN_TYPO_LENGTH:
+            for typo in _deletes(token) | {token}:
+                for word in self._typos.get(typo, ()):
+                    matches[word] = _TOKEN_TYPO
+        sorted_words = self._sorted_words
+        position = bisect_left(sorted_words, token)
+        while position < len(sorted_words) and sorted_words[position].startswith(token):
+            matches[sorted_words[position]] = _TOKEN_PREFIX
+            position += 1
+        if token in self._words:
+            matches[token] = _TOKEN_EXACT
+        return matches
+
+    def _fuzzy(self, tokens: list[str]) -> set[str]:
+        """Return the entities with the best match of every query word.
+
+        Candidates are the intersection of the entities of each query word's
+        matching words (set operations only); only they are scored.
+        """
+        token_matches = [self._token_matches(token) for token in dict.fromkeys(tokens)]
+        if not all(token_matches):
+            return set()
+        if len(token_matches) == 1:
+            # Only the words of the best quality can win
+            matches = token_matches[0]
+            best = max(matches.values())
+            return set().union(
+                *(self._words[word] for word, quality in matches.items() if quality == best)
+            )
+        postings = sorted(
+            (
+                self._words[next(iter(matches))]
+                if len(matches) == 1
+                else set().union(*map(self._words.__getitem__, matches))
+                for matches in token_matches
+            ),
+            key=len,
+        )
+        if not (candidates := postings[0].intersection(*postings[1:])):
+            return set()
+
+        entity_words = self._entity_words
+        scores = {
+            entity_id: sum(
+                max(map(matches.get, entity_words[entity_id], repeat(0)))
+                for matches in token_matches
+            )
+            for entity_id in candidates
+        }
+        best = max(scores.values())
+        entity_ids: set[str] = set()
+        for entity_id, score in scores.items():
+            if score == best:
+                entity_ids.add(entity_id)
+                if len(entity_ids) > MAX_CANDIDATES:
+                    break
+        return entity_ids
+
+    @callback
+    def async_resolve_scope(self, scope: str, spoken: str) -> list[str]:
+        """Return the sorted device IDs, area IDs or platforms a spoken name matches.
+
+        scope is "device", "area" or "integration". Names match exactly,
+        else by prefix, else by containing every spoken word.
+        """
+        if scope == "device":
+            names = self._device_names
+        elif scope == "area":
+            names = {}
+            for area in ar.async_get(self.hass).async_list_areas():
+                for name in (area.name, *area.aliases):
+                    names.setdefault(normalize(name), set()).add(area.id)
+        else:
+            names = {
+                normalize(platform): {platform}
+                for platform in self.index.async_scope_keys("integration")
+            }
+
+        if not (phrase := normalize(spoken)):
+            return []
+        if (keys := names.get(phrase)) is not None:
+            return sorted(keys)
+        words = phrase.split(" ")
+        for matches in (
+            lambda name: name.startswith(phrase),
+            lambda name: all(word in name.split(" ") for word in words),
+        ):
+            keys = {key for name, name_keys in names.items() if matches(name) for key in name_keys}
+            if keys:
+                return sorted(keys)
+        return []
+
+    @callback
+    def async_label(self, entity_id: str) -> str:
+        """Return the spoken description of an entity, e.g. for disambiguation."""
+        if (projection := self.index.entities.get(entity_id)) is None:
+            return entity_id
+        device_name, _, area_name = self.devices.async_describe(
+            projection["device_id"], projection["area_id"]
+        )
+        label = projection["name"] or projection["original_name"]
+        if device_name and label:
+            label = f"{device_name} {label}"
+        label = label or device_name or entity_id
+        return f"{label} in {area_name}" if area_name else label
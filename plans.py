@@ -0,0 +1,189 @@
+"""Registry plan files: streaming export and chunked import for Entity Manager."""
+import csv
+import io
+import json
+import os
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant, callback, split_entity_id, valid_entity_id
+from homeassistant.helpers import entity_registry as er
+
+from .device_lookup import DeviceLookup
+from .entity_index import EntityIndex
+
+PLAN_FORMATS = ("ndjson", "csv")
+
+# Columns of an exported plan; an import reads disabled_by, name and
+# new_entity_id back and ignores the others
+EXPORT_FIELDS = (
+    "entity_id",
+    "name",
+    "platform",
+    "device_id",
+    "device",
+    "area",
+    "disabled_by",
+    "entity_category",
+)
+
+# Optional import column forcing a state instead of disabled_by
+ACTIONS = ("enable", "disable")
+
+
+class PlanError(Exception):
+    """A plan file or plan row that cannot be used."""
+
+
+@callback
+def async_export_row(devices: DeviceLookup, projection: dict[str, Any]) -> dict[str, Any]:
+    """Return the exported plan row of an entity projection."""
+    device, _, area = devices.async_describe(projection["device_id"], projection["area_id"])
+    return {
+        "entity_id": projection["entity_id"],
+        "name": projection["name"],
+        "platform": projection["platform"],
+        "device_id": projection["device_id"],
+        "device": device,
+        "area": area,
+        "disabled_by": projection["disabled_by"],
+        "entity_category": projection["entity_category"],
+    }
+
+
+def encode_rows(rows: list[dict[str, Any]], fmt: str, header: bool = False) -> str:
+    """Return plan rows as NDJSON lines or CSV records, optionally after the CSV header."""
+    if fmt == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, EXPORT_FIELDS, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def plan_path(hass: HomeAssistant, path: str) -> str:
+    """Return the absolute path of a plan file inside the configuration directory."""
+    config_dir = os.path.realpath(hass.config.config_dir)
+    full_path = os.path.realpath(hass.config.path(path))
+    if not full_path.startswith(config_dir + os.sep):
+        raise PlanError("Plan files must be inside the configuration directory")
+    return full_path
+
+
+def plan_format(path: str, fmt: str | None) -> str:
+    """Return the format of a plan file, from its extension unless given."""
+    if fmt is not None:
+        return fmt
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise PlanError("Pass format for plan files not ending in .csv, .ndjson or .jsonl")
+
+
+class PlanReader:
+    """Reads plan rows from a file a chunk at a time.
+
+    Only the current chunk is held in memory. The methods do blocking file
+    I/O; call them in the executor.
+    """
+
+    def __init__(self, path: str, fmt: str) -> None:
+        """Open a plan file."""
+        try:
+            self._file: IO[str] = open(path, encoding="utf-8", newline="")
+        except OSError as err:
+            raise PlanError(f"Cannot open {path}: {err.strerror}") from err
+        self._csv = csv.DictReader(self._file) if fmt == "csv" else None
+        self._line = 0
+
+    def read(self, count: int) -> list[tuple[int, dict[str, Any] | None, str | None]]:
+        """Return up to count (line, row, parse error) tuples; empty at the end.
+
+        Raises PlanError when the rest of the file cannot be read.
+        """
+        try:
+            return self._read(count)
+        except csv.Error as err:
+            raise PlanError(f"Invalid CSV after line {self._csv.line_num}: {err}") from err
+        except UnicodeDecodeError as err:
+            raise PlanError(f"Plan files must be UTF-8: {err}") from err
+        except OSError as err:
+            raise PlanError(f"Cannot read the plan file: {err.strerror}") from err
+
+    def _read(self, count: int) -> list[tuple[int, dict[str, Any] | None, str | None]]:
+        """Read up to count rows."""
+        rows: list[tuple[int, dict[str, Any] | None, str | None]] = []
+        if self._csv is not None:
+            for row in self._csv:
+                if None in row:
+                    rows.append((self._csv.line_num, None, "More values than columns"))
+                else:
+                    # Short rows leave the missing columns unchanged
+                    values = {key: value for key, value in row.items() if value is not None}
+                    rows.append((self._csv.line_num, values, None))
+                if len(rows) == count:
+                    break
+            return rows
+        for text in self._file:
+            self._line += 1
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as err:
+                rows.append((self._line, None, f"Invalid JSON: {err}"))
+            else:
+                if isinstance(row, dict):
+                    rows.append((self._line, row, None))
+                else:
+                    rows.append((self._line, None, "Rows must be JSON objects"))
+            if len(rows) == count:
+                break
+        return rows
+
+    def close(self) -> None:
+        """Close the plan file."""
+        self._file.close()
+
+
+@callback
+def async_plan_changes(index: EntityIndex, row: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """Return the entity_id and async_update_entity changes a plan row asks for.
+
+    Validated against the entity index; values already in effect are left
+    out, so an unedited export imports as no changes. Empty values mean
+    none: no disabler (enabled), no custom name, no rename.
+    """
+    for field in ("entity_id", "action", "disabled_by", "name", "new_entity_id"):
+        if row.get(field) is not None and not isinstance(row[field], str):
+            raise PlanError(f"{field} must be a string")
+    entity_id = row.get("entity_id")
+    if not entity_id or (projection := index.entities.get(entity_id)) is None:
+        raise PlanError("Entity not found")
+    changes: dict[str, Any] = {}
+
+    action = row.get("action") or None
+    if action is not None and action not in ACTIONS:
+        raise PlanError(f"Unknown action {action}; use enable or disable")
+    if action is not None or "disabled_by" in row:
+        disabled_by = row.get("disabled_by") or None
+        if action is not None:
+            disabled_by = er.RegistryEntryDisabler.USER.value if action == "disable" else None
+        if disabled_by != projection["disabled_by"]:
+            if disabled_by not in (None, er.RegistryEntryDisabler.USER.value):
+                raise PlanError("Only disabled_by user can be imported")
+            changes["disabled_by"] = er.RegistryEntryDisabler(disabled_by) if disabled_by else None
+
+    if "name" in row and (name := row["name"] or None) != projection["name"]:
+        changes["name"] = name
+
+    if (new_entity_id := row.get("new_entity_id") or None) not in (None, entity_id):
+        if not valid_entity_id(new_entity_id):
+            raise PlanError(f"Invalid entity ID {new_entity_id}")
+        if split_entity_id(new_entity_id)[0] != split_entity_id(entity_id)[0]:
+            raise PlanError("Renames cannot change the domain")
+        changes["new_entity_id"] = new_entity_id
+
+    return entity_id, changes
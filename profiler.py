@@ -0,0 +1,154 @@
+"""Hot-entity profiler of state changes for Entity Manager."""
+import heapq
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "entity_manager.profiler"
+
+# Seconds the on/off switch is batched before it is written
+SAVE_DELAY = 1
+
+# Sliding window reported on, counted in slots that expire one at a time
+WINDOW = timedelta(hours=1)
+SLOTS = 12
+
+# Entities counted exactly per slot; others are counted within slot events / CAPACITY
+CAPACITY = 200
+
+
+class HeavyHitters:
+    """Space-Saving counters of the most frequent keys in a stream.
+
+    Holds at most twice capacity counters. When full, the counters are pruned
+    to the capacity largest; a key seen after that starts from the largest
+    pruned count, the most it can have been missed by, which is kept as its
+    error. Counts never undercount, and overcount by at most their error.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "floor", "total")
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        """Initialize empty counters."""
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.floor = 0
+        self.total = 0
+
+    def add(self, key: str) -> None:
+        """Count one occurrence of a key."""
+        self.total += 1
+        counts = self.counts
+        if (count := counts.get(key)) is not None:
+            counts[key] = count + 1
+            return
+        if len(counts) >= 2 * self.capacity:
+            self._prune()
+        self.counts[key] = self.floor + 1
+        if self.floor:
+            self.errors[key] = self.floor
+
+    def _prune(self) -> None:
+        """Keep the capacity largest counters."""
+        ranked = sorted(self.counts.items(), key=itemgetter(1), reverse=True)
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        self.counts = dict(ranked[: self.capacity])
+        self.errors = {key: error for key, error in self.errors.items() if key in self.counts}
+
+
+class StateChangeProfiler:
+    """Finds the entities producing the most state_changed events.
+
+    Opt-in: while enabled, every state change increments a counter in the
+    current slot's HeavyHitters, a dict update, so memory stays bounded by
+    SLOTS * 2 * CAPACITY counters however many entities report. Slots rotate
+    on a timer and the oldest one expires, giving a sliding WINDOW. Whether
+    the profiler runs is persisted with a Store; the counts are not.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize a stopped profiler."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._slots: deque[tuple[float, HeavyHitters]] = deque(maxlen=SLOTS)
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether state changes are being counted."""
+        return bool(self._unsubs)
+
+    async def async_load(self) -> None:
+        """Start the profiler if it was left enabled."""
+        if (data := await self._store.async_load()) is not None and data["enabled"]:
+            self._start()
+
+    @callback
+    def async_set_enabled(self, enabled: bool) -> None:
+        """Start or stop counting; starting clears earlier counts."""
+        if enabled == self.enabled:
+            return
+        if enabled:
+            self._start()
+        else:
+            self.async_stop()
+        self._store.async_delay_save(lambda: {"enabled": enabled}, SAVE_DELAY)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop counting without changing the persisted switch."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        self._slots.clear()
+
+    @callback
+    def async_top(self, limit: int) -> tuple[float, int, list[tuple[str, int, int]]]:
+        """Return the window in seconds, its events and its top (entity_id, count, error).
+
+        Counts are summed over the slots; an entity's error adds its error in
+        the slots counting it and the most it can have been missed by in the
+        others.
+        """
+        if not self._slots:
+            return 0.0, 0, []
+        counts: dict[str, int] = {}
+        errors: dict[str, int] = {}
+        for _, slot in self._slots:
+            for entity_id, count in slot.counts.items():
+                counts[entity_id] = counts.get(entity_id, 0) + count
+                error = slot.errors.get(entity_id, 0) - slot.floor
+                errors[entity_id] = errors.get(entity_id, 0) + error
+        floors = sum(slot.floor for _, slot in self._slots)
+        top = heapq.nlargest(limit, counts.items(), key=itemgetter(1))
+        return (
+            time.time() - self._slots[0][0],
+            sum(slot.total for _, slot in self._slots),
+            [(entity_id, count, errors[entity_id] + floors) for entity_id, count in top],
+        )
+
+    def _start(self) -> None:
+        """Listen to state changes and rotate the slots."""
+        self._slots.append((time.time(), HeavyHitters()))
+        self._unsubs = [
+            self.hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_count),
+            async_track_time_interval(self.hass, self._async_rotate, WINDOW / SLOTS),
+        ]
+
+    @callback
+    def _async_count(self, event: Event) -> None:
+        """Count a state change."""
+        self._slots[-1][1].add(event.data["entity_id"])
+
+    @callback
+    def _async_rotate(self, _now: datetime) -> None:
+        """Start a new slot, expiring the oldest once the window is full."""
+        self._slots.append((time.time(), HeavyHitters()))
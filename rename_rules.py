@@ -0,0 +1,23 @@
+"""Regex and token template rename rules for Entity Manager.
+
+Kept in the services package, which is also installed on its own.
+"""
+from .custom_components.entity_manager.rename_rules import (
+    TARGETS,
+    TEMPLATE_TOKENS,
+    RenamePlan,
+    RenameRule,
+    RenameRuleError,
+    async_plan_renames,
+    async_taken_entity_ids,
+)
+
+__all__ = [
+    "TARGETS",
+    "TEMPLATE_TOKENS",
+    "RenamePlan",
+    "RenameRule",
+    "RenameRuleError",
+    "async_plan_renames",
+    "async_taken_entity_ids",
+]
@@ -0,0 +1,218 @@
+"""Timed re-enables of disabled entities for Entity Manager."""
+import heapq
+import logging
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .concurrency import MutationQueue, MutationRejected
+from .entity_index import EntityIndex
+from .transaction import RegistryTransaction
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "entity_manager.reenable_schedule"
+
+# Seconds schedule changes are batched before they are written
+SAVE_DELAY = 10
+
+# Seconds until re-enables blocked by another pending mutation are retried
+RETRY_DELAY = 60
+
+# Cancelled and rescheduled heap entries tolerated before the heap is rebuilt
+MIN_COMPACT_SIZE = 1000
+
+
+class ReenableScheduler:
+    """Re-enables user-disabled entities at the time they were disabled until.
+
+    Pending re-enables live in a min-heap of (due timestamp, entity ID)
+    served by one timer, armed for the earliest entry. Cancelled and
+    rescheduled entries are left in the heap and skipped when they surface;
+    the heap is rebuilt once they outnumber the live ones. Entities due
+    together are re-enabled in one registry transaction through the
+    mutation queue. The schedule is persisted with a Store.
+
+    Entities that are removed, or enabled or disabled by something else
+    meanwhile, are dropped from the schedule; renamed ones keep their time.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, index: EntityIndex, mutations: MutationQueue
+    ) -> None:
+        """Initialize an empty schedule."""
+        self.hass = hass
+        self.index = index
+        self.mutations = mutations
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._due: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._timer_due: float | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._started = False
+
+    async def async_load(self) -> None:
+        """Load the persisted schedule; the timer is armed by async_start."""
+        if (data := await self._store.async_load()) is not None:
+            self._due = dict(data["entities"])
+        self._heap = [(due, entity_id) for entity_id, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    @callback
+    def async_start(self) -> None:
+        """Arm the timer once the entity index is built.
+
+        Re-enables that fell due while Home Assistant was stopped run at once.
+        """
+        self._started = True
+        self._arm()
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Follow entity registry changes; return the unsubscribe and timer stop."""
+        unsub = self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_event
+        )
+
+        @callback
+        def unsubscribe() -> None:
+            unsub()
+            if self._unsub_timer is not None:
+                self._unsub_timer()
+                self._unsub_timer = self._timer_due = None
+
+        return unsubscribe
+
+    @callback
+    def async_schedule(self, entity_ids: Iterable[str], when: datetime) -> None:
+        """Re-enable entities at a time, replacing earlier schedules of them."""
+        due = when.timestamp()
+        for entity_id in entity_ids:
+            self._due[entity_id] = due
+            heapq.heappush(self._heap, (due, entity_id))
+        self._async_changed()
+
+    @callback
+    def async_cancel(self, entity_ids: Iterable[str]) -> None:
+        """Drop the pending re-enables of entities."""
+        cancelled = [self._due.pop(entity_id) for entity_id in entity_ids if entity_id in self._due]
+        if cancelled:
+            self._async_changed()
+
+    @callback
+    def async_pending(self) -> list[tuple[datetime, str]]:
+        """Return the pending (re-enable time, entity ID) pairs, earliest first."""
+        return [
+            (dt_util.utc_from_timestamp(due), entity_id)
+            for entity_id, due in sorted(self._due.items(), key=lambda item: (item[1], item[0]))
+        ]
+
+    @callback
+    def async_reenable_at(self, entity_id: str) -> datetime | None:
+        """Return when an entity is re-enabled, if it is scheduled."""
+        if (due := self._due.get(entity_id)) is None:
+            return None
+        return dt_util.utc_from_timestamp(due)
+
+    @callback
+    def _async_handle_registry_event(self, event: Event) -> None:
+        """Follow renames and drop entities no longer disabled by the user."""
+        data = event.data
+        entity_id = data["entity_id"]
+        if (old_entity_id := data.get("old_entity_id")) in self._due:
+            self.async_schedule(
+                [entity_id], dt_util.utc_from_timestamp(self._due.pop(old_entity_id))
+            )
+        if entity_id not in self._due:
+            return
+        if data["action"] == "remove":
+            self.async_cancel([entity_id])
+        elif "disabled_by" in data.get("changes", {}):
+            entry = er.async_get(self.hass).async_get(entity_id)
+            if entry is None or entry.disabled_by is not er.RegistryEntryDisabler.USER:
+                self.async_cancel([entity_id])
+
+    def _async_changed(self) -> None:
+        """Compact the heap if needed, re-arm the timer and save."""
+        if len(self._heap) > max(MIN_COMPACT_SIZE, 2 * len(self._due)):
+            self._heap = [(due, entity_id) for entity_id, due in self._due.items()]
+            heapq.heapify(self._heap)
+        self._arm()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the schedule to persist."""
+        return {"entities": self._due}
+
+    def _pop_stale(self) -> None:
+        """Drop cancelled and rescheduled entries from the top of the heap."""
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _arm(self) -> None:
+        """Point the timer at the earliest pending re-enable."""
+        if not self._started:
+            return
+        self._pop_stale()
+        due = self._heap[0][0] if self._heap else None
+        if due == self._timer_due:
+            return
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_due = due
+        if due is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._async_fire, dt_util.utc_from_timestamp(due)
+            )
+
+    @callback
+    def _async_fire(self, _now: datetime) -> None:
+        """Re-enable every entity that is due."""
+        self._unsub_timer = self._timer_due = None
+        now = time.time()
+        entity_ids: list[str] = []
+        self._pop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, entity_id = heapq.heappop(self._heap)
+            del self._due[entity_id]
+            entity_ids.append(entity_id)
+            self._pop_stale()
+        self._async_changed()
+        if entity_ids:
+            self.hass.async_create_background_task(
+                self._async_reenable(entity_ids), "entity_manager scheduled re-enable"
+            )
+
+    async def _async_reenable(self, entity_ids: list[str]) -> None:
+        """Enable the entities that are still disabled by the user."""
+        entity_reg = er.async_get(self.hass)
+        transaction = RegistryTransaction(self.hass, hold_notifications=self.index.async_hold)
+        for entity_id in entity_ids:
+            entry = entity_reg.async_get(entity_id)
+            if entry is not None and entry.disabled_by is er.RegistryEntryDisabler.USER:
+                transaction.async_update(entity_id, disabled_by=None)
+        if not len(transaction):
+            return
+        try:
+            results = await self.mutations.async_run(entity_ids, transaction.async_commit)
+        except MutationRejected as err:
+            _LOGGER.debug("Retrying scheduled re-enables later: %s", err)
+            self.async_schedule(
+                entity_ids, dt_util.utc_from_timestamp(time.time() + RETRY_DELAY)
+            )
+            return
+        _LOGGER.info("Re-enabled %d scheduled entities", len(results["success"]))
+        for failure in results["failed"]:
+            _LOGGER.warning(
+                "Failed to re-enable %s: %s", failure["entity_id"], failure["error"]
+            )
@@ -0,0 +1,283 @@
+"""Token/trigram search index for Entity Manager."""
+import heapq
+import logging
+import re
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .device_lookup import DeviceLookup
+from .entity_index import EntityChange, EntityIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+FIELD_ENTITY_ID = 1
+FIELD_NAME = 2
+FIELD_ORIGINAL_NAME = 4
+FIELD_DEVICE = 8
+FIELD_AREA = 16
+FIELD_PLATFORM = 32
+
+_FIELD_WEIGHTS = {
+    FIELD_ENTITY_ID: 3,
+    FIELD_NAME: 3,
+    FIELD_ORIGINAL_NAME: 3,
+    FIELD_DEVICE: 2,
+    FIELD_AREA: 1,
+    FIELD_PLATFORM: 1,
+}
+# Weight of a field mask is the weight of its best field
+_MASK_WEIGHTS = [
+    max((weight for bit, weight in _FIELD_WEIGHTS.items() if mask & bit), default=0)
+    for mask in range(64)
+]
+
+MATCH_EXACT = 3
+MATCH_PREFIX = 2
+MATCH_SUBSTRING = 1
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _word_grams(word: str) -> set[str]:
+    """Return the grams a vocabulary word is reachable by.
+
+    Trigrams serve substring lookups of tokens with 3+ characters; the
+    "^"-prefixed one and two character grams serve short tokens, which only
+    match at the start of a word.
+    """
+    grams = {word[i : i + 3] for i in range(len(word) - 2)}
+    grams.add("^" + word[:1])
+    grams.add("^" + word[:2])
+    return grams
+
+
+class SearchIndex:
+    """Ranked search over the entity index.
+
+    Each indexed word maps to the entities containing it, with a bitmask of
+    the fields it occurs in; a trigram index over the vocabulary resolves
+    query tokens to words. Updates follow entity index changes and device
+    lookup invalidations.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, index: EntityIndex, devices: DeviceLookup
+    ) -> None:
+        """Initialize the search index."""
+        self.hass = hass
+        self.index = index
+        self.devices = devices
+        self._postings: dict[str, dict[str, int]] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._docs: dict[str, dict[str, int]] = {}
+        self._doc_device: dict[str, str] = {}
+        self._doc_area: dict[str, str] = {}
+        self._device_docs: dict[str, set[str]] = {}
+        self._area_docs: dict[str, set[str]] = {}
+
+    @callback
+    def async_build(self) -> None:
+        """Index every entity currently in the entity index."""
+        for entity_id in list(self._docs):
+            self._remove_doc(entity_id)
+        for projection in self.index.entities.values():
+            self._add_doc(projection)
+        _LOGGER.debug(
+            "Search index built with %d entities and %d words",
+            len(self._docs),
+            len(self._postings),
+        )
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Follow entity index, device and area changes; return the unsubscribe."""
+        unsubs = [
+            self.index.async_add_listener(self._async_handle_changes),
+            self.devices.async_add_listener(self._async_handle_lookup_changes),
+        ]
+
+        @callback
+        def unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return unsubscribe
+
+    @callback
+    def _async_handle_changes(self, changes: list[EntityChange]) -> None:
+        """Reindex entities changed in the entity index."""
+        for old, new in changes:
+            if old is not None:
+                self._remove_doc(old["entity_id"])
+            if new is not None:
+                self._remove_doc(new["entity_id"])
+                self._add_doc(new)
+
+    @callback
+    def _async_handle_lookup_changes(self, device_ids: set[str], area_ids: set[str]) -> None:
+        """Reindex the entities of changed devices and areas."""
+        entity_ids: set[str] = set()
+        for device_id in device_ids:
+            entity_ids.update(self._device_docs.get(device_id, ()))
+        for area_id in area_ids:
+            entity_ids.update(self._area_docs.get(area_id, ()))
+        for entity_id in entity_ids:
+            self._remove_doc(entity_id)
+            if (projection := self.index.entities.get(entity_id)) is not None:
+                self._add_doc(projection)
+
+    def _add_doc(self, projection: dict[str, Any]) -> None:
+        """Index one entity."""
+        entity_id = projection["entity_id"]
+        device_name, area_id, area_name = self.devices.async_describe(
+            projection["device_id"], projection["area_id"]
+        )
+
+        words: dict[str, int] = {}
+        for field, text in (
+            (FIELD_ENTITY_ID, entity_id),
+            (FIELD_NAME, projection["name"]),
+            (FIELD_ORIGINAL_NAME, projection["original_name"]),
+            (FIELD_DEVICE, device_name),
+            (FIELD_AREA, area_name),
+            (FIELD_PLATFORM, projection["platform"]),
+        ):
+            for word in tokenize(text):
+                words[word] = words.get(word, 0) | field
+
+        for word, mask in words.items():
+            if (docs := self._postings.get(word)) is None:
+                docs = self._postings[word] = {}
+                for gram in _word_grams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+            docs[entity_id] = mask
+        self._docs[entity_id] = words
+
+        if (device_id := projection["device_id"]) is not None:
+            self._doc_device[entity_id] = device_id
+            self._device_docs.setdefault(device_id, set()).add(entity_id)
+        if area_id is not None:
+            self._doc_area[entity_id] = area_id
+            self._area_docs.setdefault(area_id, set()).add(entity_id)
+
+    def _remove_doc(self, entity_id: str) -> None:
+        """Drop one entity from the index."""
+        if (words := self._docs.pop(entity_id, None)) is None:
+            return
+        for word in words:
+            docs = self._postings[word]
+            del docs[entity_id]
+            if docs:
+                continue
+            del self._postings[word]
+            for gram in _word_grams(word):
+                gram_words = self._grams[gram]
+                gram_words.discard(word)
+                if not gram_words:
+                    del self._grams[gram]
+
+        for doc_map, reverse in (
+            (self._doc_device, self._device_docs),
+            (self._doc_area, self._area_docs),
+        ):
+            if (key := doc_map.pop(entity_id, None)) is not None:
+                members = reverse[key]
+                members.discard(entity_id)
+                if not members:
+                    del reverse[key]
+
+    def _matching_words(self, token: str) -> dict[str, int]:
+        """Return the vocabulary words a query token matches, with match quality."""
+        if len(token) < 3:
+            candidates = self._grams.get("^" + token, set())
+        else:
+            gram_sets = []
+            for i in range(len(token) - 2):
+                if (words := self._grams.get(token[i : i + 3])) is None:
+                    return {}
+                gram_sets.append(words)
+            gram_sets.sort(key=len)
+            candidates = set(gram_sets[0]).intersection(*gram_sets[1:])
+
+        matches: dict[str, int] = {}
+        for word in candidates:
+            if word == token:
+                matches[word] = MATCH_EXACT
+            elif word.startswith(token):
+                matches[word] = MATCH_PREFIX
+            elif token in word:
+                matches[word] = MATCH_SUBSTRING
+        return matches
+
+    @callback
+    def async_search(
+        self,
+        query: str,
+        filters: dict[str, set[str | None]],
+        state: str,
+        offset: int,
+        limit: int,
+    ) -> tuple[list[tuple[float, dict[str, Any]]], int]:
+        """Return a page of (score, entity) hits and the total hit count.
+
+        Every query token must match a word of the entity. filters maps a
+        projection key ("platform", "domain", "disabled_by",
+        "entity_category") to the accepted values.
+        """
+        entities = self.index.entities
+        scores: dict[str, float] | None = None
+
+        for token in dict.fromkeys(tokenize(query)):
+            token_scores: dict[str, float] = {}
+            for word, quality in self._matching_words(token).items():
+                for entity_id, mask in self._postings[word].items():
+                    score = quality * _MASK_WEIGHTS[mask]
+                    if score > token_scores.get(entity_id, 0):
+                        token_scores[entity_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    entity_id: score + token_scores[entity_id]
+                    for entity_id, score in scores.items()
+                    if entity_id in token_scores
+                }
+            if not scores:
+                return [], 0
+
+        if scores is None:
+            scores = dict.fromkeys(entities, 0.0)
+
+        # Postings are only flushed with the index listener, which bulk jobs
+        # hold, so they may name entities the index has already dropped
+        hits: list[tuple[float, str, dict[str, Any]]] = []
+        for entity_id, score in scores.items():
+            if (projection := entities.get(entity_id)) is None:
+                continue
+            if state != "all" and projection["is_disabled"] != (state == "disabled"):
+                continue
+            if filters and not all(
+                _filter_value(projection, key) in accepted
+                for key, accepted in filters.items()
+            ):
+                continue
+            hits.append((score, entity_id, projection))
+
+        # Highest score first, ties in entity_id order
+        page = heapq.nsmallest(offset + limit, hits, key=lambda hit: (-hit[0], hit[1]))
+        return [(score, projection) for score, _, projection in page[offset:]], len(hits)
+
+
+def _filter_value(projection: dict[str, Any], key: str) -> str | None:
+    """Return the value of a projection used by structured search filters."""
+    if key == "domain":
+        return projection["entity_id"].split(".", 1)[0]
+    return projection[key]
@@ -0,0 +1,7 @@
+"""Diagnostic sensors reporting Entity Manager's own cost.
+
+Kept in the services package, which is also installed on its own.
+"""
+from .custom_components.entity_manager.sensor import SCAN_INTERVAL, async_setup_entry
+
+__all__ = ["SCAN_INTERVAL", "async_setup_entry"]
@@ -0,0 +1,245 @@
+"""Staged startup of Entity Manager."""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from functools import wraps
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback, is_callback
+from homeassistant.helpers.start import async_at_started
+
+from .const import DATA_STARTUP, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# A deferred build step; steps starting listeners return their unsubscribe.
+# Coroutine functions, like Store loads, make their stage asynchronous.
+Step = Callable[[], CALLBACK_TYPE | None] | Callable[[], Awaitable[None]]
+
+
+class StagedStartup:
+    """Defers building the indexes and reading the stores until Home Assistant has started.
+
+    Setup only creates empty structures and registers handlers. Stages are
+    named after the hass.data key of what they build and list the stages
+    they need first. After EVENT_HOMEASSISTANT_STARTED a background task
+    runs them in the order they were added, one per event loop iteration,
+    so they never compete with the integrations still starting.
+
+    A request arriving before then only runs the stages its handler needs,
+    and the ones those need (see ready_command and async_ready); the others
+    are left to the background task. Asynchronous stages run as tasks that
+    every request needing them awaits. Setup and stage times are kept for
+    the stats command.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize an empty startup."""
+        self.hass = hass
+        self.entry = entry
+        self.setup_ms: float | None = None
+        self._pending: dict[str, tuple[tuple[Step, ...], tuple[str, ...]]] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._timings: list[dict[str, Any]] = []
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._setup_start = time.perf_counter()
+
+    @property
+    def ready(self) -> bool:
+        """Return whether every stage has run."""
+        return not self._pending and not self._tasks
+
+    @callback
+    def async_add_stage(self, name: str, *steps: Step, after: Iterable[str] = ()) -> None:
+        """Defer steps that run together, in order, as one timed stage.
+
+        The stages named in after run first.
+        """
+        self._pending[name] = (steps, tuple(after))
+
+    @callback
+    def async_setup_done(self) -> None:
+        """Record the setup time and schedule the stages for after startup."""
+        self.setup_ms = round((time.perf_counter() - self._setup_start) * 1000, 3)
+        self._unsubs.append(async_at_started(self.hass, self._async_started))
+        _LOGGER.debug("Entity Manager set up in %.1f ms", self.setup_ms)
+
+    @callback
+    def async_require(self, names: Iterable[str], trigger: str) -> None:
+        """Run the pending synchronous stages named, and those they need, now.
+
+        Raises RuntimeError for an asynchronous stage that has not finished;
+        wait for those with async_ready.
+        """
+        for name in names:
+            if name in self._tasks or (
+                name in self._pending and _is_async(self._pending[name][0])
+            ):
+                raise RuntimeError(f"Stage {name} is asynchronous; use async_ready")
+            if name in self._pending:
+                steps, after = self._pending.pop(name)
+                self.async_require(after, trigger)
+                self._run(name, steps, trigger)
+
+    async def async_ready(self, names: Iterable[str], trigger: str) -> None:
+        """Run or wait for the stages named, and those they need."""
+        for name in names:
+            if name in self._pending:
+                steps, after = self._pending[name]
+                await self.async_ready(after, trigger)
+                # Another request may have started the stage meanwhile
+                if self._pending.pop(name, None) is not None:
+                    if not _is_async(steps):
+                        self._run(name, steps, trigger)
+                        continue
+                    self._tasks[name] = self.entry.async_create_background_task(
+                        self.hass,
+                        self._async_run(name, steps, trigger),
+                        f"entity_manager {name} stage",
+                    )
+            if (task := self._tasks.get(name)) is not None:
+                # A cancelled request must not cancel the stage others wait for
+                await asyncio.shield(task)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the listeners the stages started; unrun stages are dropped."""
+        self._pending.clear()
+        for task in self._tasks.values():
+            task.cancel()
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def async_report(self) -> dict[str, Any]:
+        """Return the setup time, whether the build is done and each stage's time."""
+        return {
+            "setup_ms": self.setup_ms,
+            "ready": self.ready,
+            "stages": list(self._timings),
+        }
+
+    @callback
+    def _async_started(self, _hass: HomeAssistant) -> None:
+        """Build in the background now that Home Assistant has started."""
+        if self._pending:
+            self.entry.async_create_background_task(
+                self.hass, self._async_build(), "entity_manager deferred build"
+            )
+
+    async def _async_build(self) -> None:
+        """Run the stages, yielding to the event loop between them."""
+        while self._pending:
+            await self.async_ready([next(iter(self._pending))], "started")
+            await asyncio.sleep(0)
+        _LOGGER.debug(
+            "Entity Manager indexes built in %.1f ms",
+            sum(timing["ms"] for timing in self._timings),
+        )
+
+    def _run(self, name: str, steps: tuple[Step, ...], trigger: str) -> None:
+        """Run the steps of a synchronous stage and time it."""
+        start = time.perf_counter()
+        for step in steps:
+            if (unsub := step()) is not None:
+                self._unsubs.append(unsub)
+        self._record(name, start, trigger)
+
+    async def _async_run(self, name: str, steps: tuple[Step, ...], trigger: str) -> None:
+        """Run the steps of an asynchronous stage and time it."""
+        start = time.perf_counter()
+        try:
+            for step in steps:
+                if asyncio.iscoroutinefunction(step):
+                    await step()
+                elif (unsub := step()) is not None:
+                    self._unsubs.append(unsub)
+        except Exception:  # pylint: disable=broad-except
+            # Requests waiting for the stage go on with what it left
+            _LOGGER.exception("Entity Manager startup stage %s failed", name)
+        finally:
+            del self._tasks[name]
+        self._record(name, start, trigger)
+
+    def _record(self, name: str, start: float, trigger: str) -> None:
+        """Keep the time of a stage that has run."""
+        self._timings.append(
+            {
+                "name": name,
+                "ms": round((time.perf_counter() - start) * 1000, 3),
+                "trigger": trigger,
+            }
+        )
+
+
+def _is_async(steps: tuple[Step, ...]) -> bool:
+    """Return whether a stage awaits any of its steps."""
+    return any(asyncio.iscoroutinefunction(step) for step in steps)
+
+
+@callback
+def async_loaded(hass: HomeAssistant) -> bool:
+    """Return whether the config entry is set up and not unloaded."""
+    return DATA_STARTUP in hass.data.get(DOMAIN, {})
+
+
+@callback
+def async_require(hass: HomeAssistant, trigger: str, *names: str) -> None:
+    """Run the synchronous stages a request needs if they have not run yet."""
+    startup: StagedStartup | None = hass.data.get(DOMAIN, {}).get(DATA_STARTUP)
+    if startup is not None and not startup.ready:
+        startup.async_require(names, trigger)
+
+
+async def async_ready(hass: HomeAssistant, trigger: str, *names: str) -> None:
+    """Run or wait for the stages a request needs if they have not finished yet."""
+    startup: StagedStartup | None = hass.data.get(DOMAIN, {}).get(DATA_STARTUP)
+    if startup is not None and not startup.ready:
+        await startup.async_ready(names, trigger)
+
+
+def ready_command(*names: str) -> Callable[[Callable], Callable]:
+    """Make a websocket command handler wait for the stages it reads.
+
+    Commands stay registered when the config entry is unloaded; until it is
+    set up again they get a not_ready error. Apply above metered_command,
+    so the build is not counted in the command's metrics. @callback
+    handlers can only need synchronous stages.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if is_callback(func):
+
+            @callback
+            @wraps(func)
+            def callback_wrapper(
+                hass: HomeAssistant, connection: Any, msg: dict[str, Any]
+            ) -> None:
+                if not async_loaded(hass):
+                    _send_not_ready(connection, msg)
+                    return
+                async_require(hass, msg["type"], *names)
+                func(hass, connection, msg)
+
+            return callback_wrapper
+
+        @wraps(func)
+        async def wrapper(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+            if async_loaded(hass):
+                await async_ready(hass, msg["type"], *names)
+            # Checked again, as the entry may have been unloaded meanwhile
+            if not async_loaded(hass):
+                _send_not_ready(connection, msg)
+                return
+            await func(hass, connection, msg)
+
+        return wrapper
+
+    return decorator
+
+
+def _send_not_ready(connection: Any, msg: dict[str, Any]) -> None:
+    """Answer a command arriving while the config entry is not loaded."""
+    connection.send_error(msg["id"], "not_ready", "Entity Manager is not loaded")
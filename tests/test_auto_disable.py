@@ -0,0 +1,117 @@
+"""Tests of the auto-disable rules."""
+import asyncio
+
+import pytest
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.auto_disable import (
+    JOURNAL_COMMAND,
+    RULE_SCHEMA,
+    AutoDisabler,
+    AutoDisableRuleError,
+    RuleMatcher,
+)
+from entity_manager.concurrency import MutationQueue
+from entity_manager.const import CONF_AUTO_DISABLE_RULES, DOMAIN
+from entity_manager.entity_index import EntityIndex
+from entity_manager.journal import OperationJournal
+from synthetic_registry import async_make_hass
+
+
+def _match(
+    matcher: RuleMatcher, entity_id: str, platform: str, category: str | None = None
+) -> int | None:
+    """Return the rule an entity of a device model "TS011F" matches."""
+    return matcher.match(entity_id, platform, category, lambda: "TS011F")
+
+
+def test_rule_schema_needs_a_condition() -> None:
+    """Rules without conditions would match everything and are refused."""
+    assert RULE_SCHEMA({"domain": "sensor"}) == {"domain": "sensor"}
+    with pytest.raises(vol.Invalid):
+        RULE_SCHEMA({})
+    with pytest.raises(vol.Invalid):
+        RULE_SCHEMA({"entity_category": "unknown"})
+
+
+def test_first_matching_rule_wins() -> None:
+    """Rules are tried in order across the buckets they are filed in."""
+    matcher = RuleMatcher(
+        [
+            {"platform": "zha", "entity_id": "sensor.*_rssi"},
+            {"domain": "sensor", "entity_category": "diagnostic"},
+            {"entity_id_regex": r"_lqi$"},
+            {"platform": "zha", "model": "ts011*"},
+        ]
+    )
+    assert _match(matcher, "sensor.plug_rssi", "zha", "diagnostic") == 0
+    assert _match(matcher, "sensor.plug_lqi", "zha", "diagnostic") == 1
+    assert _match(matcher, "sensor.plug_lqi", "zha") == 2
+    assert _match(matcher, "switch.plug", "zha") == 3
+    assert _match(matcher, "switch.plug", "hue") is None
+    assert not RuleMatcher([])
+
+
+def test_invalid_rules() -> None:
+    """Broken patterns and conflicting conditions are refused."""
+    with pytest.raises(AutoDisableRuleError):
+        RuleMatcher([{"entity_id_regex": "("}])
+    with pytest.raises(AutoDisableRuleError):
+        RuleMatcher([{"entity_id": "sensor.*", "entity_id_regex": "sensor"}])
+
+
+async def test_new_entities_are_disabled_and_journaled() -> None:
+    """Matching entities are disabled as they register, in one journaled operation."""
+    hass = await async_make_hass()
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Entity Manager",
+        data={},
+        source="user",
+        options={CONF_AUTO_DISABLE_RULES: [{"entity_category": "diagnostic"}]},
+    )
+    journal = OperationJournal(hass)
+    auto_disable = AutoDisabler(hass, entry, EntityIndex(hass), MutationQueue(), journal)
+    unsubscribe = auto_disable.async_listen()
+    entity_registry = er.async_get(hass)
+    for unique_id in ("rssi", "lqi"):
+        entity_registry.async_get_or_create(
+            "sensor",
+            "zha",
+            unique_id,
+            suggested_object_id=unique_id,
+            entity_category=EntityCategory.DIAGNOSTIC,
+        )
+    entity_registry.async_get_or_create(
+        "sensor",
+        "zha",
+        "battery",
+        suggested_object_id="battery",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        disabled_by=er.RegistryEntryDisabler.INTEGRATION,
+    )
+    entity_registry.async_get_or_create("sensor", "zha", "power", suggested_object_id="power")
+    await hass.async_block_till_done()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert {
+        entity.entity_id: entity.disabled_by for entity in entity_registry.entities.values()
+    } == {
+        "sensor.rssi": er.RegistryEntryDisabler.USER,
+        "sensor.lqi": er.RegistryEntryDisabler.USER,
+        "sensor.battery": er.RegistryEntryDisabler.INTEGRATION,
+        "sensor.power": None,
+    }
+    assert auto_disable.disabled == 2
+    (operation,) = journal.async_operations()
+    assert (operation["command"], operation["entities"]) == (JOURNAL_COMMAND, 2)
+    entities = entity_registry.entities.values()
+    assert auto_disable.async_matching(auto_disable.matcher, entities) == []
+    unsubscribe()
+    await hass.async_stop(force=True)
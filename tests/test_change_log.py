@@ -0,0 +1,68 @@
+"""Tests of the registry revision and change log."""
+import asyncio
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.change_log import ChangeLog
+from entity_manager.device_lookup import DeviceLookup
+from entity_manager.entity_index import EntityIndex
+from synthetic_registry import async_make_hass
+
+
+async def _async_setup(size: int = 100) -> tuple[HomeAssistant, ChangeLog]:
+    """Return a core with a change log of an index and lookup listening to it."""
+    hass = await async_make_hass()
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    devices = DeviceLookup(hass)
+    devices.async_build()
+    devices.async_listen()
+    changes = ChangeLog(index, devices, size=size)
+    changes.async_listen()
+    return hass, changes
+
+
+async def _async_create(hass: HomeAssistant, *object_ids: str) -> None:
+    """Create lights in one loop pass and wait for the index to flush them."""
+    for object_id in object_ids:
+        er.async_get(hass).async_get_or_create(
+            "light", "hue", object_id, suggested_object_id=object_id
+        )
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+
+
+async def test_revision_per_batch() -> None:
+    """Each flushed batch bumps the revision once and is returned since older ones."""
+    hass, changes = await _async_setup()
+    start = changes.revision
+    assert changes.async_since(start) == ([], set())
+    await _async_create(hass, "a", "b")
+    assert changes.revision == start + 1
+    await _async_create(hass, "c")
+    assert changes.revision == start + 2
+
+    entity_changes, device_ids = changes.async_since(start)
+    assert [new["entity_id"] for _, new in entity_changes] == ["light.a", "light.b", "light.c"]
+    assert device_ids == set()
+    entity_changes, _ = changes.async_since(start + 1)
+    assert [new["entity_id"] for _, new in entity_changes] == ["light.c"]
+    assert changes.async_since(changes.revision) == ([], set())
+    await hass.async_stop(force=True)
+
+
+async def test_unknown_and_expired_revisions() -> None:
+    """Revisions from the future or older than the log get no changes."""
+    hass, changes = await _async_setup(size=2)
+    start = changes.revision
+    assert changes.async_since(start + 1) is None
+    assert changes.async_since(start - 1) is None
+    await _async_create(hass, "a")
+    await _async_create(hass, "b")
+    await _async_create(hass, "c")
+    assert changes.async_since(start) is None
+    entity_changes, _ = changes.async_since(start + 1)
+    assert [new["entity_id"] for _, new in entity_changes] == ["light.b", "light.c"]
+    await hass.async_stop(force=True)
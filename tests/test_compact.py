@@ -0,0 +1,65 @@
+"""Tests of the compact listing format."""
+from entity_manager.compact import INTERNED_FIELDS, CompactEncoder, intern
+from entity_manager.device_lookup import DeviceLookup
+from entity_manager.entity_index import NO_DEVICE, EntityIndex
+from synthetic_registry import async_make_hass, populate
+
+
+def test_intern() -> None:
+    """Columns share one table numbered in order of first occurrence."""
+    values, columns = intern(["b", "a", None, "b"], ["c", "a"])
+    assert values == ["b", "a", None, "c"]
+    assert columns == [[0, 1, 2, 0], [3, 1]]
+
+
+async def test_round_trip() -> None:
+    """Decoding the compact listing gives back the grouped listing."""
+    hass = await async_make_hass()
+    populate(hass, 300, seed=1)
+    index = EntityIndex(hass)
+    index.async_build()
+    devices = DeviceLookup(hass)
+    devices.async_build()
+    grouped = index.async_grouped("all")
+    encoder = CompactEncoder(devices)
+    encoder.async_add_groups(grouped)
+    result = encoder.async_result()
+
+    columns = result["entities"]
+    decoded = []
+    for position, entity_id in enumerate(columns["entity_id"]):
+        entity = {"entity_id": entity_id, "name": columns["name"][position]}
+        for field, table in INTERNED_FIELDS:
+            entity[field] = result[table][columns[field][position]]
+        device_table = result["devices"]
+        entity["device_id"] = device_table["device_id"][columns["device"][position]]
+        entity["is_disabled"] = entity["disabled_by"] is not None
+        decoded.append(entity)
+    expected = [
+        entity
+        for group in grouped
+        for device in group["devices"].values()
+        for entity in device["entities"]
+    ]
+    assert decoded == expected
+
+    groups = result["groups"]
+    assert [
+        (
+            result["platforms"][platform],
+            result["devices"]["device_id"][device] or NO_DEVICE,
+            total,
+            disabled,
+        )
+        for platform, device, total, disabled in zip(
+            groups["platform"],
+            groups["device"],
+            groups["total_entities"],
+            groups["disabled_entities"],
+        )
+    ] == [
+        (group["integration"], device_key, device["total_entities"], device["disabled_entities"])
+        for group in grouped
+        for device_key, device in group["devices"].items()
+    ]
+    await hass.async_stop(force=True)
@@ -0,0 +1,98 @@
+"""Tests of the shared reads and the mutation queue."""
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from entity_manager.concurrency import (
+    MutationConflict,
+    MutationQueue,
+    MutationQueueFull,
+    SharedReads,
+)
+
+
+def test_reads_are_shared_until_the_stamp_changes() -> None:
+    """Identical reads compute once per stamp; stale results are dropped."""
+    stamp = [0]
+    reads = SharedReads(lambda: stamp[0], size=2)
+    computed: list[str] = []
+
+    def compute(key: str) -> Callable[[], str]:
+        def read() -> str:
+            computed.append(key)
+            return key.upper()
+
+        return read
+
+    assert reads.async_shared("a", compute("a")) == "A"
+    assert reads.async_shared("a", compute("a")) == "A"
+    assert reads.async_shared("b", compute("b")) == "B"
+    assert computed == ["a", "b"]
+    assert (reads.hits, reads.misses) == (1, 2)
+
+    # Beyond the size, the least recently used read goes first
+    reads.async_shared("a", compute("a"))
+    reads.async_shared("c", compute("c"))
+    reads.async_shared("b", compute("b"))
+    assert computed == ["a", "b", "c", "b"]
+
+    stamp[0] = 1
+    reads.async_shared("a", compute("a"))
+    assert computed[-1] == "a"
+    assert reads.async_json("a", lambda: {"entities": []}) == b'{"entities":[]}'
+
+
+async def test_mutations_run_one_at_a_time_in_order() -> None:
+    """Queued mutations run sequentially, first come first served."""
+    queue = MutationQueue()
+    order: list[str] = []
+
+    def job(name: str) -> Callable[[], Awaitable[str]]:
+        async def run() -> str:
+            order.append(f"{name} start")
+            await asyncio.sleep(0)
+            order.append(f"{name} end")
+            return name
+
+        return run
+
+    results = await asyncio.gather(
+        queue.async_run(["light.a"], job("first")),
+        queue.async_run(["light.b"], job("second")),
+    )
+    assert results == ["first", "second"]
+    assert order == ["first start", "first end", "second start", "second end"]
+    assert queue.async_status() == {"pending": 0, "claimed_entities": 0}
+
+
+async def test_conflicts_and_backpressure() -> None:
+    """Claimed entities and full queues reject new mutations up front."""
+    queue = MutationQueue(max_pending=2, max_pending_entities=3)
+    release = asyncio.Event()
+
+    async def wait() -> None:
+        await release.wait()
+
+    running = asyncio.create_task(queue.async_run(["light.a", "light.b"], wait))
+    await asyncio.sleep(0)
+    assert queue.async_status() == {"pending": 1, "claimed_entities": 2}
+    with pytest.raises(MutationConflict) as conflict:
+        await queue.async_run(["light.b", "light.c"], wait)
+    assert conflict.value.entity_ids == ["light.b"]
+    assert conflict.value.code == "conflict"
+    with pytest.raises(MutationQueueFull):
+        await queue.async_run(["light.c", "light.d"], wait)
+
+    waiting = asyncio.create_task(queue.async_run(["light.c"], wait))
+    await asyncio.sleep(0)
+    with pytest.raises(MutationQueueFull):
+        await queue.async_run([], wait)
+
+    # A cancelled waiter withdraws its claim
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert queue.async_status() == {"pending": 1, "claimed_entities": 2}
+    release.set()
+    await running
+    assert queue.async_status() == {"pending": 0, "claimed_entities": 0}
@@ -0,0 +1,92 @@
+"""Tests of the cached device and area metadata."""
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+
+from entity_manager.device_lookup import DeviceLookup
+from synthetic_registry import async_make_hass
+
+
+async def _async_setup() -> tuple[HomeAssistant, DeviceLookup, str, str]:
+    """Return a core with a kitchen device and a lookup listening to it."""
+    hass = await async_make_hass()
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain="hue",
+        title="hue",
+        data={},
+        source="user",
+        options={},
+    )
+    hass.config_entries._entries[entry.entry_id] = entry  # pylint: disable=protected-access
+    kitchen = ar.async_get(hass).async_create("Kitchen")
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={("hue", "bridge")},
+        name="Bridge",
+        manufacturer="Signify",
+        model="BSB002",
+    )
+    dr.async_get(hass).async_update_device(device.id, area_id=kitchen.id)
+    await hass.async_block_till_done()
+    lookup = DeviceLookup(hass)
+    lookup.async_build()
+    lookup.async_listen()
+    return hass, lookup, device.id, kitchen.id
+
+
+async def test_describe_joins_device_and_area() -> None:
+    """An entity gets its device's area unless it has an area of its own."""
+    hass, lookup, device_id, kitchen_id = await _async_setup()
+    assert lookup.async_device(device_id) == {
+        "name": "Bridge",
+        "manufacturer": "Signify",
+        "model": "BSB002",
+        "area_id": kitchen_id,
+        "area": "Kitchen",
+    }
+    assert lookup.async_describe(device_id, None) == ("Bridge", kitchen_id, "Kitchen")
+    garage = ar.async_get(hass).async_create("Garage")
+    assert lookup.async_describe(device_id, garage.id) == ("Bridge", garage.id, "Garage")
+    assert lookup.async_describe(None, None) == (None, None, None)
+    assert lookup.async_device("unknown") is None
+    await hass.async_stop(force=True)
+
+
+async def test_registry_events_invalidate_entries() -> None:
+    """Device and area changes drop the cached entries and notify listeners."""
+    hass, lookup, device_id, kitchen_id = await _async_setup()
+    notified: list[tuple[set[str], set[str]]] = []
+    lookup.async_add_listener(lambda devices, areas: notified.append((devices, areas)))
+    lookup.async_device(device_id)
+    version = lookup.version
+
+    ar.async_get(hass).async_update(kitchen_id, name="Cooking")
+    await hass.async_block_till_done()
+    assert notified == [({device_id}, {kitchen_id})]
+    assert lookup.async_device(device_id)["area"] == "Cooking"
+
+    dr.async_get(hass).async_update_device(device_id, name_by_user="Hub")
+    await hass.async_block_till_done()
+    assert notified[-1] == ({device_id}, set())
+    assert lookup.async_device(device_id)["name"] == "Hub"
+    assert lookup.version == version + 2
+    await hass.async_stop(force=True)
+
+
+async def test_area_devices_follow_moves() -> None:
+    """The devices of each area are re-indexed as devices move or go away."""
+    hass, lookup, device_id, kitchen_id = await _async_setup()
+    assert lookup.async_area_devices(kitchen_id) == {device_id}
+    garage = ar.async_get(hass).async_create("Garage")
+    dr.async_get(hass).async_update_device(device_id, area_id=garage.id)
+    await hass.async_block_till_done()
+    assert lookup.async_area_devices(kitchen_id) == set()
+    assert lookup.async_area_devices(garage.id) == {device_id}
+    dr.async_get(hass).async_remove_device(device_id)
+    await hass.async_block_till_done()
+    assert lookup.async_area_devices(garage.id) == set()
+    assert lookup.async_device(device_id) is None
+    await hass.async_stop(force=True)
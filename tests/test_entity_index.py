@@ -0,0 +1,239 @@
+"""Tests of the event-driven entity index."""
+# pylint: disable=protected-access
+import asyncio
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.entity_index import (
+    NO_DEVICE,
+    SCOPES,
+    EntityChange,
+    EntityIndex,
+    matches_state,
+)
+from synthetic_registry import async_make_hass, populate
+
+
+async def _async_setup(entities: int = 0) -> tuple[HomeAssistant, EntityIndex]:
+    """Return a core with a populated registry and an index listening to it."""
+    hass = await async_make_hass()
+    if entities:
+        populate(hass, entities, seed=2)
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    return hass, index
+
+
+async def _async_flushed(hass: HomeAssistant) -> None:
+    """Wait for the registry events and the index flush they schedule."""
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+
+
+def _assert_matches_rebuild(hass: HomeAssistant, index: EntityIndex) -> None:
+    """Assert the patched index equals one built from the registry."""
+    rebuilt = EntityIndex(hass)
+    rebuilt.async_build()
+    assert index.entities == rebuilt.entities
+    assert index._sorted == rebuilt._sorted
+    for state in ("disabled", "enabled", "all"):
+        assert index.async_grouped(state) == rebuilt.async_grouped(state)
+    for scope, groups in rebuilt._scopes.items():
+        assert {key: group.entity_ids for key, group in index._scopes[scope].items()} == {
+            key: group.entity_ids for key, group in groups.items()
+        }
+
+
+async def test_registry_events_patch_the_index() -> None:
+    """Creates, updates, renames and removals keep the index equal to a rebuild."""
+    hass, index = await _async_setup(200)
+    entity_registry = er.async_get(hass)
+    entity_ids = sorted(index.entities)
+
+    entity_registry.async_get_or_create("light", "hue", "new", suggested_object_id="porch")
+    entity_registry.async_update_entity(
+        entity_ids[0], disabled_by=er.RegistryEntryDisabler.USER
+    )
+    entity_registry.async_update_entity(entity_ids[1], disabled_by=None)
+    entity_registry.async_update_entity(entity_ids[2], new_entity_id=f"{entity_ids[2]}_moved")
+    entity_registry.async_update_entity(entity_ids[3], device_id=None)
+    entity_registry.async_remove(entity_ids[4])
+    await hass.async_block_till_done()
+
+    assert "light.porch" in index.entities
+    assert index.entities[entity_ids[0]]["is_disabled"]
+    assert entity_ids[2] not in index.entities
+    assert f"{entity_ids[2]}_moved" in index.entities
+    assert entity_ids[4] not in index.entities
+    _assert_matches_rebuild(hass, index)
+    await hass.async_stop(force=True)
+
+
+async def test_superseded_events_converge() -> None:
+    """Events handled after later changes still leave the current registry state."""
+    hass, index = await _async_setup()
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create("switch", "zha", "1", suggested_object_id="pump")
+    entity_registry.async_update_entity("switch.pump", new_entity_id="switch.pump_2")
+    entity_registry.async_update_entity("switch.pump_2", new_entity_id="switch.pump_3")
+    await hass.async_block_till_done()
+    assert list(index.entities) == ["switch.pump_3"]
+    assert index.async_grouped("all") == [
+        {
+            "integration": "zha",
+            "devices": {
+                NO_DEVICE: {
+                    "device_id": None,
+                    "entities": [index.entities["switch.pump_3"]],
+                    "total_entities": 1,
+                    "disabled_entities": 0,
+                }
+            },
+            "total_entities": 1,
+            "disabled_entities": 0,
+        }
+    ]
+    entity_registry.async_remove("switch.pump_3")
+    await hass.async_block_till_done()
+    assert not index.entities
+    assert index.async_grouped("all") == []
+    _assert_matches_rebuild(hass, index)
+    await hass.async_stop(force=True)
+
+
+async def test_listeners_get_one_batch_per_loop_pass() -> None:
+    """Changes of one loop pass reach listeners as a single change list."""
+    hass, index = await _async_setup()
+    batches: list[list[EntityChange]] = []
+    index.async_add_listener(batches.append)
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create("light", "hue", "1", suggested_object_id="a")
+    entity_registry.async_get_or_create("light", "hue", "2", suggested_object_id="b")
+    await _async_flushed(hass)
+    assert len(batches) == 1
+    assert [(old, new["entity_id"]) for old, new in batches[0]] == [
+        (None, "light.a"),
+        (None, "light.b"),
+    ]
+
+    # An update is a removal of the old projection and an add of the new one
+    entity_registry.async_update_entity("light.a", disabled_by=er.RegistryEntryDisabler.USER)
+    await _async_flushed(hass)
+    assert len(batches) == 2
+    (old, removed), (added, new) = batches[1]
+    assert (removed, added) == (None, None)
+    assert (old["is_disabled"], new["is_disabled"]) == (False, True)
+    await hass.async_stop(force=True)
+
+
+async def test_hold_defers_the_flush_until_released() -> None:
+    """Changes made while held are delivered together after the last release."""
+    hass, index = await _async_setup()
+    batches: list[list[EntityChange]] = []
+    index.async_add_listener(batches.append)
+    entity_registry = er.async_get(hass)
+    release_outer = index.async_hold()
+    release_inner = index.async_hold()
+    entity_registry.async_get_or_create("light", "hue", "1", suggested_object_id="a")
+    await _async_flushed(hass)
+    entity_registry.async_get_or_create("light", "hue", "2", suggested_object_id="b")
+    await _async_flushed(hass)
+    assert "light.b" in index.entities
+    release_inner()
+    await _async_flushed(hass)
+    assert batches == []
+    entity_registry.async_remove("light.a")
+    release_outer()
+    await _async_flushed(hass)
+    assert len(batches) == 1
+    assert [
+        (old and old["entity_id"], new and new["entity_id"]) for old, new in batches[0]
+    ] == [(None, "light.a"), (None, "light.b"), ("light.a", None)]
+    await hass.async_stop(force=True)
+
+
+async def test_failing_listener_does_not_stop_others() -> None:
+    """A listener raising is logged and the remaining listeners still run."""
+    hass, index = await _async_setup()
+    batches: list[list[EntityChange]] = []
+
+    def fail(changes: list[EntityChange]) -> None:
+        raise RuntimeError("listener failed")
+
+    index.async_add_listener(fail)
+    remove = index.async_add_listener(batches.append)
+    er.async_get(hass).async_get_or_create("light", "hue", "1")
+    await _async_flushed(hass)
+    assert len(batches) == 1
+    remove()
+    er.async_get(hass).async_get_or_create("light", "hue", "2")
+    await _async_flushed(hass)
+    assert len(batches) == 1
+    await hass.async_stop(force=True)
+
+
+async def test_pages_follow_the_listing_order() -> None:
+    """Pages continue after their cursor key, also across index changes."""
+    hass, index = await _async_setup(200)
+    expected = index.async_entities(
+        entity_id
+        for entity_id, projection in index.entities.items()
+        if projection["is_disabled"]
+    )
+    assert index.async_count("disabled") == len(expected)
+    listed: list[dict[str, Any]] = []
+    after = None
+    while True:
+        page, after = index.async_page("disabled", after, 7)
+        listed.extend(page)
+        if after is None:
+            break
+    assert listed == expected
+
+    # An entity removed before the cursor does not shift the next page
+    page, after = index.async_page("all", None, 10)
+    er.async_get(hass).async_remove(page[0]["entity_id"])
+    await hass.async_block_till_done()
+    next_page, _ = index.async_page("all", after, 10)
+    assert next_page == index.async_entities(index.entities)[9:19]
+    await hass.async_stop(force=True)
+
+
+async def test_scopes_answer_like_a_scan() -> None:
+    """Each scope's index holds exactly the entities a registry scan selects."""
+    hass, index = await _async_setup(200)
+    er.async_get(hass).async_update_entity(
+        sorted(index.entities)[0], disabled_by=er.RegistryEntryDisabler.USER
+    )
+    await hass.async_block_till_done()
+    projections = index.entities.values()
+    for scope, key_of in SCOPES.items():
+        keys = index.async_scope_keys(scope)
+        assert set(keys) == {key_of(projection) for projection in projections}
+        for key in keys:
+            for state in ("disabled", "enabled", "all"):
+                assert index.async_scope(scope, key, state) == {
+                    projection["entity_id"]
+                    for projection in projections
+                    if key_of(projection) == key and matches_state(projection, state)
+                }
+    assert index.async_scope("domain", "unknown", "all") == set()
+
+    # Entities of the area's devices count in it unless they have an area of their own
+    device_id = next(
+        projection["device_id"] for projection in projections if projection["device_id"]
+    )
+    device_entities = index.async_scope("device", device_id, "all")
+    own_area, device_area = [area.id for area in ar.async_get(hass).async_list_areas()][:2]
+    moved = min(device_entities)
+    er.async_get(hass).async_update_entity(moved, area_id=own_area)
+    await hass.async_block_till_done()
+    assert index.async_area(device_area, [device_id], "all") == (
+        index.async_scope("area", device_area, "all") | device_entities - {moved}
+    )
+    assert moved in index.async_area(own_area, [], "all")
+    await hass.async_stop(force=True)
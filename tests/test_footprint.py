@@ -0,0 +1,116 @@
+"""Tests of the recorder footprint analysis."""
+import asyncio
+import contextlib
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from homeassistant.components.recorder.db_schema import Base, StateAttributes, States, StatesMeta
+from homeassistant.core import HomeAssistant
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from entity_manager import footprint
+from entity_manager.footprint import STATE_ROW_BYTES, RecorderFootprint
+from synthetic_registry import async_make_hass
+
+
+class _Recorder:
+    """Recorder instance running database jobs in the default executor."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the instance."""
+        self.hass = hass
+        self.jobs = 0
+
+    def async_add_executor_job(self, target: Any, *args: Any) -> asyncio.Future:
+        """Run a job in the executor."""
+        self.jobs += 1
+        return self.hass.loop.run_in_executor(None, target, *args)
+
+
+async def _async_setup(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> tuple[HomeAssistant, _Recorder]:
+    """Return a core whose recorder database holds the states of two entities."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'home-assistant_v2.db'}")
+    Base.metadata.create_all(engine)
+    now = time.time()
+    with Session(engine) as session:
+        session.execute(
+            insert(StatesMeta),
+            [
+                {"metadata_id": 1, "entity_id": "sensor.chatty"},
+                {"metadata_id": 2, "entity_id": "sensor.quiet"},
+            ],
+        )
+        session.execute(
+            insert(StateAttributes),
+            [
+                {"attributes_id": 1, "hash": 1, "shared_attrs": "x" * 10},
+                {"attributes_id": 2, "hash": 2, "shared_attrs": "y" * 20},
+            ],
+        )
+        session.execute(
+            insert(States),
+            [
+                # Attribute rows referenced twice are counted once
+                {"metadata_id": 1, "state": "on", "attributes_id": 1, "last_updated_ts": now},
+                {"metadata_id": 1, "state": "off", "attributes_id": 1, "last_updated_ts": now},
+                {"metadata_id": 1, "state": "on", "attributes_id": 2, "last_updated_ts": now},
+                {"metadata_id": 2, "state": "12", "attributes_id": 2, "last_updated_ts": now},
+                # Outside of a one hour window
+                {
+                    "metadata_id": 2,
+                    "state": "13",
+                    "attributes_id": 2,
+                    "last_updated_ts": now - 7200,
+                },
+            ],
+        )
+        session.commit()
+
+    @contextlib.contextmanager
+    def session_scope(**kwargs: Any) -> Iterator[Session]:
+        with Session(engine) as session:
+            yield session
+
+    hass = await async_make_hass()
+    recorder = _Recorder(hass)
+    monkeypatch.setattr(footprint, "session_scope", session_scope)
+    monkeypatch.setattr(footprint, "get_instance", lambda hass: recorder)
+    return hass, recorder
+
+
+async def test_usage_per_entity(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Rows and estimated bytes are summed per entity within the window."""
+    hass, _ = await _async_setup(monkeypatch, tmp_path)
+    _, usage = await RecorderFootprint(hass).async_analyze(1)
+    assert usage == {
+        "sensor.chatty": [3, 3 * STATE_ROW_BYTES + len("onoffon") + 10 + 20],
+        "sensor.quiet": [1, STATE_ROW_BYTES + len("12") + 20],
+    }
+    _, usage = await RecorderFootprint(hass).async_analyze(3)
+    assert usage["sensor.quiet"][0] == 2
+    await hass.async_stop(force=True)
+
+
+async def test_analyses_are_cached_and_shared(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Concurrent requests share one analysis, which is cached until refreshed."""
+    hass, recorder = await _async_setup(monkeypatch, tmp_path)
+    analyzer = RecorderFootprint(hass)
+    first, second = await asyncio.gather(analyzer.async_analyze(1), analyzer.async_analyze(1))
+    assert first is second
+    assert recorder.jobs == 1
+    assert await analyzer.async_analyze(1) == first
+    assert recorder.jobs == 1
+    await analyzer.async_analyze(1, refresh=True)
+    assert recorder.jobs == 2
+    analyzer.async_clear()
+    await analyzer.async_analyze(1)
+    assert recorder.jobs == 3
+    await hass.async_stop(force=True)
@@ -0,0 +1,106 @@
+"""Tests of the operation journal and undo."""
+# pylint: disable=protected-access
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.journal import OperationJournal
+from entity_manager.transaction import RegistryTransaction
+from synthetic_registry import async_make_hass
+
+USER = er.RegistryEntryDisabler.USER
+
+
+async def _async_setup() -> tuple[HomeAssistant, OperationJournal]:
+    """Return a core with three lights and an empty journal."""
+    hass = await async_make_hass()
+    entity_registry = er.async_get(hass)
+    for object_id in "abc":
+        entity_registry.async_get_or_create(
+            "light", "hue", object_id, suggested_object_id=object_id
+        )
+    journal = OperationJournal(hass)
+    await journal.async_load()
+    return hass, journal
+
+
+async def _async_apply(hass: HomeAssistant, updates: list[tuple[str, dict[str, Any]]]) -> list:
+    """Apply updates in a transaction; return its records."""
+    transaction = RegistryTransaction(hass)
+    for entity_id, changes in updates:
+        transaction.async_update(entity_id, **changes)
+    return (await transaction.async_commit())["success"]
+
+
+async def test_undo_replays_inverse_records() -> None:
+    """Undoing an operation reverts it, renames included, and is journaled itself."""
+    hass, journal = await _async_setup()
+    records = await _async_apply(
+        hass,
+        [
+            ("light.a", {"disabled_by": USER}),
+            ("light.b", {"new_entity_id": "light.d"}),
+            ("light.c", {"new_entity_id": "light.b"}),
+        ],
+    )
+    operation_id = journal.async_record("entity_manager/bulk", records)
+    operation = journal.async_latest()
+    assert operation["id"] == operation_id
+
+    inverse, skipped = journal.async_inverse(operation)
+    assert skipped == []
+    assert [entity_id for entity_id, _ in inverse] == ["light.b", "light.d", "light.a"]
+    undo_records = await _async_apply(hass, inverse)
+    undo_id = journal.async_record("entity_manager/undo", undo_records, operation)
+    entity_registry = er.async_get(hass)
+    assert entity_registry.async_get("light.a").disabled_by is None
+    assert entity_registry.async_get("light.b").unique_id == "b"
+    assert entity_registry.async_get("light.c").unique_id == "c"
+
+    assert [
+        (summary["id"], summary["undoes"], summary["undone_by"])
+        for summary in journal.async_operations()
+    ] == [(undo_id, operation_id, None), (operation_id, None, undo_id)]
+    assert journal.async_latest() is None
+    await hass.async_stop(force=True)
+
+
+async def test_inverse_skips_entities_changed_since() -> None:
+    """Entities changed again or removed since an operation are left alone."""
+    hass, journal = await _async_setup()
+    records = await _async_apply(
+        hass, [("light.a", {"disabled_by": USER}), ("light.b", {"disabled_by": USER})]
+    )
+    journal.async_record("entity_manager/bulk", records)
+    er.async_get(hass).async_update_entity("light.a", disabled_by=None)
+    er.async_get(hass).async_remove("light.b")
+    inverse, skipped = journal.async_inverse(journal.async_latest())
+    assert inverse == []
+    assert skipped == [
+        {"entity_id": "light.b", "error": "Entity not found"},
+        {"entity_id": "light.a", "error": "Changed since"},
+    ]
+    await hass.async_stop(force=True)
+
+
+async def test_ring_limits_and_persistence() -> None:
+    """The oldest operations are dropped; the ring survives a reload."""
+    hass, _ = await _async_setup()
+    journal = OperationJournal(hass, size=2)
+    unchanged = {"entity_id": "light.a", "before": {}, "after": {}}
+    assert journal.async_record("entity_manager/bulk", [unchanged]) is None
+    for entity_id in ("light.a", "light.b", "light.c"):
+        journal.async_record(
+            "entity_manager/bulk", await _async_apply(hass, [(entity_id, {"disabled_by": USER})])
+        )
+    assert [summary["id"] for summary in journal.async_operations()] == [3, 2]
+    await journal._store.async_save(journal._data_to_save())
+
+    reloaded = OperationJournal(hass)
+    await reloaded.async_load()
+    assert reloaded.async_operations() == journal.async_operations()
+    inverse, _ = reloaded.async_inverse(reloaded.async_latest())
+    assert inverse == [("light.c", {"disabled_by": None})]
+    assert reloaded.async_record("entity_manager/undo", await _async_apply(hass, inverse)) == 4
+    await hass.async_stop(force=True)
@@ -0,0 +1,131 @@
+"""Tests of the per-command metrics."""
+import asyncio
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant, callback
+
+from entity_manager.const import DATA_METRICS, DOMAIN
+from entity_manager.metrics import CommandStats, Metrics, metered_command
+from synthetic_registry import async_make_hass
+
+
+class _Connection:
+    """Websocket connection recording what it is sent."""
+
+    def __init__(self) -> None:
+        """Initialize an empty outbox."""
+        self.messages: list[Any] = []
+        self.errors: list[str] = []
+
+    def send_message(self, message: Any) -> None:
+        """Record a message."""
+        self.messages.append(message)
+
+    def send_error(self, msg_id: int, code: str, message: str) -> None:
+        """Record an error code."""
+        self.errors.append(code)
+
+
+async def _async_setup() -> tuple[HomeAssistant, Metrics]:
+    """Return a core with metrics registered as the config entry does."""
+    hass = await async_make_hass()
+    metrics = Metrics()
+    hass.data[DOMAIN] = {DATA_METRICS: metrics}
+    return hass, metrics
+
+
+def test_histogram_and_percentiles() -> None:
+    """Calls land in their latency bucket; percentiles report bucket bounds."""
+    stats = CommandStats()
+    assert stats.percentile(0.5) is None
+    for duration_ms in (0.5, 3, 3, 7, 20000):
+        stats.record(duration_ms, entities=2)
+    assert stats.buckets[:3] == [1, 2, 1]
+    assert stats.buckets[-1] == 1
+    assert stats.percentile(0.5) == 5.0
+    assert stats.percentile(0.99) == 20000
+    assert stats.as_dict()["entities"] == 10
+    assert stats.blocking_ms == 0
+
+
+async def test_callback_commands_block() -> None:
+    """@callback handlers count as blocking; their errors and payloads are counted."""
+    hass, metrics = await _async_setup()
+
+    @metered_command
+    @callback
+    def handle(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        connection.send_result(msg["id"], {"ok": True})
+        connection.send_error(msg["id"], "failed", "Failed")
+
+    connection = _Connection()
+    handle(hass, connection, {"id": 1, "type": "test/callback", "entity_ids": ["a", "b"]})
+    stats = metrics.commands["test/callback"]
+    assert (stats.calls, stats.errors, stats.entities) == (1, 1, 2)
+    assert stats.payload_bytes == len(connection.messages[0]) > 0
+    assert connection.errors == ["failed"]
+    assert stats.blocking_ms == stats.total_ms
+    await hass.async_stop(force=True)
+
+
+async def test_coroutine_commands_are_timed_whole() -> None:
+    """A coroutine handler is timed across its awaits and does not count as blocking."""
+    hass, metrics = await _async_setup()
+
+    @metered_command
+    async def handle(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        await asyncio.sleep(0.02)
+        await asyncio.sleep(0)
+        connection.send_result(msg["id"])
+
+    await handle(hass, _Connection(), {"id": 1, "type": "test/async"})
+    stats = metrics.commands["test/async"]
+    assert stats.calls == 1
+    assert stats.max_ms >= 20
+    assert stats.blocking_ms == 0
+
+    @metered_command
+    async def fail(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        await fail(hass, _Connection(), {"id": 2, "type": "test/fail"})
+    assert metrics.commands["test/fail"].errors == 1
+    await hass.async_stop(force=True)
+
+
+async def test_subscription_events_are_not_billed() -> None:
+    """Events sent after a subscribe handler returns are not counted."""
+    hass, metrics = await _async_setup()
+    subscriptions: list[Any] = []
+
+    @metered_command
+    @callback
+    def handle(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        subscriptions.append(connection)
+        connection.send_result(msg["id"])
+
+    connection = _Connection()
+    handle(hass, connection, {"id": 1, "type": "test/subscribe"})
+    payload_bytes = metrics.commands["test/subscribe"].payload_bytes
+    subscriptions[0].send_event(1, {"changed": ["light.a"]})
+    subscriptions[0].send_error(1, "failed", "Failed")
+    assert len(connection.messages) == 2
+    assert metrics.commands["test/subscribe"].payload_bytes == payload_bytes
+    assert metrics.commands["test/subscribe"].errors == 0
+    await hass.async_stop(force=True)
+
+
+async def test_unmetered_without_entry() -> None:
+    """Handlers run unmetered when the config entry is not loaded."""
+    hass = await async_make_hass()
+
+    @metered_command
+    async def handle(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        connection.send_message({"id": msg["id"]})
+
+    connection = _Connection()
+    await handle(hass, connection, {"id": 1, "type": "test/async"})
+    assert connection.messages == [{"id": 1}]
+    await hass.async_stop(force=True)
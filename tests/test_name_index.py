@@ -0,0 +1,98 @@
+"""Tests of the spoken entity name resolution."""
+import asyncio
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.device_lookup import DeviceLookup
+from entity_manager.entity_index import EntityIndex
+from entity_manager.name_index import (
+    MATCH_EXACT,
+    MATCH_FUZZY,
+    MATCH_PREFIX,
+    NameIndex,
+    normalize,
+)
+from synthetic_registry import async_make_hass
+
+
+async def _async_setup() -> tuple[HomeAssistant, NameIndex]:
+    """Return a core with a few lights and a name index listening to them."""
+    hass = await async_make_hass()
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create(
+        "light", "hue", "1", suggested_object_id="kitchen_ceiling", original_name="Ceiling"
+    )
+    entity_registry.async_get_or_create(
+        "light", "hue", "2", suggested_object_id="kitchen_island", original_name="Island"
+    )
+    entity_registry.async_get_or_create(
+        "light", "hue", "3", suggested_object_id="desk", original_name="Desk Lamp"
+    )
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    devices = DeviceLookup(hass)
+    devices.async_build()
+    names = NameIndex(hass, index, devices)
+    names.async_build()
+    names.async_listen()
+    return hass, names
+
+
+def test_normalize() -> None:
+    """Spoken names are compared lowercased, without punctuation."""
+    assert normalize("  The Kitchen-Light! ") == "the kitchen light"
+    assert normalize(None) == ""
+
+
+async def test_resolve_stages() -> None:
+    """Exact phrases win over prefixes, which win over fuzzy word matches."""
+    hass, names = await _async_setup()
+    assert names.async_resolve("Desk Lamp") == (MATCH_EXACT, ["light.desk"])
+    assert names.async_resolve("desk la") == (MATCH_PREFIX, ["light.desk"])
+    assert names.async_resolve("kitchen") == (
+        MATCH_PREFIX,
+        ["light.kitchen_ceiling", "light.kitchen_island"],
+    )
+    assert names.async_resolve("lamp desk") == (MATCH_FUZZY, ["light.desk"])
+    assert names.async_resolve("kitchen iland") == (MATCH_FUZZY, ["light.kitchen_island"])
+    assert names.async_resolve("garage") == (None, [])
+    assert names.async_resolve("") == (None, [])
+    await hass.async_stop(force=True)
+
+
+async def test_follows_registry_changes() -> None:
+    """Renamed, added and removed entities are reindexed."""
+    hass, names = await _async_setup()
+    entity_registry = er.async_get(hass)
+    entity_registry.async_update_entity("light.desk", name="Reading Light", aliases={"Study"})
+    entity_registry.async_remove("light.kitchen_island")
+    entity_registry.async_get_or_create(
+        "light", "hue", "4", suggested_object_id="porch", original_name="Porch"
+    )
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)
+    assert names.async_resolve("reading light") == (MATCH_EXACT, ["light.desk"])
+    assert names.async_resolve("study") == (MATCH_EXACT, ["light.desk"])
+    assert names.async_resolve("island") == (None, [])
+    assert names.async_resolve("porch") == (MATCH_EXACT, ["light.porch"])
+    assert names.async_label("light.desk") == "Reading Light"
+    await hass.async_stop(force=True)
+
+
+async def test_resolve_scope() -> None:
+    """Areas and integrations match exactly, by prefix or by every spoken word."""
+    hass, names = await _async_setup()
+    area_registry = ar.async_get(hass)
+    kitchen = area_registry.async_create("Kitchen", aliases={"Cookhouse"})
+    upstairs = area_registry.async_create("Upstairs Kitchen")
+    assert names.async_resolve_scope("area", "kitchen") == [kitchen.id]
+    assert names.async_resolve_scope("area", "cookhouse") == [kitchen.id]
+    assert names.async_resolve_scope("area", "upstairs") == [upstairs.id]
+    assert names.async_resolve_scope("area", "kitchen upstairs") == [upstairs.id]
+    assert names.async_resolve_scope("area", "garage") == []
+    assert names.async_resolve_scope("integration", "Hue") == ["hue"]
+    assert names.async_resolve_scope("device", "bridge") == []
+    await hass.async_stop(force=True)
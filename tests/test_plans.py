@@ -0,0 +1,163 @@
+"""Tests of plan export and import."""
+# pylint: disable=protected-access
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager import websocket_api
+from entity_manager.concurrency import MutationQueue
+from entity_manager.const import DATA_INDEX, DATA_MUTATIONS, DOMAIN
+from entity_manager.device_lookup import DeviceLookup
+from entity_manager.entity_index import EntityIndex
+from entity_manager.plans import (
+    PlanError,
+    PlanReader,
+    async_export_row,
+    async_plan_changes,
+    encode_rows,
+    plan_format,
+    plan_path,
+)
+from synthetic_registry import async_make_hass
+
+USER = er.RegistryEntryDisabler.USER
+
+
+async def _async_setup() -> tuple[HomeAssistant, EntityIndex]:
+    """Return a core with three lights, one disabled, and the index and queue."""
+    hass = await async_make_hass()
+    entity_registry = er.async_get(hass)
+    for object_id in "abc":
+        entity_registry.async_get_or_create(
+            "light", "hue", object_id, suggested_object_id=object_id
+        )
+    entity_registry.async_update_entity("light.c", disabled_by=USER, name="Porch")
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    hass.data[DOMAIN] = {DATA_INDEX: index, DATA_MUTATIONS: MutationQueue()}
+    return hass, index
+
+
+def test_plan_format() -> None:
+    """The format comes from the extension unless it is given."""
+    assert plan_format("plan.csv", None) == "csv"
+    assert plan_format("plan.jsonl", None) == "ndjson"
+    assert plan_format("plan.txt", "csv") == "csv"
+    with pytest.raises(PlanError):
+        plan_format("plan.txt", None)
+
+
+async def test_plan_path_stays_in_config_dir() -> None:
+    """Plan files cannot be outside of the configuration directory."""
+    hass = await async_make_hass()
+    assert plan_path(hass, "plans/a.csv") == str(Path(hass.config.path("plans/a.csv")).resolve())
+    for path in ("../a.csv", "/etc/passwd", "plans/../../a.csv"):
+        with pytest.raises(PlanError):
+            plan_path(hass, path)
+    await hass.async_stop(force=True)
+
+
+async def test_export_round_trip(tmp_path: Path) -> None:
+    """An unedited export reads back as rows without changes, in both formats."""
+    hass, index = await _async_setup()
+    devices = DeviceLookup(hass)
+    rows = [async_export_row(devices, projection) for projection in index.entities.values()]
+    for fmt in ("ndjson", "csv"):
+        path = tmp_path / f"plan.{fmt}"
+        path.write_text(
+            encode_rows(rows[:1], fmt, header=True) + encode_rows(rows[1:], fmt), "utf-8"
+        )
+        reader = PlanReader(str(path), fmt)
+        chunks = [reader.read(2), reader.read(2), reader.read(2)]
+        reader.close()
+        assert [len(chunk) for chunk in chunks] == [2, 1, 0]
+        for _, row, error in chunks[0] + chunks[1]:
+            assert error is None
+            assert async_plan_changes(index, row)[1] == {}
+    await hass.async_stop(force=True)
+
+
+def test_reader_reports_bad_rows(tmp_path: Path) -> None:
+    """Rows that cannot be parsed are reported with their line."""
+    path = tmp_path / "plan.ndjson"
+    path.write_text('{"entity_id": "light.a"}\n\n[1]\nnot json\n', "utf-8")
+    reader = PlanReader(str(path), "ndjson")
+    rows = reader.read(10)
+    reader.close()
+    assert [(line, error is None) for line, _, error in rows] == [(1, True), (3, False), (4, False)]
+    assert rows[1][2] == "Rows must be JSON objects"
+
+    path = tmp_path / "plan.csv"
+    path.write_text("entity_id,name\nlight.a,A,extra\nlight.b\n", "utf-8")
+    reader = PlanReader(str(path), "csv")
+    rows = reader.read(10)
+    reader.close()
+    assert rows == [
+        (2, None, "More values than columns"),
+        (3, {"entity_id": "light.b"}, None),
+    ]
+    with pytest.raises(PlanError):
+        PlanReader(str(tmp_path / "missing.csv"), "csv")
+
+
+async def test_plan_changes() -> None:
+    """Rows ask for the changes not already in effect; invalid ones are refused."""
+    hass, index = await _async_setup()
+    assert async_plan_changes(index, {"entity_id": "light.a", "action": "disable"}) == (
+        "light.a",
+        {"disabled_by": USER},
+    )
+    assert async_plan_changes(
+        index, {"entity_id": "light.c", "disabled_by": "", "name": "", "new_entity_id": "light.d"}
+    ) == ("light.c", {"disabled_by": None, "name": None, "new_entity_id": "light.d"})
+    assert async_plan_changes(index, {"entity_id": "light.c", "action": "disable"}) == (
+        "light.c",
+        {},
+    )
+    for row, error in (
+        ({"entity_id": "light.missing"}, "Entity not found"),
+        ({"entity_id": "light.a", "action": "toggle"}, "Unknown action"),
+        ({"entity_id": "light.a", "disabled_by": "integration"}, "Only disabled_by user"),
+        ({"entity_id": "light.a", "new_entity_id": "switch.a"}, "cannot change the domain"),
+        ({"entity_id": "light.a", "name": 1}, "must be a string"),
+    ):
+        with pytest.raises(PlanError, match=error):
+            async_plan_changes(index, row)
+    await hass.async_stop(force=True)
+
+
+async def test_import_chunk_checks_renames() -> None:
+    """Renames onto doubly claimed or taken IDs are invalid; swaps are applied."""
+    hass, index = await _async_setup()
+    rows = [
+        (1, {"entity_id": "light.a", "new_entity_id": "light.b"}, None),
+        (2, {"entity_id": "light.b", "new_entity_id": "light.a", "name": "B"}, None),
+        (3, {"entity_id": "light.c", "new_entity_id": "light.a"}, None),
+        (4, {"entity_id": "light.a", "action": "disable"}, None),
+        (5, None, "Invalid JSON"),
+    ]
+    report = await websocket_api._async_import_chunk(hass, index, rows, dry_run=True)
+    assert [entry["result"] for entry in report] == [
+        "valid",
+        "valid",
+        "invalid",
+        "invalid",
+        "invalid",
+    ]
+    assert "light.a" in report[2]["error"]
+    assert report[3]["error"] == "Entity also planned on line 1"
+
+    report = await websocket_api._async_import_chunk(hass, index, rows[:2], dry_run=False)
+    assert [entry["result"] for entry in report] == ["applied", "applied"]
+    entity_registry = er.async_get(hass)
+    assert entity_registry.async_get("light.a").unique_id == "b"
+    assert entity_registry.async_get("light.a").name == "B"
+    assert entity_registry.async_get("light.b").unique_id == "a"
+
+    report = await websocket_api._async_import_chunk(hass, index, rows[2:3], dry_run=False)
+    assert report[0]["result"] == "invalid"
+    assert entity_registry.async_get("light.c") is not None
+    await hass.async_stop(force=True)
@@ -0,0 +1,31 @@
+"""Tests of the heavy-hitter counters of the state change profiler."""
+from entity_manager.profiler import HeavyHitters
+
+
+def test_exact_under_capacity() -> None:
+    """Keys are counted exactly while the counters are not full."""
+    hitters = HeavyHitters(capacity=4)
+    for key in "aabbbc":
+        hitters.add(key)
+    assert hitters.counts == {"a": 2, "b": 3, "c": 1}
+    assert hitters.errors == {}
+    assert hitters.floor == 0
+    assert hitters.total == 6
+
+
+def test_pruned_counts_are_bounded() -> None:
+    """After pruning, counts never undercount and overcount by at most their error."""
+    hitters = HeavyHitters(capacity=2)
+    stream = ["hot"] * 10 + ["warm"] * 5 + ["a", "b", "c", "d", "e", "f"] + ["hot"] * 3
+    for key in stream:
+        hitters.add(key)
+    assert len(hitters.counts) <= 2 * hitters.capacity
+    # c and d entered at the first floor, 1, and set the second one
+    assert hitters.floor == 2
+    assert hitters.total == len(stream)
+    assert hitters.counts["hot"] == 13
+    assert hitters.counts["warm"] == 5
+    for key, count in hitters.counts.items():
+        true_count = stream.count(key)
+        assert true_count <= count <= true_count + hitters.errors.get(key, 0)
+    assert set(hitters.errors) <= set(hitters.counts)
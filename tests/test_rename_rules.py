@@ -0,0 +1,167 @@
+"""Tests of the rename rules and the ordering of entity_id renames."""
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.rename_rules import (
+    RenamePlan,
+    RenameRule,
+    RenameRuleError,
+    async_plan_renames,
+)
+from synthetic_registry import async_make_hass
+
+
+async def _async_setup() -> HomeAssistant:
+    """Return a core with a few named lights."""
+    hass = await async_make_hass()
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create(
+        "light", "hue", "1", suggested_object_id="kitchen_lamp", original_name="Kitchen Lamp"
+    )
+    entity_registry.async_get_or_create(
+        "light", "hue", "2", suggested_object_id="hall_lamp", original_name="Hall Lamp"
+    )
+    entity_registry.async_get_or_create(
+        "light", "hue", "3", suggested_object_id="porch", original_name="Porch"
+    )
+    return hass
+
+
+def test_invalid_rules() -> None:
+    """Rules that cannot be compiled are rejected."""
+    with pytest.raises(RenameRuleError, match="cannot be empty"):
+        RenameRule("", "x")
+    with pytest.raises(RenameRuleError, match="Invalid pattern"):
+        RenameRule("(", "x", regex=True)
+    with pytest.raises(RenameRuleError, match="Unknown template token"):
+        RenameRule("", "{room}", template=True)
+    with pytest.raises(RenameRuleError, match="Unknown rename target"):
+        RenameRule("a", "b", target="icon")
+
+
+async def test_literal_regex_and_template_rules() -> None:
+    """Names and object_ids are rewritten; unmatched entities are unchanged."""
+    hass = await _async_setup()
+    entry = er.async_get(hass).async_get("light.kitchen_lamp")
+    porch = er.async_get(hass).async_get("light.porch")
+    rule = RenameRule("lamp", "Light", ignore_case=True)
+    assert rule.async_apply(hass, entry) == "Kitchen Light"
+    assert rule.async_apply(hass, porch) is None
+    rule = RenameRule(r"(\w+) Lamp", r"Lamp \1", regex=True)
+    assert rule.async_apply(hass, entry) == "Lamp Kitchen"
+    rule = RenameRule("", "{platform} {name} {{x}}", template=True)
+    assert rule.async_apply(hass, entry) == "hue Kitchen Lamp {x}"
+    rule = RenameRule("_lamp", "_{original_name}", target="entity_id", template=True)
+    assert rule.async_apply(hass, entry) == "light.kitchen_kitchen_lamp"
+    await hass.async_stop(force=True)
+
+
+async def test_preview_sorts_entities() -> None:
+    """A preview sorts entities into changes, skips and failures."""
+    hass = await _async_setup()
+    rule = RenameRule("_lamp", "", target="entity_id")
+    plan = async_plan_renames(
+        hass, rule, ["light.kitchen_lamp", "light.porch", "light.missing"]
+    )
+    assert plan["changes"] == [
+        {
+            "entity_id": "light.kitchen_lamp",
+            "before": "light.kitchen_lamp",
+            "after": "light.kitchen",
+        }
+    ]
+    assert plan["skipped"] == ["light.porch"]
+    assert plan["failed"] == [{"entity_id": "light.missing", "error": "Entity not found"}]
+    await hass.async_stop(force=True)
+
+
+async def test_preview_leaves_out_collisions() -> None:
+    """Renames onto a taken or doubly claimed ID are reported, not planned."""
+    hass = await _async_setup()
+    rule = RenameRule(r"^\w+_lamp$", "porch", target="entity_id", regex=True)
+    plan = async_plan_renames(hass, rule, ["light.kitchen_lamp", "light.hall_lamp"])
+    assert plan["changes"] == []
+    assert {collision["entity_id"] for collision in plan["collisions"]} == {
+        "light.kitchen_lamp",
+        "light.hall_lamp",
+    }
+    assert er.async_get(hass).async_get("light.kitchen_lamp") is not None
+    await hass.async_stop(force=True)
+
+
+def test_chain_moves_last_entity_first() -> None:
+    """A chain of renames frees each target before it is used."""
+    plan = RenamePlan(
+        {"light.a": "light.b", "light.b": "light.c"}, {"light.a", "light.b"}
+    )
+    assert plan.steps == [("light.b", "light.c"), ("light.a", "light.b")]
+    assert not plan.collisions
+    assert not plan.temporary
+    assert len(plan) == 2
+
+
+def test_swap_goes_through_a_temporary_id() -> None:
+    """A cycle is opened with a temporary ID that is moved to its target last."""
+    plan = RenamePlan({"light.a": "light.b", "light.b": "light.a"}, {"light.a", "light.b"})
+    assert plan.temporary == {"light.a_em_tmp": "light.a"}
+    assert plan.steps == [
+        ("light.a", "light.a_em_tmp"),
+        ("light.b", "light.a"),
+        ("light.a_em_tmp", "light.b"),
+    ]
+    assert len(plan) == 2
+
+
+def test_temporary_id_avoids_taken_ids() -> None:
+    """The temporary ID of a cycle is not one already in use."""
+    taken = {"light.a", "light.b", "light.a_em_tmp"}
+    plan = RenamePlan({"light.a": "light.b", "light.b": "light.a"}, taken)
+    assert list(plan.temporary) == ["light.a_em_tmp_2"]
+
+
+def test_collisions() -> None:
+    """Invalid, cross-domain, taken and doubly claimed targets collide."""
+    plan = RenamePlan(
+        {
+            "light.a": "light.Not Valid",
+            "light.b": "switch.b",
+            "light.c": "light.taken",
+            "light.d": "light.new",
+            "light.e": "light.new",
+        },
+        {"light.a", "light.b", "light.c", "light.d", "light.e", "light.taken"},
+    )
+    assert set(plan.collisions) == {"light.a", "light.b", "light.c", "light.e"}
+    assert plan.steps == [("light.d", "light.new")]
+
+
+def test_rename_into_a_failed_rename_collides() -> None:
+    """A target stays in use when the rename moving it away fails."""
+    plan = RenamePlan(
+        {"light.a": "light.b", "light.b": "light.taken"},
+        {"light.a", "light.b", "light.taken"},
+    )
+    assert set(plan.collisions) == {"light.a", "light.b"}
+    assert "stays in use" in plan.collisions["light.a"]
+    assert not plan.steps
+
+
+def test_unchanged_ids_are_dropped() -> None:
+    """Renames to the same ID are not planned."""
+    plan = RenamePlan({"light.a": "light.a"}, {"light.a"})
+    assert not plan.steps
+    assert len(plan) == 0
+
+
+def test_renames_hide_temporary_steps() -> None:
+    """Applied records report each entity's original and final ID."""
+    plan = RenamePlan({"light.a": "light.b", "light.b": "light.a"}, {"light.a", "light.b"})
+    records = [
+        {"entity_id": old_id, "before": {"entity_id": old_id}, "after": {"entity_id": new_id}}
+        for old_id, new_id in plan.steps
+    ]
+    assert plan.renames(records) == [
+        {"entity_id": "light.b", "new_entity_id": "light.a"},
+        {"entity_id": "light.a", "new_entity_id": "light.b"},
+    ]
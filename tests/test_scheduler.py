@@ -0,0 +1,54 @@
+"""Tests of the ordering of scheduled re-enables."""
+# pylint: disable=protected-access
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+
+from entity_manager.concurrency import MutationQueue
+from entity_manager.entity_index import EntityIndex
+from entity_manager.scheduler import ReenableScheduler
+from synthetic_registry import async_make_hass
+
+
+async def test_pending_order() -> None:
+    """Pending re-enables are listed earliest first, ties by entity_id."""
+    hass = await async_make_hass()
+    scheduler = ReenableScheduler(hass, EntityIndex(hass), MutationQueue())
+    now = dt_util.utcnow().replace(microsecond=0)
+    scheduler.async_schedule(["light.c", "light.a"], now + timedelta(hours=2))
+    scheduler.async_schedule(["light.b"], now + timedelta(hours=1))
+    scheduler.async_schedule(["light.d"], now + timedelta(hours=3))
+    assert scheduler.async_pending() == [
+        (now + timedelta(hours=1), "light.b"),
+        (now + timedelta(hours=2), "light.a"),
+        (now + timedelta(hours=2), "light.c"),
+        (now + timedelta(hours=3), "light.d"),
+    ]
+
+    # Rescheduling replaces the earlier time; cancelled entities are dropped
+    scheduler.async_schedule(["light.d"], now + timedelta(minutes=30))
+    scheduler.async_cancel(["light.b", "light.unknown"])
+    assert scheduler.async_pending() == [
+        (now + timedelta(minutes=30), "light.d"),
+        (now + timedelta(hours=2), "light.a"),
+        (now + timedelta(hours=2), "light.c"),
+    ]
+    assert scheduler.async_reenable_at("light.b") is None
+    await hass.async_stop(force=True)
+
+
+async def test_timer_follows_earliest() -> None:
+    """Once started, the timer is armed for the earliest live re-enable."""
+    hass = await async_make_hass()
+    scheduler = ReenableScheduler(hass, EntityIndex(hass), MutationQueue())
+    now = dt_util.utcnow()
+    scheduler.async_schedule(["light.a"], now + timedelta(hours=2))
+    scheduler.async_schedule(["light.b"], now + timedelta(hours=1))
+    assert scheduler._timer_due is None
+    scheduler.async_start()
+    assert scheduler._timer_due == (now + timedelta(hours=1)).timestamp()
+    scheduler.async_cancel(["light.b"])
+    assert scheduler._timer_due == (now + timedelta(hours=2)).timestamp()
+    scheduler.async_cancel(["light.a"])
+    assert scheduler._timer_due is None
+    await hass.async_stop(force=True)
@@ -0,0 +1,99 @@
+"""Tests of the ranked entity search."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.device_lookup import DeviceLookup
+from entity_manager.entity_index import EntityIndex
+from entity_manager.search import SearchIndex, tokenize
+from synthetic_registry import async_make_hass
+
+
+async def _async_setup() -> tuple[HomeAssistant, EntityIndex, SearchIndex]:
+    """Return a core with a few entities and a search index listening to them."""
+    hass = await async_make_hass()
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create(
+        "light", "hue", "1", suggested_object_id="kitchen_ceiling", original_name="Ceiling"
+    )
+    entity_registry.async_get_or_create(
+        "light", "hue", "2", suggested_object_id="kitchen_island", original_name="Island"
+    )
+    entity_registry.async_get_or_create(
+        "sensor",
+        "zha",
+        "3",
+        suggested_object_id="kitchen_temperature",
+        original_name="Temperature",
+        disabled_by=er.RegistryEntryDisabler.USER,
+    )
+    entity_registry.async_get_or_create(
+        "switch", "zha", "4", suggested_object_id="garage_door", original_name="Door"
+    )
+    await hass.async_block_till_done()
+    index = EntityIndex(hass)
+    index.async_build()
+    index.async_listen()
+    devices = DeviceLookup(hass)
+    devices.async_build()
+    search = SearchIndex(hass, index, devices)
+    search.async_build()
+    search.async_listen()
+    return hass, index, search
+
+
+def _ids(hits: list[tuple[float, dict]]) -> list[str]:
+    """Return the entity_ids of search hits."""
+    return [projection["entity_id"] for _, projection in hits]
+
+
+def test_tokenize() -> None:
+    """Text is split into lowercase words."""
+    assert tokenize("light.Kitchen_Ceiling 2") == ["light", "kitchen", "ceiling", "2"]
+    assert tokenize(None) == []
+
+
+async def test_every_token_must_match() -> None:
+    """Hits match every query token, exact words ranking above prefixes."""
+    hass, _, search = await _async_setup()
+    hits, total = search.async_search("kitchen", {}, "all", 0, 10)
+    assert total == 3
+    assert set(_ids(hits)) == {
+        "light.kitchen_ceiling",
+        "light.kitchen_island",
+        "sensor.kitchen_temperature",
+    }
+    hits, total = search.async_search("kitch ceil", {}, "all", 0, 10)
+    assert (_ids(hits), total) == (["light.kitchen_ceiling"], 1)
+    hits, total = search.async_search("kitchen garage", {}, "all", 0, 10)
+    assert (hits, total) == ([], 0)
+    await hass.async_stop(force=True)
+
+
+async def test_filters_state_and_paging() -> None:
+    """Filters and the state select hits; pages cut the ranked list."""
+    hass, _, search = await _async_setup()
+    hits, total = search.async_search("kitchen", {"domain": {"light"}}, "all", 0, 10)
+    assert (_ids(hits), total) == (["light.kitchen_ceiling", "light.kitchen_island"], 2)
+    hits, total = search.async_search("kitchen", {}, "disabled", 0, 10)
+    assert (_ids(hits), total) == (["sensor.kitchen_temperature"], 1)
+    hits, total = search.async_search("", {"platform": {"zha"}}, "enabled", 0, 10)
+    assert (_ids(hits), total) == (["switch.garage_door"], 1)
+    hits, total = search.async_search("kitchen", {"domain": {"light"}}, "all", 1, 10)
+    assert (_ids(hits), total) == (["light.kitchen_island"], 2)
+    await hass.async_stop(force=True)
+
+
+async def test_entities_removed_while_held() -> None:
+    """Entities dropped from the index but not yet from the postings are skipped."""
+    hass, index, search = await _async_setup()
+    release = index.async_hold()
+    er.async_get(hass).async_remove("light.kitchen_island")
+    await hass.async_block_till_done()
+    assert "light.kitchen_island" not in index.entities
+    hits, total = search.async_search("island", {}, "all", 0, 10)
+    assert (hits, total) == ([], 0)
+    release()
+    await hass.async_block_till_done()
+    hits, total = search.async_search("kitchen", {}, "all", 0, 10)
+    assert total == 2
+    await hass.async_stop(force=True)
@@ -0,0 +1,183 @@
+"""Tests of the staged startup."""
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from homeassistant.components import frontend
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CALLBACK_TYPE, CoreState, HomeAssistant, callback
+from homeassistant.helpers import intent
+
+import entity_manager
+from entity_manager import voice_assistant
+from entity_manager.const import DATA_STARTUP, DOMAIN
+from entity_manager.startup import StagedStartup, ready_command
+from synthetic_registry import async_make_hass
+
+
+async def _async_setup() -> tuple[HomeAssistant, StagedStartup, list[str]]:
+    """Return a core with a startup of three stages logging when they run."""
+    hass = await async_make_hass()
+    hass.set_state(CoreState.starting)
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Entity Manager",
+        data={},
+        source="user",
+        options={},
+    )
+    startup = StagedStartup(hass, entry)
+    hass.data[DOMAIN] = {DATA_STARTUP: startup}
+    log: list[str] = []
+
+    def step(name: str) -> Callable[[], CALLBACK_TYPE]:
+        def run() -> CALLBACK_TYPE:
+            log.append(name)
+            return lambda: log.append(f"stop {name}")
+
+        return run
+
+    async def load() -> None:
+        await asyncio.sleep(0)
+        log.append("store")
+
+    startup.async_add_stage("index", step("index"))
+    startup.async_add_stage("store", load)
+    startup.async_add_stage("search", step("search"), after=("index",))
+    startup.async_setup_done()
+    return hass, startup, log
+
+
+async def _async_start(hass: HomeAssistant) -> None:
+    """Tell the stages Home Assistant has started and let the background build run."""
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    # The build is a background task, which async_block_till_done does not wait for
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+async def test_stages_wait_until_started() -> None:
+    """Nothing is built during setup; everything is built once started."""
+    hass, startup, log = await _async_setup()
+    await hass.async_block_till_done()
+    assert log == []
+    assert not startup.ready
+    await _async_start(hass)
+    assert log == ["index", "store", "search"]
+    assert startup.ready
+    report = startup.async_report()
+    assert report["setup_ms"] is not None
+    assert [(stage["name"], stage["trigger"]) for stage in report["stages"]] == [
+        ("index", "started"),
+        ("store", "started"),
+        ("search", "started"),
+    ]
+    startup.async_stop()
+    assert log[3:] == ["stop search", "stop index"]
+    await hass.async_stop(force=True)
+
+
+async def test_requests_run_what_they_need() -> None:
+    """A request before startup runs its stages and theirs, once."""
+    hass, startup, log = await _async_setup()
+    startup.async_require(["search"], "test/search")
+    assert log == ["index", "search"]
+    with pytest.raises(RuntimeError):
+        startup.async_require(["store"], "test/journal")
+
+    await asyncio.gather(
+        startup.async_ready(["store"], "test/journal"),
+        startup.async_ready(["store", "index"], "test/undo"),
+    )
+    assert log == ["index", "search", "store"]
+    assert [stage["trigger"] for stage in startup.async_report()["stages"]] == [
+        "test/search",
+        "test/search",
+        "test/journal",
+    ]
+    await _async_start(hass)
+    assert log == ["index", "search", "store"]
+    await hass.async_stop(force=True)
+
+
+async def test_failed_stage_releases_waiters(caplog: pytest.LogCaptureFixture) -> None:
+    """Requests waiting for a failed asynchronous stage go on."""
+    hass, startup, _ = await _async_setup()
+
+    async def fail() -> None:
+        raise OSError("store unreadable")
+
+    startup.async_add_stage("broken", fail)
+    await startup.async_ready(["broken"], "test/broken")
+    assert "startup stage broken failed" in caplog.text
+    await hass.async_stop(force=True)
+
+
+async def test_ready_command_after_unload() -> None:
+    """Commands wait for their stages, and answer not_ready once unloaded."""
+    hass, _, log = await _async_setup()
+    errors: list[str] = []
+    handled: list[int] = []
+
+    class Connection:
+        """Websocket connection recording error codes."""
+
+        def send_error(self, msg_id: int, code: str, message: str) -> None:
+            errors.append(code)
+
+    @ready_command("search")
+    @callback
+    def handle_search(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        handled.append(msg["id"])
+
+    @ready_command("store")
+    async def handle_journal(hass: HomeAssistant, connection: Any, msg: dict[str, Any]) -> None:
+        handled.append(msg["id"])
+
+    handle_search(hass, Connection(), {"id": 1, "type": "test/search"})
+    await handle_journal(hass, Connection(), {"id": 2, "type": "test/journal"})
+    assert (handled, errors) == ([1, 2], [])
+    assert log == ["index", "search", "store"]
+
+    hass.data[DOMAIN].pop(DATA_STARTUP)
+    handle_search(hass, Connection(), {"id": 3, "type": "test/search"})
+    await handle_journal(hass, Connection(), {"id": 4, "type": "test/journal"})
+    assert (handled, errors) == ([1, 2], ["not_ready", "not_ready"])
+    await hass.async_stop(force=True)
+
+
+async def test_unload_entry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unloading removes the services and intents and drops the entry's data."""
+    hass = await async_make_hass()
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Entity Manager",
+        data={},
+        source="user",
+        options={},
+    )
+
+    async def forward(*args: Any) -> bool:
+        return True
+
+    monkeypatch.setattr(hass.config_entries, "async_forward_entry_setups", forward)
+    monkeypatch.setattr(hass.config_entries, "async_unload_platforms", forward)
+    monkeypatch.setattr(frontend, "async_register_built_in_panel", lambda *args, **kwargs: None)
+    monkeypatch.setattr(frontend, "async_remove_panel", lambda *args: None)
+    assert await entity_manager.async_setup_entry(hass, entry)
+    assert hass.services.has_service(DOMAIN, "disable_entity")
+    assert voice_assistant.INTENT_DISABLE_ENTITY in hass.data[intent.DATA_KEY]
+
+    assert await entity_manager.async_unload_entry(hass, entry)
+    assert not hass.services.async_services().get(DOMAIN)
+    assert voice_assistant.INTENT_DISABLE_ENTITY not in hass.data[intent.DATA_KEY]
+    assert hass.data[DOMAIN] == {}
+    await hass.async_stop(force=True)
@@ -0,0 +1,137 @@
+"""Tests of the batched registry transactions."""
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from entity_manager.transaction import RegistryTransaction, inverse_changes
+from synthetic_registry import async_make_hass
+
+USER = er.RegistryEntryDisabler.USER
+
+
+async def _async_setup() -> HomeAssistant:
+    """Return a core with four enabled lights."""
+    hass = await async_make_hass()
+    entity_registry = er.async_get(hass)
+    for object_id in "abcd":
+        entity_registry.async_get_or_create(
+            "light", "hue", object_id, suggested_object_id=object_id
+        )
+    return hass
+
+
+def _disabled(hass: HomeAssistant) -> list[str]:
+    """Return the disabled entity_ids."""
+    return sorted(
+        entry.entity_id
+        for entry in er.async_get(hass).entities.values()
+        if entry.disabled_by is not None
+    )
+
+
+def test_inverse_changes() -> None:
+    """A record is reverted from its new entity_id with its before values."""
+    record = {
+        "entity_id": "light.a",
+        "before": {"entity_id": "light.a", "name": None},
+        "after": {"entity_id": "light.b", "name": "B"},
+    }
+    assert inverse_changes(record) == ("light.b", {"new_entity_id": "light.a", "name": None})
+
+
+async def test_commit_in_chunks() -> None:
+    """Updates apply chunk by chunk; missing entities fail on their own."""
+    hass = await _async_setup()
+    transaction = RegistryTransaction(hass)
+    for entity_id in ("light.a", "light.missing", "light.b", "light.c"):
+        transaction.async_update(entity_id, disabled_by=USER)
+    progress: list[tuple[int, list[str], int]] = []
+
+    def on_progress(
+        results: dict[str, list], failed: list[dict[str, str]], remaining: int
+    ) -> None:
+        progress.append(
+            (len(results["success"]), [item["entity_id"] for item in failed], remaining)
+        )
+
+    results = await transaction.async_commit(chunk_size=2, progress_callback=on_progress)
+    assert [record["entity_id"] for record in results["success"]] == [
+        "light.a",
+        "light.b",
+        "light.c",
+    ]
+    assert results["success"][0]["before"] == {"disabled_by": None}
+    assert results["failed"] == [{"entity_id": "light.missing", "error": "Entity not found"}]
+    assert progress == [(1, ["light.missing"], 2), (3, [], 0)]
+    assert _disabled(hass) == ["light.a", "light.b", "light.c"]
+    await hass.async_stop(force=True)
+
+
+async def test_notifications_held_while_committing() -> None:
+    """The notification hold is taken once and released after the commit."""
+    hass = await _async_setup()
+    calls: list[str] = []
+
+    def hold() -> Any:
+        calls.append("hold")
+        return lambda: calls.append("release")
+
+    transaction = RegistryTransaction(hass, hold_notifications=hold)
+    for entity_id in ("light.a", "light.b", "light.c"):
+        transaction.async_update(entity_id, disabled_by=USER)
+    await transaction.async_commit(chunk_size=1)
+    assert calls == ["hold", "release"]
+    await hass.async_stop(force=True)
+
+
+async def test_atomic_failure_rolls_back() -> None:
+    """A failed atomic commit reverts what it applied and reports it as failed."""
+    hass = await _async_setup()
+    transaction = RegistryTransaction(hass, atomic=True)
+    transaction.async_update("light.a", disabled_by=USER)
+    transaction.async_update("light.b", new_entity_id="light.renamed")
+    transaction.async_update("light.c", new_entity_id="light.d")
+    transaction.async_update("light.d", disabled_by=USER)
+    results = await transaction.async_commit()
+    assert results["success"] == []
+    assert results["failed"][0]["entity_id"] == "light.c"
+    assert results["failed"][1:] == [
+        {"entity_id": "light.a", "error": "Rolled back"},
+        {"entity_id": "light.b", "error": "Rolled back"},
+    ]
+    assert _disabled(hass) == []
+    assert er.async_get(hass).async_get("light.b") is not None
+    assert er.async_get(hass).async_get("light.renamed") is None
+    await hass.async_stop(force=True)
+
+
+async def test_failed_revert_stays_applied(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """An update that cannot be reverted is logged and kept in the records."""
+    hass = await _async_setup()
+    entity_registry = er.async_get(hass)
+    update_entity = entity_registry.async_update_entity
+
+    def failing_update(entity_id: str, **changes: Any) -> er.RegistryEntry:
+        if entity_id == "light.a" and changes == {"disabled_by": None}:
+            raise ValueError("revert failed")
+        if entity_id == "light.c":
+            raise ValueError("update failed")
+        return update_entity(entity_id, **changes)
+
+    monkeypatch.setattr(entity_registry, "async_update_entity", failing_update)
+    transaction = RegistryTransaction(hass, atomic=True)
+    for entity_id in ("light.a", "light.b", "light.c"):
+        transaction.async_update(entity_id, disabled_by=USER)
+    results = await transaction.async_commit()
+    assert [record["entity_id"] for record in results["success"]] == ["light.a"]
+    assert results["failed"] == [
+        {"entity_id": "light.c", "error": "update failed"},
+        {"entity_id": "light.b", "error": "Rolled back"},
+    ]
+    assert _disabled(hass) == ["light.a"]
+    assert "Cannot roll back entity light.a" in caplog.text
+    await hass.async_stop(force=True)
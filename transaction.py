@@ -0,0 +1,19 @@
+"""Batched entity registry transactions for Entity Manager.
+
+Kept in the services package, which is also installed on its own.
+"""
+from .custom_components.entity_manager.transaction import (
+    DEFAULT_CHUNK_SIZE,
+    MAX_CHUNK_SIZE,
+    ProgressCallback,
+    RegistryTransaction,
+    inverse_changes,
+)
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "MAX_CHUNK_SIZE",
+    "ProgressCallback",
+    "RegistryTransaction",
+    "inverse_changes",
+]
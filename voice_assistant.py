@@ -1,14 +1,80 @@
 """Voice assistant intents for Entity Manager."""
 import logging
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import intent
 
+from .concurrency import MutationQueue, MutationRejected
+from .const import DATA_DEVICES, DATA_INDEX, DATA_JOURNAL, DATA_MUTATIONS, DATA_NAMES, DOMAIN
+from .device_lookup import DeviceLookup
+from .entity_index import EntityIndex
+from .journal import OperationJournal
+from .metrics import metered_intent
+from .name_index import MAX_CANDIDATES, NameIndex
+from .startup import async_ready
+from .transaction import RegistryTransaction
+
 _LOGGER = logging.getLogger(__name__)
 
 INTENT_ENABLE_ENTITY = "entity_manager_enable_entity"
 INTENT_DISABLE_ENTITY = "entity_manager_disable_entity"
+INTENT_ENABLE_SCOPE = "entity_manager_enable_scope"
+INTENT_DISABLE_SCOPE = "entity_manager_disable_scope"
+
+# Scoped intent slots: (slot, scope, preposition used in speech)
+SCOPE_SLOTS = (
+    ("device_name", "device", "on"),
+    ("area_name", "area", "in"),
+    ("integration_name", "integration", "from"),
+)
+
+# Candidates named in a disambiguation prompt
+MAX_SPOKEN_CANDIDATES = 3
+
+
+@callback
+def async_resolve_entity(
+    hass: HomeAssistant, spoken: str, disabled: bool
+) -> tuple[str | None, str]:
+    """Return the entity a spoken name refers to and its label.
+
+    Exact entity IDs are used as is. When the name matches several
+    entities and only one of them is disabled (or enabled, as given by
+    disabled), that one is picked. Otherwise the entity ID is None and the
+    label is the speech asking which entity was meant.
+    """
+    names: NameIndex = hass.data[DOMAIN][DATA_NAMES]
+    if er.async_get(hass).async_get(spoken) is not None:
+        return spoken, names.async_label(spoken)
+
+    _, entity_ids = names.async_resolve(spoken)
+    if not entity_ids:
+        return None, f"I couldn't find an entity called {spoken}"
+    if len(entity_ids) > 1:
+        index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+        in_state = [
+            entity_id
+            for entity_id in entity_ids
+            if (projection := index.entities.get(entity_id)) is not None
+            and projection["is_disabled"] == disabled
+        ]
+        if len(in_state) == 1:
+            entity_ids = in_state
+    if len(entity_ids) == 1:
+        return entity_ids[0], names.async_label(entity_ids[0])
+
+    shown = [names.async_label(entity_id) for entity_id in entity_ids[:MAX_SPOKEN_CANDIDATES]]
+    if len(set(shown)) < len(shown):
+        # Tell entities of the same name apart by their IDs
+        shown = [f"{label} ({entity_id})" for label, entity_id in zip(shown, entity_ids)]
+    if len(entity_ids) <= MAX_SPOKEN_CANDIDATES:
+        return None, f"Which one did you mean: {', '.join(shown[:-1])} or {shown[-1]}?"
+    count = f"more than {MAX_CANDIDATES}" if len(entity_ids) > MAX_CANDIDATES else len(entity_ids)
+    return None, (
+        f"I found {count} entities called {spoken}, like {', '.join(shown)}. "
+        "Which one did you mean?"
+    )
 
 
 class EnableEntityIntentHandler(intent.IntentHandler):
@@ -16,61 +82,216 @@ class EnableEntityIntentHandler(intent.IntentHandler):
     
     intent_type = INTENT_ENABLE_ENTITY
     
+    @metered_intent
     async def async_handle(self, intent_obj) -> intent.IntentResponse:
         """Handle the enable entity intent."""
-        entity_id = intent_obj.slots.get("entity", {}).get("value")
+        spoken = intent_obj.slots.get("entity", {}).get("value")
         
-        if not entity_id:
+        if not spoken:
             response = intent_obj.create_response()
             response.async_set_speech("Please specify which entity to enable")
             return response
         
-        entity_reg = er.async_get(self.hass)
-        
-        try:
-            entity_reg.async_update_entity(entity_id, disabled_by=None)
+        await async_ready(
+            intent_obj.hass, f"intent.{self.intent_type}", DATA_NAMES, DATA_JOURNAL
+        )
+        entity_id, label = async_resolve_entity(intent_obj.hass, spoken, disabled=True)
+        if entity_id is None:
             response = intent_obj.create_response()
-            response.async_set_speech(f"Enabled {entity_id}")
-            return response
-        except Exception as err:
-            _LOGGER.error("Error enabling entity: %s", err)
-            response = intent_obj.create_response()
-            response.async_set_speech(f"Failed to enable {entity_id}")
+            response.async_set_speech(label)
             return response
 
+        return await _async_set_disabled(intent_obj, entity_id, label, None)
+
 
 class DisableEntityIntentHandler(intent.IntentHandler):
     """Handle disable entity intent."""
     
     intent_type = INTENT_DISABLE_ENTITY
     
+    @metered_intent
     async def async_handle(self, intent_obj) -> intent.IntentResponse:
         """Handle the disable entity intent."""
-        entity_id = intent_obj.slots.get("entity", {}).get("value")
+        spoken = intent_obj.slots.get("entity", {}).get("value")
         
-        if not entity_id:
+        if not spoken:
             response = intent_obj.create_response()
             response.async_set_speech("Please specify which entity to disable")
             return response
         
-        entity_reg = er.async_get(self.hass)
-        
-        try:
-            entity_reg.async_update_entity(
-                entity_id, 
-                disabled_by=er.RegistryEntryDisabler.USER
-            )
+        await async_ready(
+            intent_obj.hass, f"intent.{self.intent_type}", DATA_NAMES, DATA_JOURNAL
+        )
+        entity_id, label = async_resolve_entity(intent_obj.hass, spoken, disabled=False)
+        if entity_id is None:
             response = intent_obj.create_response()
-            response.async_set_speech(f"Disabled {entity_id}")
+            response.async_set_speech(label)
             return response
-        except Exception as err:
-            _LOGGER.error("Error disabling entity: %s", err)
-            response = intent_obj.create_response()
-            response.async_set_speech(f"Failed to disable {entity_id}")
+
+        return await _async_set_disabled(
+            intent_obj, entity_id, label, er.RegistryEntryDisabler.USER
+        )
+
+
+class ScopeIntentHandler(intent.IntentHandler):
+    """Handle enabling or disabling every entity of a device, area or integration.
+
+    The slot that is filled (device_name, area_name or integration_name)
+    picks the scope; an optional category slot keeps only diagnostic or
+    config entities. Entities come from the entity index's membership
+    indexes and change in one batched registry transaction, journaled so
+    the entity_manager/undo command can revert it.
+    """
+
+    action = "enable"
+
+    @metered_intent
+    async def async_handle(self, intent_obj) -> intent.IntentResponse:
+        """Handle the scoped intent."""
+        hass = intent_obj.hass
+        await async_ready(hass, f"intent.{self.intent_type}", DATA_NAMES, DATA_JOURNAL)
+        response = intent_obj.create_response()
+        names: NameIndex = hass.data[DOMAIN][DATA_NAMES]
+        index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+        devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+
+        slot, scope, preposition = next(
+            (slot_scope for slot_scope in SCOPE_SLOTS if slot_scope[0] in intent_obj.slots),
+            SCOPE_SLOTS[0],
+        )
+        spoken = intent_obj.slots.get(slot, {}).get("value")
+        if not spoken:
+            response.async_set_speech(f"Please specify what to {self.action}")
             return response
 
+        keys = names.async_resolve_scope(scope, spoken)
+        if not keys:
+            article = "an" if scope[0] in "aeiou" else "a"
+            response.async_set_speech(f"I couldn't find {article} {scope} called {spoken}")
+            return response
+        labels = [_scope_label(devices, scope, key) for key in keys]
+        if len(keys) > 1:
+            shown = labels[:MAX_SPOKEN_CANDIDATES]
+            response.async_set_speech(
+                f"I found {len(keys)} {scope}s called {spoken}, like {', '.join(shown)}. "
+                "Which one did you mean?"
+            )
+            return response
+
+        # Only entities the action changes
+        state = "disabled" if self.action == "enable" else "enabled"
+        if scope == "area":
+            entity_ids = index.async_area(keys[0], devices.async_area_devices(keys[0]), state)
+        else:
+            entity_ids = index.async_scope(scope, keys[0], state)
+        category = intent_obj.slots.get("category", {}).get("value")
+        if category is not None:
+            entity_ids = {
+                entity_id
+                for entity_id in entity_ids
+                if (projection := index.entities.get(entity_id)) is not None
+                and projection["entity_category"] == category
+            }
+        kind = f"{category} " if category else ""
+        where = f"{preposition} {labels[0]}"
+        if not entity_ids:
+            response.async_set_speech(f"There are no {state} {kind}entities {where}")
+            return response
+
+        transaction = RegistryTransaction(hass, hold_notifications=index.async_hold)
+        disabled_by = er.RegistryEntryDisabler.USER if self.action == "disable" else None
+        for entity_id in sorted(entity_ids):
+            transaction.async_update(entity_id, disabled_by=disabled_by)
+        mutations: MutationQueue = hass.data[DOMAIN][DATA_MUTATIONS]
+        try:
+            results = await mutations.async_run(entity_ids, transaction.async_commit)
+        except MutationRejected:
+            response.async_set_speech(
+                f"Other changes to the {kind}entities {where} are still running, "
+                "try again shortly"
+            )
+            return response
+        journal: OperationJournal = hass.data[DOMAIN][DATA_JOURNAL]
+        journal.async_record(self.intent_type, results["success"])
+
+        done = len(results["success"])
+        speech = f"{self.action.capitalize()}d {done} {kind}{'entity' if done == 1 else 'entities'}"
+        if failed := len(results["failed"]):
+            speech += f", {failed} failed"
+        response.async_set_speech(f"{speech} {where}")
+        return response
+
+
+class EnableScopeIntentHandler(ScopeIntentHandler):
+    """Handle enable scope intent."""
+
+    intent_type = INTENT_ENABLE_SCOPE
+    action = "enable"
+
+
+class DisableScopeIntentHandler(ScopeIntentHandler):
+    """Handle disable scope intent."""
+
+    intent_type = INTENT_DISABLE_SCOPE
+    action = "disable"
+
+
+async def _async_set_disabled(
+    intent_obj: intent.Intent,
+    entity_id: str,
+    label: str,
+    disabled_by: er.RegistryEntryDisabler | None,
+) -> intent.IntentResponse:
+    """Enable or disable one entity through the mutation queue and journal it."""
+    hass = intent_obj.hass
+    response = intent_obj.create_response()
+    action = "disable" if disabled_by else "enable"
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    transaction = RegistryTransaction(hass, hold_notifications=index.async_hold)
+    transaction.async_update(entity_id, disabled_by=disabled_by)
+    mutations: MutationQueue = hass.data[DOMAIN][DATA_MUTATIONS]
+    try:
+        results = await mutations.async_run([entity_id], transaction.async_commit)
+    except MutationRejected:
+        response.async_set_speech(
+            f"Other changes to {label} are still running, try again shortly"
+        )
+        return response
+    journal: OperationJournal = hass.data[DOMAIN][DATA_JOURNAL]
+    journal.async_record(intent_obj.intent_type, results["success"])
+
+    if results["failed"]:
+        _LOGGER.error("Error %sing entity: %s", action[:-1], results["failed"][0]["error"])
+        response.async_set_speech(f"Failed to {action} {label}")
+    else:
+        response.async_set_speech(f"{action.capitalize()}d {label}")
+    return response
+
+
+def _scope_label(devices: DeviceLookup, scope: str, key: str) -> str:
+    """Return the spoken name of a device, area or integration."""
+    if scope == "device":
+        return (devices.async_device(key) or {}).get("name") or key
+    if scope == "area":
+        return devices.async_area_name(key) or key
+    return key
+
 
 async def async_setup_intents(hass: HomeAssistant) -> None:
     """Set up voice assistant intents."""
     intent.async_register(hass, EnableEntityIntentHandler())
     intent.async_register(hass, DisableEntityIntentHandler())
+    intent.async_register(hass, EnableScopeIntentHandler())
+    intent.async_register(hass, DisableScopeIntentHandler())
+
+
+@callback
+def async_unload_intents(hass: HomeAssistant) -> None:
+    """Remove the voice assistant intents."""
+    for intent_type in (
+        INTENT_ENABLE_ENTITY,
+        INTENT_DISABLE_ENTITY,
+        INTENT_ENABLE_SCOPE,
+        INTENT_DISABLE_SCOPE,
+    ):
+        intent.async_remove(hass, intent_type)
@@ -1,112 +1,548 @@
 """WebSocket API for Entity Manager."""
+import asyncio
+import base64
+import json
 import logging
-from typing import Any
+import time
+from collections.abc import Coroutine
+from datetime import datetime
+from typing import IO, Any
 
 import voluptuous as vol
 from homeassistant.components import websocket_api
+from homeassistant.components.websocket_api.messages import construct_result_message
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
+from sqlalchemy.exc import SQLAlchemyError
+
+from .auto_disable import RULE_SCHEMA, AutoDisabler, AutoDisableRuleError, RuleMatcher
+from .change_log import ChangeLog
+from .compact import FORMATS, CompactEncoder
+from .concurrency import MutationQueue, MutationRejected, SharedReads
+from .const import (
+    DATA_AUTO_DISABLE,
+    DATA_CHANGE_LOG,
+    DATA_DEVICES,
+    DATA_FOOTPRINT,
+    DATA_INDEX,
+    DATA_JOBS,
+    DATA_JOURNAL,
+    DATA_METRICS,
+    DATA_MUTATIONS,
+    DATA_PROFILER,
+    DATA_READS,
+    DATA_SCHEDULER,
+    DATA_SEARCH,
+    DATA_STARTUP,
+    DOMAIN,
+)
+from .device_lookup import DeviceLookup
+from .entity_index import NO_DEVICE, EntityChange, EntityIndex, SortKey, matches_state
+from .footprint import RecorderFootprint
+from .journal import OperationJournal
+from .metrics import Metrics, metered_command
+from .plans import (
+    PLAN_FORMATS,
+    PlanError,
+    PlanReader,
+    async_export_row,
+    async_plan_changes,
+    encode_rows,
+    plan_format,
+    plan_path,
+)
+from .profiler import CAPACITY, StateChangeProfiler
+from .rename_rules import (
+    TARGETS,
+    RenamePlan,
+    RenameRule,
+    RenameRuleError,
+    async_plan_renames,
+    async_taken_entity_ids,
+)
+from .scheduler import ReenableScheduler
+from .search import SearchIndex
+from .startup import StagedStartup, async_ready, ready_command
+from .transaction import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, RegistryTransaction
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+DEVICE_INFO_FIELDS = ("name", "manufacturer", "model", "area_id", "area")
+
 
 @callback
 def async_setup_ws_api(hass: HomeAssistant) -> None:
     """Set up the WebSocket API."""
     websocket_api.async_register_command(hass, handle_get_disabled_entities)
+    websocket_api.async_register_command(hass, handle_subscribe)
+    websocket_api.async_register_command(hass, handle_list_entities)
+    websocket_api.async_register_command(hass, handle_search)
+    for handler in SCOPED_COMMANDS:
+        websocket_api.async_register_command(hass, handler)
     websocket_api.async_register_command(hass, handle_enable_entity)
     websocket_api.async_register_command(hass, handle_disable_entity)
     websocket_api.async_register_command(hass, handle_bulk_enable)
     websocket_api.async_register_command(hass, handle_bulk_disable)
+    websocket_api.async_register_command(hass, handle_bulk_job)
     websocket_api.async_register_command(hass, handle_rename_entity)
+    websocket_api.async_register_command(hass, handle_bulk_rename_preview)
     websocket_api.async_register_command(hass, handle_bulk_rename)
+    websocket_api.async_register_command(hass, handle_scheduled)
+    websocket_api.async_register_command(hass, handle_undo)
+    websocket_api.async_register_command(hass, handle_journal)
+    websocket_api.async_register_command(hass, handle_profiler)
+    websocket_api.async_register_command(hass, handle_hot_entities)
+    websocket_api.async_register_command(hass, handle_recorder_footprint)
+    websocket_api.async_register_command(hass, handle_export)
+    websocket_api.async_register_command(hass, handle_import)
+    websocket_api.async_register_command(hass, handle_auto_disable_rules)
+    websocket_api.async_register_command(hass, handle_apply_auto_disable_rules)
+    websocket_api.async_register_command(hass, handle_stats)
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "entity_manager/get_disabled_entities",
         vol.Optional("state", default="disabled"): vol.In(["disabled", "enabled", "all"]),
+        vol.Optional("format", default="objects"): vol.In(FORMATS),
+        vol.Optional("since_revision"): vol.Any(None, vol.Coerce(int)),
     }
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_INDEX, DATA_DEVICES, DATA_CHANGE_LOG)
+@metered_command
 async def handle_get_disabled_entities(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Handle get disabled entities request."""
-    entity_reg = er.async_get(hass)
-    state = msg.get("state", "disabled")
+    """Handle get disabled entities request.
 
-    grouped_data: dict[str, Any] = {}
+    Served from the in-memory entity index; the registry is not rescanned.
+    Device entries embed the device name, manufacturer, model and area.
+    With format compact, the listing is sent as lookup tables and columns.
 
-    for entity in entity_reg.entities.values():
-        is_disabled = bool(entity.disabled)
-        include_entity = (
-            state == "all"
-            or (state == "disabled" and is_disabled)
-            or (state == "enabled" and not is_disabled)
+    Pass since_revision (null if the client has no listing yet) to get a
+    revision-stamped result instead: not_modified, the changes since that
+    revision in the subscribe delta format, or a full snapshot.
+
+    Listings are serialized once per registry state and shared by every
+    connection asking for the same state and format.
+    """
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    reads: SharedReads = hass.data[DOMAIN][DATA_READS]
+    state = msg.get("state", "disabled")
+    fmt = msg["format"]
+    if "since_revision" in msg:
+        payload = _listing_since(hass, index, state, fmt, msg["since_revision"])
+    else:
+        payload = reads.async_json(
+            ("grouped", state, fmt), lambda: _grouped_listing(hass, index, state, fmt)
         )
+    connection.send_message(construct_result_message(msg["id"], payload))
 
-        platform = entity.platform or "unknown"
-        device_id = entity.device_id or "no_device"
 
-        if platform not in grouped_data:
-            grouped_data[platform] = {
-                "integration": platform,
-                "devices": {},
-                "total_entities": 0,
-                "disabled_entities": 0,
-            }
+def _grouped_listing(
+    hass: HomeAssistant, index: EntityIndex, state: str, fmt: str
+) -> list[dict[str, Any]] | dict[str, Any]:
+    """Return the grouped listing in the requested format."""
+    if fmt == "compact":
+        encoder = CompactEncoder(hass.data[DOMAIN][DATA_DEVICES])
+        encoder.async_add_groups(index.async_grouped(state))
+        return {"format": "compact", **encoder.async_result()}
+    return _embed_device_info(hass, index.async_grouped(state))
 
-        integration_entry = grouped_data[platform]
-        integration_entry["total_entities"] += 1
-        if is_disabled:
-            integration_entry["disabled_entities"] += 1
-
-        devices = integration_entry["devices"]
-        if device_id not in devices:
-            devices[device_id] = {
-                "device_id": device_id if device_id != "no_device" else None,
-                "entities": [],
-                "total_entities": 0,
-                "disabled_entities": 0,
+
+def _listing_since(
+    hass: HomeAssistant, index: EntityIndex, state: str, fmt: str, since: int | None
+) -> bytes:
+    """Return the JSON of what changed in the grouped listing since a revision.
+
+    Changes are delivered at least once: a listing taken just before the
+    revision was bumped may already contain some of them. Snapshots are
+    shared like get_disabled_entities listings.
+    """
+    changes: ChangeLog = hass.data[DOMAIN][DATA_CHANGE_LOG]
+    revision = changes.revision
+    if since == revision:
+        return json_bytes({"revision": revision, "not_modified": True})
+    if since is not None and (logged := changes.async_since(since)) is not None:
+        entity_changes, device_ids = logged
+        devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+        return json_bytes(
+            {
+                "revision": revision,
+                **_delta_payload(hass, index, state, entity_changes),
+                "devices": {
+                    device_id: _device_info(devices, device_id) for device_id in device_ids
+                },
             }
+        )
+    reads: SharedReads = hass.data[DOMAIN][DATA_READS]
+    return reads.async_json(
+        ("snapshot", state, fmt),
+        lambda: {"revision": revision, "snapshot": _grouped_listing(hass, index, state, fmt)},
+    )
 
-        device_entry = devices[device_id]
-        device_entry["total_entities"] += 1
-        if is_disabled:
-            device_entry["disabled_entities"] += 1
 
-        if include_entity:
-            device_entry["entities"].append(
-                {
-                    "entity_id": entity.entity_id,
-                    "platform": platform,
-                    "device_id": entity.device_id,
-                    "disabled_by": entity.disabled_by.value if entity.disabled_by else None,
-                    "name": entity.name,
-                    "original_name": entity.original_name,
-                    "entity_category": entity.entity_category.value if entity.entity_category else None,
-                    "is_disabled": is_disabled,
-                }
+def _event_message_json(iden: int, payload: bytes) -> bytes:
+    """Return the JSON of an event message with a serialized event."""
+    return b"".join((b'{"id":', str(iden).encode(), b',"type":"event","event":', payload, b"}"))
+
+
+def _device_info(devices: DeviceLookup, device_id: str | None) -> dict[str, Any]:
+    """Return the device metadata fields embedded in responses."""
+    info = devices.async_device(device_id)
+    return {field: info[field] if info else None for field in DEVICE_INFO_FIELDS}
+
+
+def _embed_device_info(
+    hass: HomeAssistant, groups: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Add device metadata to the device entries of grouped results."""
+    devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+    for group in groups:
+        for device_key, device in group["devices"].items():
+            device.update(
+                _device_info(devices, device_key if device_key != NO_DEVICE else None)
+            )
+    return groups
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/subscribe",
+        vol.Optional("state", default="disabled"): vol.In(["disabled", "enabled", "all"]),
+        vol.Optional("format", default="objects"): vol.In(FORMATS),
+        vol.Optional("since_revision"): vol.Any(None, vol.Coerce(int)),
+    }
+)
+@websocket_api.require_admin
+@ready_command(DATA_INDEX, DATA_DEVICES, DATA_CHANGE_LOG)
+@metered_command
+@callback
+def handle_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to the grouped listing.
+
+    Sends one snapshot event in the get_disabled_entities format (objects or
+    compact), then delta events with the entities that were added or changed
+    (upserted), the entity IDs that left the filter (removed) and the
+    refreshed counters of every integration/device the batch touched. Device
+    metadata changes are sent as events with a devices map of device_id ->
+    metadata. Every event carries the revision it brings the client to.
+
+    With since_revision, the first event is not_modified or the changes since
+    that revision when the change log still covers it, else the snapshot.
+    """
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+    change_log: ChangeLog = hass.data[DOMAIN][DATA_CHANGE_LOG]
+    state = msg["state"]
+
+    @callback
+    def forward_changes(changes: list[EntityChange]) -> None:
+        """Forward a batch of index changes to the client."""
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {"revision": change_log.revision, **_delta_payload(hass, index, state, changes)},
+            )
+        )
+
+    @callback
+    def forward_device_changes(device_ids: set[str], area_ids: set[str]) -> None:
+        """Forward refreshed metadata of changed devices to the client."""
+        if device_ids:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {
+                        "revision": change_log.revision,
+                        "devices": {
+                            device_id: _device_info(devices, device_id)
+                            for device_id in device_ids
+                        },
+                    },
+                )
             )
 
-    # Prune devices and integrations with no matching entities
-    filtered_integrations = []
-    for integration in grouped_data.values():
-        filtered_devices = {
-            device_id: device
-            for device_id, device in integration["devices"].items()
-            if device["entities"]
+    unsubs = [
+        index.async_add_listener(forward_changes),
+        devices.async_add_listener(forward_device_changes),
+    ]
+
+    @callback
+    def unsubscribe() -> None:
+        for unsub in unsubs:
+            unsub()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(
+        _event_message_json(
+            msg["id"],
+            _listing_since(hass, index, state, msg["format"], msg.get("since_revision")),
+        )
+    )
+
+
+def _delta_payload(
+    hass: HomeAssistant, index: EntityIndex, state: str, changes: list[EntityChange]
+) -> dict[str, Any]:
+    """Build a subscription delta from a batch of index changes."""
+    upserted: dict[str, dict[str, Any]] = {}
+    removed: set[str] = set()
+    touched: dict[str, set[str]] = {}
+
+    for old, new in changes:
+        for projection in (old, new):
+            if projection is not None:
+                touched.setdefault(projection["platform"], set()).add(
+                    projection["device_id"] or NO_DEVICE
+                )
+        if old is not None:
+            upserted.pop(old["entity_id"], None)
+            removed.add(old["entity_id"])
+        if new is not None and matches_state(new, state):
+            removed.discard(new["entity_id"])
+            upserted[new["entity_id"]] = new
+
+    return {
+        "upserted": list(upserted.values()),
+        "removed": sorted(removed),
+        "counts": _embed_device_info(
+            hass,
+            [
+                index.async_group_counts(platform, device_keys)
+                for platform, device_keys in touched.items()
+            ],
+        ),
+    }
+
+
+def _encode_cursor(key: SortKey) -> str:
+    """Encode a listing sort key as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> SortKey:
+    """Decode an opaque cursor; raise ValueError if it is malformed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as err:
+        raise ValueError("Malformed cursor") from err
+    if not (
+        isinstance(key, list) and len(key) == 3 and all(isinstance(part, str) for part in key)
+    ):
+        raise ValueError("Malformed cursor")
+    return tuple(key)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/list_entities",
+        vol.Optional("state", default="disabled"): vol.In(["disabled", "enabled", "all"]),
+        vol.Optional("format", default="objects"): vol.In(FORMATS),
+        vol.Optional("limit", default=DEFAULT_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("cursor"): vol.Any(str, None),
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_INDEX, DATA_DEVICES, DATA_CHANGE_LOG)
+@metered_command
+async def handle_list_entities(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a paginated entity listing request.
+
+    Entities are sorted by (platform, device, entity_id). Pass the returned
+    next_cursor to fetch the following page; it is None on the last page.
+    The counters of every integration/device on the page are included so the
+    panel can render group headers without the full grouped listing.
+    With format compact, entities and counters are sent as lookup tables and
+    columns.
+    """
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    state = msg["state"]
+
+    after: SortKey | None = None
+    if msg.get("cursor"):
+        try:
+            after = _decode_cursor(msg["cursor"])
+        except ValueError as err:
+            connection.send_error(msg["id"], "invalid_cursor", str(err))
+            return
+
+    entities, next_key = index.async_page(state, after, msg["limit"])
+    connection.send_result(
+        msg["id"],
+        _entities_result(
+            hass,
+            index,
+            entities,
+            msg["format"],
+            next_cursor=_encode_cursor(next_key) if next_key is not None else None,
+            total=index.async_count(state),
+        ),
+    )
+
+
+def _entities_result(
+    hass: HomeAssistant,
+    index: EntityIndex,
+    entities: list[dict[str, Any]],
+    fmt: str,
+    **extra: Any,
+) -> dict[str, Any]:
+    """Return entities with the counters of their integrations and devices."""
+    touched: dict[str, set[str]] = {}
+    for entity in entities:
+        touched.setdefault(entity["platform"], set()).add(entity["device_id"] or NO_DEVICE)
+    groups = [
+        index.async_group_counts(platform, device_keys)
+        for platform, device_keys in touched.items()
+    ]
+    extra["revision"] = hass.data[DOMAIN][DATA_CHANGE_LOG].revision
+
+    if fmt == "compact":
+        encoder = CompactEncoder(hass.data[DOMAIN][DATA_DEVICES])
+        encoder.async_add_entities(entities)
+        encoder.async_add_groups(groups)
+        return {"format": "compact", **extra, **encoder.async_result()}
+    return {"entities": entities, **extra, "groups": _embed_device_info(hass, groups)}
+
+
+def _scoped_command(
+    scope: str, field: str, key_schema: Any
+) -> websocket_api.WebSocketCommandHandler:
+    """Return the handler of the entity_manager/by_<scope> listing command."""
+
+    @websocket_api.websocket_command(
+        {
+            vol.Required("type"): f"entity_manager/by_{scope}",
+            vol.Required(field): key_schema,
+            vol.Optional("state", default="all"): vol.In(["disabled", "enabled", "all"]),
+            vol.Optional("format", default="objects"): vol.In(FORMATS),
         }
-        if not filtered_devices:
-            continue
-        integration["devices"] = filtered_devices
-        filtered_integrations.append(integration)
+    )
+    @websocket_api.require_admin
+    @ready_command(DATA_INDEX, DATA_DEVICES)
+    @metered_command
+    @callback
+    def handle_scoped(
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg: dict[str, Any],
+    ) -> None:
+        """Handle a scoped listing request from the scope's hash index."""
+        index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+        key = msg[field]
+        if scope == "area":
+            devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+            entity_ids = index.async_area(key, devices.async_area_devices(key), msg["state"])
+        else:
+            entity_ids = index.async_scope(scope, key, msg["state"])
+        entities = index.async_entities(entity_ids)
+        connection.send_result(
+            msg["id"],
+            _entities_result(hass, index, entities, msg["format"], total=len(entities)),
+        )
+
+    return handle_scoped
+
+
+# by_<scope> listing commands: (scope, key field, key schema); use null for
+# entities without device, config entry or disabler
+SCOPED_COMMANDS = tuple(
+    _scoped_command(scope, field, key_schema)
+    for scope, field, key_schema in (
+        ("integration", "integration", str),
+        ("device", "device_id", vol.Any(None, str)),
+        ("area", "area_id", str),
+        ("domain", "domain", str),
+        ("config_entry", "config_entry_id", vol.Any(None, str)),
+        ("disabled_by", "disabled_by", vol.Any(None, str)),
+    )
+)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/search",
+        vol.Optional("query", default=""): str,
+        vol.Optional("state", default="all"): vol.In(["disabled", "enabled", "all"]),
+        vol.Optional("disabled_by"): [vol.Any(str, None)],
+        vol.Optional("entity_category"): [vol.Any(str, None)],
+        vol.Optional("domain"): [str],
+        vol.Optional("integration"): [str],
+        vol.Optional("limit", default=DEFAULT_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_SEARCH)
+@metered_command
+async def handle_search(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a ranked entity search request.
+
+    Metadata of the devices of the hits is returned in a devices map.
+
+    Every word of the query must match (as a substring, or a word prefix for
+    one and two letter words) the entity_id, name, original name, platform,
+    device name or area of an entity. The list filters are ORed within a
+    filter and ANDed across filters; use null to match entities without a
+    disabled_by or entity_category.
+    """
+    search: SearchIndex = hass.data[DOMAIN][DATA_SEARCH]
+    filters = {
+        key: set(msg[field])
+        for field, key in (
+            ("disabled_by", "disabled_by"),
+            ("entity_category", "entity_category"),
+            ("domain", "domain"),
+            ("integration", "platform"),
+        )
+        if field in msg
+    }
 
-    connection.send_result(msg["id"], filtered_integrations)
+    hits, total = search.async_search(
+        msg["query"], filters, msg["state"], msg["offset"], msg["limit"]
+    )
+    connection.send_result(
+        msg["id"],
+        {
+            "hits": [{**entity, "score": score} for score, entity in hits],
+            "total": total,
+            "devices": {
+                device_id: _device_info(search.devices, device_id)
+                for device_id in {entity["device_id"] for _, entity in hits}
+                if device_id is not None
+            },
+        },
+    )
 
 
 @websocket_api.websocket_command(
@@ -117,46 +553,87 @@ async def handle_get_disabled_entities(
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
 async def handle_enable_entity(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
     """Handle enable entity request."""
-    entity_reg = er.async_get(hass)
     entity_id = msg["entity_id"]
-    
+    transaction = _disabled_by_transaction(hass, "enable", [entity_id])
     try:
-        entity_reg.async_update_entity(entity_id, disabled_by=None)
-        connection.send_result(msg["id"], {"success": True})
-    except Exception as err:
-        _LOGGER.error("Error enabling entity %s: %s", entity_id, err)
-        connection.send_error(msg["id"], "enable_failed", str(err))
+        results = await _mutations(hass).async_run([entity_id], transaction.async_commit)
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    if results["failed"]:
+        connection.send_error(msg["id"], "enable_failed", results["failed"][0]["error"])
+        return
+    connection.send_result(
+        msg["id"], {"success": True, **_async_journal(hass, msg["type"], results)}
+    )
+
+
+# Timed disables: a duration or an end time, never both
+REENABLE_SCHEMA = {
+    vol.Exclusive("duration", "reenable"): cv.positive_time_period,
+    vol.Exclusive("until", "reenable"): cv.datetime,
+}
+
+
+def _reenable_at(msg: dict[str, Any]) -> datetime | None:
+    """Return when a timed disable ends, or None for a plain disable."""
+    if "duration" in msg:
+        return dt_util.utcnow() + msg["duration"]
+    if "until" in msg:
+        return dt_util.as_utc(msg["until"])
+    return None
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "entity_manager/disable_entity",
         vol.Required("entity_id"): str,
+        **REENABLE_SCHEMA,
     }
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_JOURNAL, DATA_SCHEDULER)
+@metered_command
 async def handle_disable_entity(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Handle disable entity request."""
-    entity_reg = er.async_get(hass)
+    """Handle disable entity request.
+
+    With duration or until, the entity is re-enabled at that time.
+    """
     entity_id = msg["entity_id"]
-    
+    if (reenable_at := _reenable_at(msg)) is not None and reenable_at <= dt_util.utcnow():
+        connection.send_error(msg["id"], "invalid_time", "The re-enable time is in the past")
+        return
+
+    transaction = _disabled_by_transaction(hass, "disable", [entity_id])
     try:
-        entity_reg.async_update_entity(entity_id, disabled_by=er.RegistryEntryDisabler.USER)
-        connection.send_result(msg["id"], {"success": True})
-    except Exception as err:
-        _LOGGER.error("Error disabling entity %s: %s", entity_id, err)
-        connection.send_error(msg["id"], "disable_failed", str(err))
+        results = await _mutations(hass).async_run([entity_id], transaction.async_commit)
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    if results["failed"]:
+        connection.send_error(msg["id"], "disable_failed", results["failed"][0]["error"])
+        return
+    connection.send_result(
+        msg["id"],
+        {
+            "success": True,
+            **_async_journal(hass, msg["type"], results),
+            **_async_schedule_reenable(hass, [entity_id], reenable_at),
+        },
+    )
 
 
 @websocket_api.websocket_command(
@@ -167,56 +644,278 @@ async def handle_disable_entity(
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
 async def handle_bulk_enable(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
     """Handle bulk enable request."""
-    entity_reg = er.async_get(hass)
-    entity_ids = msg["entity_ids"]
-    
-    results = {"success": [], "failed": []}
-    
-    for entity_id in entity_ids:
-        try:
-            entity_reg.async_update_entity(entity_id, disabled_by=None)
-            results["success"].append(entity_id)
-        except Exception as err:
-            _LOGGER.error("Error enabling entity %s: %s", entity_id, err)
-            results["failed"].append({"entity_id": entity_id, "error": str(err)})
-    
-    connection.send_result(msg["id"], results)
+    transaction = _disabled_by_transaction(hass, "enable", msg["entity_ids"])
+    try:
+        results = await _mutations(hass).async_run(msg["entity_ids"], transaction.async_commit)
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    connection.send_result(
+        msg["id"], {**_entity_id_results(results), **_async_journal(hass, msg["type"], results)}
+    )
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "entity_manager/bulk_disable",
         vol.Required("entity_ids"): [str],
+        **REENABLE_SCHEMA,
     }
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_JOURNAL, DATA_SCHEDULER)
+@metered_command
 async def handle_bulk_disable(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
-    """Handle bulk disable request."""
-    entity_reg = er.async_get(hass)
-    entity_ids = msg["entity_ids"]
+    """Handle bulk disable request.
+
+    With duration or until, the disabled entities are re-enabled at that time.
+    """
+    if (reenable_at := _reenable_at(msg)) is not None and reenable_at <= dt_util.utcnow():
+        connection.send_error(msg["id"], "invalid_time", "The re-enable time is in the past")
+        return
+    transaction = _disabled_by_transaction(hass, "disable", msg["entity_ids"])
+    try:
+        results = await _mutations(hass).async_run(msg["entity_ids"], transaction.async_commit)
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    operation = _async_journal(hass, msg["type"], results)
+    results = _entity_id_results(results)
+    connection.send_result(
+        msg["id"],
+        {
+            **results,
+            **operation,
+            **_async_schedule_reenable(hass, results["success"], reenable_at),
+        },
+    )
+
+
+@callback
+def _async_schedule_reenable(
+    hass: HomeAssistant, entity_ids: list[str], reenable_at: datetime | None
+) -> dict[str, Any]:
+    """Schedule the re-enable of disabled entities; return the result fields.
+
+    A plain disable cancels earlier timed disables of the entities.
+    """
+    scheduler: ReenableScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+    if reenable_at is None:
+        scheduler.async_cancel(entity_ids)
+        return {}
+    scheduler.async_schedule(entity_ids, reenable_at)
+    return {"reenable_at": reenable_at.isoformat()}
+
+
+@websocket_api.websocket_command({vol.Required("type"): "entity_manager/scheduled"})
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_SCHEDULER)
+@metered_command
+async def handle_scheduled(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request for the pending re-enables of timed disables, earliest first."""
+    scheduler: ReenableScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+    connection.send_result(
+        msg["id"],
+        {
+            "entities": [
+                {"entity_id": entity_id, "reenable_at": reenable_at.isoformat()}
+                for reenable_at, entity_id in scheduler.async_pending()
+            ]
+        },
+    )
+
+
+def _mutations(hass: HomeAssistant) -> MutationQueue:
+    """Return the queue every registry mutation of the API goes through."""
+    return hass.data[DOMAIN][DATA_MUTATIONS]
+
+
+def _registry_transaction(hass: HomeAssistant, atomic: bool = False) -> RegistryTransaction:
+    """Return a transaction that holds entity index notifications while committing."""
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    return RegistryTransaction(hass, atomic=atomic, hold_notifications=index.async_hold)
+
+
+@callback
+def _async_start_job(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+    job: Coroutine[Any, Any, None],
+    name: str,
+) -> None:
+    """Run a job streaming events to a command in the background.
+
+    Unsubscribing stops it, and so does unloading the config entry (see
+    async_stop_jobs).
+    """
+    jobs: set[asyncio.Task[None]] = hass.data[DOMAIN][DATA_JOBS]
+    task = hass.async_create_background_task(job, name)
+    jobs.add(task)
+    task.add_done_callback(jobs.discard)
+    connection.subscriptions[msg["id"]] = task.cancel
+    connection.send_result(msg["id"])
 
-    results = {"success": [], "failed": []}
 
+async def async_stop_jobs(hass: HomeAssistant) -> None:
+    """Cancel the running jobs and wait for them to finish."""
+    jobs: set[asyncio.Task[None]] = hass.data[DOMAIN][DATA_JOBS]
+    if not jobs:
+        return
+    for task in jobs:
+        task.cancel()
+    await asyncio.wait(list(jobs))
+
+
+def _disabled_by_transaction(
+    hass: HomeAssistant, action: str, entity_ids: list[str]
+) -> RegistryTransaction:
+    """Return a transaction enabling or disabling entities."""
+    transaction = _registry_transaction(hass)
+    disabled_by = er.RegistryEntryDisabler.USER if action == "disable" else None
     for entity_id in entity_ids:
+        transaction.async_update(entity_id, disabled_by=disabled_by)
+    return transaction
+
+
+@callback
+def _async_journal(
+    hass: HomeAssistant,
+    command: str,
+    results: dict[str, list],
+    undoes: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Journal the records a transaction applied; return the result fields."""
+    journal: OperationJournal = hass.data[DOMAIN][DATA_JOURNAL]
+    if (operation_id := journal.async_record(command, results["success"], undoes)) is None:
+        return {}
+    return {"operation_id": operation_id}
+
+
+def _entity_id_results(results: dict[str, list]) -> dict[str, list]:
+    """Report applied transaction records by entity ID."""
+    return {
+        "success": [record["entity_id"] for record in results["success"]],
+        "failed": results["failed"],
+    }
+
+
+def _progress_payload(
+    results: dict[str, list], failed: list[dict[str, str]], remaining: int
+) -> dict[str, Any]:
+    """Build a bulk job progress event."""
+    return {
+        "done": len(results["success"]),
+        "failed": len(results["failed"]),
+        "remaining": remaining,
+        "errors": failed,
+    }
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/bulk_job",
+        vol.Required("action"): vol.In(["enable", "disable"]),
+        vol.Required("entity_ids"): [str],
+        vol.Optional("chunk_size", default=DEFAULT_CHUNK_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CHUNK_SIZE)
+        ),
+        **REENABLE_SCHEMA,
+    }
+)
+@websocket_api.require_admin
+@ready_command()
+@metered_command
+@callback
+def handle_bulk_job(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Run a bulk enable/disable as a cancellable job with streamed progress.
+
+    Entities are processed in chunks; after every chunk a progress event with
+    done/failed/remaining counts and the chunk's errors is sent. The last
+    event has finished set, and the operation_id of the journaled changes.
+    Unsubscribing cancels the job between chunks, journaling the chunks
+    already applied, or withdraws it while it waits for earlier mutations.
+    A job the mutation queue rejects is
+    answered with an error instead of a result.
+
+    Disable jobs take duration or until like bulk_disable; the finished
+    event then carries reenable_at.
+    """
+    reenable_at = _reenable_at(msg) if msg["action"] == "disable" else None
+    if reenable_at is not None and reenable_at <= dt_util.utcnow():
+        connection.send_error(msg["id"], "invalid_time", "The re-enable time is in the past")
+        return
+
+    @callback
+    def send_progress(
+        results: dict[str, list], failed: list[dict[str, str]], remaining: int
+    ) -> None:
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], _progress_payload(results, failed, remaining)
+            )
+        )
+
+    transaction = _disabled_by_transaction(hass, msg["action"], msg["entity_ids"])
+
+    async def run_job() -> None:
+        await async_ready(hass, msg["type"], DATA_JOURNAL, DATA_SCHEDULER)
+        results: dict[str, list] | None = None
         try:
-            entity_reg.async_update_entity(entity_id, disabled_by=er.RegistryEntryDisabler.USER)
-            results["success"].append(entity_id)
-        except Exception as err:
-            _LOGGER.error("Error disabling entity %s: %s", entity_id, err)
-            results["failed"].append({"entity_id": entity_id, "error": str(err)})
+            results = await _mutations(hass).async_run(
+                msg["entity_ids"],
+                lambda: transaction.async_commit(msg["chunk_size"], send_progress),
+            )
+        except MutationRejected as err:
+            connection.send_error(msg["id"], err.code, str(err))
+            return
+        finally:
+            if results is None and transaction.records:
+                # Cancelled between chunks: the applied ones stay undoable
+                applied = {"success": transaction.records, "failed": []}
+                _async_journal(hass, msg["type"], applied)
+                if msg["action"] == "disable":
+                    _async_schedule_reenable(
+                        hass, [record["entity_id"] for record in applied["success"]], reenable_at
+                    )
+        finished: dict[str, Any] = {
+            **_progress_payload(results, [], 0),
+            **_async_journal(hass, msg["type"], results),
+            "finished": True,
+        }
+        if msg["action"] == "disable":
+            finished.update(
+                _async_schedule_reenable(
+                    hass, [record["entity_id"] for record in results["success"]], reenable_at
+                )
+            )
+        connection.send_message(websocket_api.event_message(msg["id"], finished))
 
-    connection.send_result(msg["id"], results)
+    _async_start_job(
+        hass, connection, msg, run_job(), f"entity_manager bulk {msg['action']} job"
+    )
 
 
 @websocket_api.websocket_command(
@@ -229,6 +928,8 @@ async def handle_bulk_disable(
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
 async def handle_rename_entity(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
@@ -239,38 +940,135 @@ async def handle_rename_entity(
     Supports renaming the friendly name (name) and/or the entity ID (new_entity_id).
     Pass name=None to reset the friendly name back to the integration default.
     """
-    entity_reg = er.async_get(hass)
     entity_id = msg["entity_id"]
+    kwargs: dict[str, Any] = {}
+    if "name" in msg:
+        kwargs["name"] = msg["name"]
+    if "new_entity_id" in msg:
+        kwargs["new_entity_id"] = msg["new_entity_id"]
+
+    if not kwargs:
+        connection.send_error(msg["id"], "no_changes", "No rename parameters provided")
+        return
 
+    transaction = _registry_transaction(hass)
+    transaction.async_update(entity_id, **kwargs)
     try:
-        kwargs: dict[str, Any] = {}
-        if "name" in msg:
-            kwargs["name"] = msg["name"]
-        if "new_entity_id" in msg:
-            kwargs["new_entity_id"] = msg["new_entity_id"]
-
-        if not kwargs:
-            connection.send_error(msg["id"], "no_changes", "No rename parameters provided")
-            return
+        results = await _mutations(hass).async_run(
+            {entity_id, msg.get("new_entity_id", entity_id)}, transaction.async_commit
+        )
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    if results["failed"]:
+        connection.send_error(msg["id"], "rename_failed", results["failed"][0]["error"])
+        return
+    connection.send_result(
+        msg["id"], {"success": True, **_async_journal(hass, msg["type"], results)}
+    )
+
+
+RENAME_RULE_SCHEMA = {
+    vol.Optional("find", default=""): str,
+    vol.Required("replace"): str,
+    vol.Optional("target", default="name"): vol.In(TARGETS),
+    vol.Optional("regex", default=False): bool,
+    vol.Optional("template", default=False): bool,
+    vol.Optional("ignore_case", default=False): bool,
+}
 
-        entity_reg.async_update_entity(entity_id, **kwargs)
-        connection.send_result(msg["id"], {"success": True})
-    except Exception as err:
-        _LOGGER.error("Error renaming entity %s: %s", entity_id, err)
-        connection.send_error(msg["id"], "rename_failed", str(err))
+
+RENAME_RULE_FIELDS = ("find", "replace", "target", "regex", "template", "ignore_case")
+
+
+def _rename_rule(msg: dict[str, Any]) -> RenameRule:
+    """Return the rename rule of a bulk rename message."""
+    return RenameRule(
+        msg["find"],
+        msg["replace"],
+        target=msg["target"],
+        regex=msg["regex"],
+        template=msg["template"],
+        ignore_case=msg["ignore_case"],
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/bulk_rename_preview",
+        vol.Optional("entity_ids"): [str],
+        **RENAME_RULE_SCHEMA,
+        vol.Optional("limit", default=DEFAULT_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_INDEX)
+@metered_command
+async def handle_bulk_rename_preview(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a bulk rename dry run.
+
+    Evaluates the rule over entity_ids, or every indexed entity when omitted,
+    and returns a page of {entity_id, before, after} changes with the total
+    change count, the skipped count and every collision and failure. For
+    entity_id rules, temporary counts the cycles the rename planner opens
+    with a temporary ID. The plan is shared until the registry changes, so
+    paging through it does not plan again.
+    """
+    reads: SharedReads = hass.data[DOMAIN][DATA_READS]
+    key = (
+        "rename_plan",
+        *(msg[field] for field in RENAME_RULE_FIELDS),
+        tuple(msg["entity_ids"]) if "entity_ids" in msg else None,
+    )
+
+    def plan_renames() -> dict[str, Any]:
+        if "entity_ids" in msg:
+            entity_ids = msg["entity_ids"]
+        else:
+            index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+            entity_ids = sorted(index.entities)
+        return async_plan_renames(hass, _rename_rule(msg), entity_ids)
+
+    try:
+        plan = reads.async_shared(key, plan_renames)
+    except RenameRuleError as err:
+        connection.send_error(msg["id"], "invalid_rule", str(err))
+        return
+
+    offset = msg["offset"]
+    connection.send_result(
+        msg["id"],
+        {
+            "changes": plan["changes"][offset : offset + msg["limit"]],
+            "total": len(plan["changes"]),
+            "skipped": len(plan["skipped"]),
+            "collisions": plan["collisions"],
+            "failed": plan["failed"],
+            "temporary": len(plan["order"].temporary) if plan["order"] else 0,
+            "timing": plan["order"].timings if plan["order"] else {},
+        },
+    )
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "entity_manager/bulk_rename",
         vol.Required("entity_ids"): [str],
-        vol.Required("find"): str,
-        vol.Required("replace"): str,
-        vol.Optional("target", default="name"): vol.In(["name", "entity_id"]),
+        **RENAME_RULE_SCHEMA,
     }
 )
 @websocket_api.require_admin
 @websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
 async def handle_bulk_rename(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
@@ -278,94 +1076,736 @@ async def handle_bulk_rename(
 ) -> None:
     """Handle bulk rename request using find/replace.
 
-    Applies a text find/replace across the selected entities.
+    Applies a find/replace rule across the selected entities.
     target="name" replaces in the friendly name.
     target="entity_id" replaces in the object_id portion only (after the domain.).
-    """
-    entity_reg = er.async_get(hass)
-    entity_ids = msg["entity_ids"]
-    find_str = msg["find"]
-    replace_str = msg["replace"]
-    target = msg.get("target", "name")
+    regex=True treats find as a regular expression; template=True fills
+    {device}, {area}, {original_name} and the other rename_rules tokens in
+    replace, and an empty find then replaces the whole value.
 
-    if not find_str:
+    entity_id renames are ordered so chains and swaps apply in one batch;
+    the result includes the planner's timing breakdown in milliseconds and
+    the operation_id of the journaled changes.
+    """
+    if not msg["find"] and not msg["template"]:
         connection.send_error(msg["id"], "invalid_find", "Find string cannot be empty")
         return
 
-    results: dict[str, list] = {"success": [], "failed": [], "skipped": []}
-
-    # For entity_id renames, pre-compute the full rename map and check for
-    # collisions before applying any changes.
-    if target == "entity_id":
-        rename_map: dict[str, str] = {}
-        for entity_id in entity_ids:
-            entity_entry = entity_reg.async_get(entity_id)
-            if entity_entry is None:
-                results["failed"].append({"entity_id": entity_id, "error": "Entity not found"})
-                continue
-
-            # Only replace within the object_id (part after domain.)
-            domain, object_id = entity_id.split(".", 1)
-            if find_str not in object_id:
-                results["skipped"].append(entity_id)
-                continue
-            new_object_id = object_id.replace(find_str, replace_str)
-            new_id = f"{domain}.{new_object_id}"
-            if new_id == entity_id:
-                results["skipped"].append(entity_id)
-                continue
-            rename_map[entity_id] = new_id
-
-        # Check for collisions: target ID already exists or duplicates in batch
-        seen_targets: set[str] = set()
-        collision_ids: list[str] = []
-        for old_id, new_id in rename_map.items():
-            existing = entity_reg.async_get(new_id)
-            # Allow if the existing entry is another entity being renamed away
-            if existing is not None and existing.entity_id not in rename_map:
-                collision_ids.append(old_id)
-            elif new_id in seen_targets:
-                collision_ids.append(old_id)
-            else:
-                seen_targets.add(new_id)
+    try:
+        rule = _rename_rule(msg)
+    except RenameRuleError as err:
+        connection.send_error(msg["id"], "invalid_rule", str(err))
+        return
+
+    async def rename() -> dict[str, Any]:
+        # Planned in the queue, so collisions are checked against the
+        # registry the renames are applied to
+        plan = async_plan_renames(hass, rule, msg["entity_ids"])
+
+        results: dict[str, Any] = {
+            "success": [],
+            "failed": plan["failed"],
+            "skipped": plan["skipped"],
+        }
+        # Colliding entity_id renames were left out of the plan
+        results["failed"].extend(
+            {"entity_id": collision["entity_id"], "error": collision["error"]}
+            for collision in plan["collisions"]
+        )
+
+        if (order := plan["order"]) is not None:
+            # Cycles are applied through temporary IDs; roll back rather than
+            # leave an entity parked on one
+            transaction = _registry_transaction(hass, atomic=bool(order.temporary))
+            order.async_queue(transaction)
+            start = time.perf_counter()
+            committed = await transaction.async_commit()
+            order.timings["apply"] = round((time.perf_counter() - start) * 1000, 2)
+            results["success"] = order.renames(committed["success"])
+            # A rolled-back cycle reports an entity under its own and its
+            # temporary ID; keep the first failure, the one that stopped it
+            failures: dict[str, dict[str, str]] = {}
+            for failure in committed["failed"]:
+                entity_id = order.temporary.get(failure["entity_id"], failure["entity_id"])
+                failures.setdefault(entity_id, {**failure, "entity_id": entity_id})
+            results["failed"].extend(failures.values())
+            results["timing"] = order.timings
+        else:
+            transaction = _registry_transaction(hass)
+            for change in plan["changes"]:
+                transaction.async_update(change["entity_id"], name=change["after"])
+            committed = await transaction.async_commit()
+            old_names = {change["entity_id"]: change["before"] for change in plan["changes"]}
+            results["success"] = [
+                {
+                    "entity_id": record["entity_id"],
+                    "old_name": old_names[record["entity_id"]],
+                    "new_name": record["after"]["name"],
+                }
+                for record in committed["success"]
+            ]
+            results["failed"].extend(committed["failed"])
+        results.update(_async_journal(hass, msg["type"], committed))
+        return results
+
+    try:
+        results = await _mutations(hass).async_run(msg["entity_ids"], rename)
+    except RenameRuleError as err:
+        connection.send_error(msg["id"], "invalid_rule", str(err))
+        return
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+
+    connection.send_result(msg["id"], results)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/undo",
+        vol.Optional("operation_id"): int,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
+async def handle_undo(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle an undo request.
+
+    Reverts a journaled operation, by default the newest one that is
+    neither undone nor an undo itself, in one atomic transaction. Entities
+    changed again since are left alone and reported as failed. Undoing an
+    undo reapplies the operation it undid. The undo is journaled; its
+    operation_id is returned.
+    """
+    journal: OperationJournal = hass.data[DOMAIN][DATA_JOURNAL]
+    if "operation_id" in msg:
+        operation = journal.async_get(msg["operation_id"])
+    else:
+        operation = journal.async_latest()
+    if operation is None:
+        connection.send_error(msg["id"], "not_found", "No operation to undo")
+        return
+    if operation["undone_by"] is not None:
+        connection.send_error(
+            msg["id"], "already_undone", f"Operation {operation['id']} was already undone"
+        )
+        return
+
+    async def undo() -> dict[str, list]:
+        # Checked in the queue, against the registry the undo is applied to
+        inverse, skipped = journal.async_inverse(operation)
+        transaction = _registry_transaction(hass, atomic=True)
+        for entity_id, changes in inverse:
+            transaction.async_update(entity_id, **changes)
+        committed = await transaction.async_commit()
+        committed["failed"].extend(skipped)
+        return committed
+
+    # Both IDs of renamed entities are claimed
+    entity_ids = {
+        entity_id
+        for old_id, _, after in operation["changes"]
+        for entity_id in (old_id, after.get("entity_id", old_id))
+    }
+    try:
+        results = await _mutations(hass).async_run(entity_ids, undo)
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    connection.send_result(
+        msg["id"],
+        {
+            **_entity_id_results(results),
+            **_async_journal(hass, msg["type"], results, undoes=operation),
+        },
+    )
+
+
+@websocket_api.websocket_command({vol.Required("type"): "entity_manager/journal"})
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
+async def handle_journal(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request for the journaled operations, newest first."""
+    journal: OperationJournal = hass.data[DOMAIN][DATA_JOURNAL]
+    connection.send_result(msg["id"], {"operations": journal.async_operations()})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/profiler",
+        vol.Required("enabled"): bool,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_PROFILER)
+@metered_command
+async def handle_profiler(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request to start or stop counting state changes per entity."""
+    profiler: StateChangeProfiler = hass.data[DOMAIN][DATA_PROFILER]
+    profiler.async_set_enabled(msg["enabled"])
+    connection.send_result(msg["id"], {"enabled": profiler.enabled})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/hot_entities",
+        vol.Optional("limit", default=20): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=CAPACITY)
+        ),
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_INDEX, DATA_DEVICES, DATA_PROFILER)
+@metered_command
+async def handle_hot_entities(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request for the entities changing state most often.
 
-        for coll_id in collision_ids:
-            target_id = rename_map.pop(coll_id)
-            results["failed"].append(
-                {"entity_id": coll_id, "error": f"Target '{target_id}' already exists or conflicts"}
+    Counts cover the profiler's sliding window; error is how far a count may
+    be off. Entities carry their integration, device and area so they can be
+    disabled from the result; registered is false for entities without a
+    registry entry, which cannot be disabled.
+    """
+    profiler: StateChangeProfiler = hass.data[DOMAIN][DATA_PROFILER]
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+    window, events, top = profiler.async_top(msg["limit"])
+    minutes = max(window, 1) / 60
+
+    entities = []
+    for entity_id, count, error in top:
+        projection = index.entities.get(entity_id)
+        hot = {
+            "entity_id": entity_id,
+            "count": count,
+            "error": error,
+            "per_minute": round(count / minutes, 2),
+            "registered": projection is not None,
+            "platform": None,
+            "device_id": None,
+            "device": None,
+            "area": None,
+            "is_disabled": False,
+        }
+        if projection is not None:
+            device, _, area = devices.async_describe(
+                projection["device_id"], projection["area_id"]
+            )
+            hot.update(
+                platform=projection["platform"],
+                device_id=projection["device_id"],
+                device=device,
+                area=area,
+                is_disabled=projection["is_disabled"],
             )
+        entities.append(hot)
 
-        # Apply validated renames
-        for old_id, new_id in rename_map.items():
-            try:
-                entity_reg.async_update_entity(old_id, new_entity_id=new_id)
-                results["success"].append({"entity_id": old_id, "new_entity_id": new_id})
-            except Exception as err:
-                _LOGGER.error("Error renaming entity %s -> %s: %s", old_id, new_id, err)
-                results["failed"].append({"entity_id": old_id, "error": str(err)})
-
-    elif target == "name":
-        for entity_id in entity_ids:
-            try:
-                entity_entry = entity_reg.async_get(entity_id)
-                if entity_entry is None:
-                    results["failed"].append({"entity_id": entity_id, "error": "Entity not found"})
-                    continue
-
-                current_name = (
-                    entity_entry.name
-                    or entity_entry.original_name
-                    or entity_id.split(".", 1)[1].replace("_", " ")
+    connection.send_result(
+        msg["id"],
+        {
+            "enabled": profiler.enabled,
+            "window_seconds": round(window),
+            "events": events,
+            "entities": entities,
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/recorder_footprint",
+        vol.Optional("hours", default=24): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=24 * 365)
+        ),
+        vol.Optional("limit", default=100): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("refresh", default=False): bool,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_INDEX, DATA_DEVICES)
+@metered_command
+async def handle_recorder_footprint(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request for the recorder rows and bytes of entities.
+
+    Covers the states recorded in the last hours. Returns the limit
+    entities with the most bytes and the integration/device groups of the
+    panel with their totals, both largest first. Analyses are cached for a
+    few minutes; refresh=True measures again.
+    """
+    if "recorder" not in hass.config.components:
+        connection.send_error(msg["id"], "recorder_unavailable", "The recorder is not running")
+        return
+    footprint: RecorderFootprint = hass.data[DOMAIN][DATA_FOOTPRINT]
+    try:
+        measured_at, usage = await footprint.async_analyze(msg["hours"], msg["refresh"])
+    except SQLAlchemyError as err:
+        _LOGGER.error("Error analyzing the recorder database: %s", err)
+        connection.send_error(msg["id"], "query_failed", str(err))
+        return
+
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    groups: dict[str | None, dict[str, Any]] = {}
+    entities = []
+    for entity_id, (rows, size) in sorted(usage.items(), key=lambda item: -item[1][1]):
+        projection = index.entities.get(entity_id)
+        platform = projection["platform"] if projection else None
+        device_id = projection["device_id"] if projection else None
+        group = groups.setdefault(
+            platform, {"integration": platform, "rows": 0, "bytes": 0, "devices": {}}
+        )
+        device = group["devices"].setdefault(
+            device_id or NO_DEVICE,
+            {"device_id": device_id, "rows": 0, "bytes": 0, "entities": []},
+        )
+        for totals in (group, device):
+            totals["rows"] += rows
+            totals["bytes"] += size
+        device["entities"].append(entity_id)
+        if len(entities) < msg["limit"]:
+            entities.append(
+                {
+                    "entity_id": entity_id,
+                    "rows": rows,
+                    "bytes": size,
+                    "registered": projection is not None,
+                    "platform": platform,
+                    "device_id": device_id,
+                    "is_disabled": projection["is_disabled"] if projection else False,
+                }
+            )
+
+    connection.send_result(
+        msg["id"],
+        {
+            "hours": msg["hours"],
+            "measured_at": measured_at.isoformat(),
+            "rows": sum(rows for rows, _ in usage.values()),
+            "bytes": sum(size for _, size in usage.values()),
+            "entities": entities,
+            "groups": _embed_device_info(
+                hass, sorted(groups.values(), key=lambda group: -group["bytes"])
+            ),
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/export",
+        vol.Optional("format", default="ndjson"): vol.In(PLAN_FORMATS),
+        vol.Optional("state", default="all"): vol.In(["disabled", "enabled", "all"]),
+        vol.Optional("path"): str,
+        vol.Optional("chunk_size", default=MAX_CHUNK_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CHUNK_SIZE)
+        ),
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_INDEX, DATA_DEVICES)
+@metered_command
+async def handle_export(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream the entity registry as an NDJSON or CSV plan.
+
+    Entities are read from the entity index in listing order, chunk_size at
+    a time, yielding to the event loop between chunks. Every chunk is sent
+    as an event with the text under data, or, with path, written to that
+    new file in the configuration directory; an existing file is left alone
+    and already_exists returned. The last event has finished set and the
+    number of rows. Unsubscribing stops the export.
+    """
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    devices: DeviceLookup = hass.data[DOMAIN][DATA_DEVICES]
+    fmt = msg["format"]
+    plan: IO[str] | None = None
+    try:
+        path = plan_path(hass, msg["path"]) if "path" in msg else None
+        if path is not None:
+            plan = await hass.async_add_executor_job(_open_plan, path)
+    except PlanError as err:
+        connection.send_error(msg["id"], "invalid_path", str(err))
+        return
+    except FileExistsError:
+        connection.send_error(msg["id"], "already_exists", f"{msg['path']} already exists")
+        return
+    except OSError as err:
+        connection.send_error(msg["id"], "invalid_path", str(err))
+        return
+
+    async def run_export() -> None:
+        try:
+            rows = 0
+            after: SortKey | None = None
+            while True:
+                page, after = index.async_page(msg["state"], after, msg["chunk_size"])
+                text = encode_rows(
+                    [async_export_row(devices, projection) for projection in page],
+                    fmt,
+                    header=rows == 0,
+                )
+                rows += len(page)
+                if plan is None:
+                    connection.send_message(
+                        websocket_api.event_message(msg["id"], {"data": text, "rows": rows})
+                    )
+                else:
+                    await hass.async_add_executor_job(plan.write, text)
+                if after is None:
+                    break
+                await asyncio.sleep(0)
+        except OSError as err:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {"finished": True, "rows": rows, "error": str(err)}
                 )
-                if find_str not in current_name:
-                    results["skipped"].append(entity_id)
-                    continue
-                new_name = current_name.replace(find_str, replace_str)
-                entity_reg.async_update_entity(entity_id, name=new_name)
-                results["success"].append({"entity_id": entity_id, "old_name": current_name, "new_name": new_name})
+            )
+            return
+        finally:
+            if plan is not None:
+                await hass.async_add_executor_job(plan.close)
+        finished: dict[str, Any] = {"finished": True, "rows": rows}
+        if path is not None:
+            finished["path"] = path
+        connection.send_message(websocket_api.event_message(msg["id"], finished))
 
-            except Exception as err:
-                _LOGGER.error("Error renaming entity %s: %s", entity_id, err)
-                results["failed"].append({"entity_id": entity_id, "error": str(err)})
+    _async_start_job(hass, connection, msg, run_export(), "entity_manager export")
 
-    connection.send_result(msg["id"], results)
+
+def _open_plan(path: str) -> IO[str]:
+    """Create a new plan file to export to; runs in the executor."""
+    return open(path, "x", encoding="utf-8", newline="")
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/import",
+        vol.Required("path"): str,
+        vol.Optional("format"): vol.In(PLAN_FORMATS),
+        vol.Optional("dry_run", default=False): bool,
+        vol.Optional("chunk_size", default=DEFAULT_CHUNK_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CHUNK_SIZE)
+        ),
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_INDEX)
+@metered_command
+async def handle_import(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Apply an NDJSON or CSV plan file from the configuration directory.
+
+    Rows name an entity_id and any of disabled_by (empty or user), an
+    enable/disable action, name and new_entity_id; other columns, like
+    those of an export, are ignored. The file is read chunk_size rows at a
+    time, so memory stays constant however long it is. Each chunk is
+    validated against the entity index and applied in one transaction
+    through the mutation queue; dry_run only validates. Renames are checked
+    like a bulk rename's: a row whose new_entity_id is in use or claimed by
+    an earlier row is invalid, and chains and swaps are applied in order.
+
+    After the result, an event per chunk reports every row's line,
+    entity_id and result (applied, unchanged, valid, invalid or failed,
+    with the error) plus running totals. The last event has finished set,
+    and an error when the rest of the file could not be read. Unsubscribing
+    stops the import between chunks. Imports are not journaled; an export
+    taken first restores the previous state.
+    """
+    index: EntityIndex = hass.data[DOMAIN][DATA_INDEX]
+    try:
+        path = plan_path(hass, msg["path"])
+        reader = await hass.async_add_executor_job(
+            PlanReader, path, plan_format(path, msg.get("format"))
+        )
+    except PlanError as err:
+        connection.send_error(msg["id"], "invalid_plan", str(err))
+        return
+
+    totals = dict.fromkeys(("applied", "unchanged", "valid", "invalid", "failed"), 0)
+
+    async def run_import() -> None:
+        try:
+            while rows := await hass.async_add_executor_job(reader.read, msg["chunk_size"]):
+                report = await _async_import_chunk(hass, index, rows, msg["dry_run"])
+                for row in report:
+                    totals[row["result"]] += 1
+                connection.send_message(
+                    websocket_api.event_message(msg["id"], {"rows": report, **totals})
+                )
+        except PlanError as err:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {"rows": [], **totals, "finished": True, "error": str(err)}
+                )
+            )
+            return
+        finally:
+            await hass.async_add_executor_job(reader.close)
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"rows": [], **totals, "finished": True})
+        )
+
+    _async_start_job(hass, connection, msg, run_import(), "entity_manager import")
+
+
+async def _async_import_chunk(
+    hass: HomeAssistant,
+    index: EntityIndex,
+    rows: list[tuple[int, dict[str, Any] | None, str | None]],
+    dry_run: bool,
+) -> list[dict[str, Any]]:
+    """Validate and apply one chunk of plan rows; return their report."""
+    report: list[dict[str, Any]] = []
+    # entity_id -> report entry and changes of the rows to apply
+    planned: dict[str, tuple[dict[str, Any], dict[str, Any]]] = {}
+    for line, row, error in rows:
+        entity_id = (row or {}).get("entity_id")
+        entry: dict[str, Any] = {
+            "line": line,
+            "entity_id": entity_id if isinstance(entity_id, str) else None,
+        }
+        report.append(entry)
+        if error is None:
+            try:
+                entity_id, changes = async_plan_changes(index, row)
+            except PlanError as err:
+                error = str(err)
+            else:
+                if entity_id in planned:
+                    error = f"Entity also planned on line {planned[entity_id][0]['line']}"
+        if error is not None:
+            entry.update(result="invalid", error=error)
+        elif not changes:
+            entry["result"] = "unchanged"
+        else:
+            planned[entity_id] = (entry, changes)
+
+    if dry_run:
+        _plan_import_renames(hass, planned)
+        for entry, _ in planned.values():
+            entry["result"] = "valid"
+        return report
+    if not planned:
+        return report
+
+    async def apply() -> None:
+        # Planned in the queue, so renames are checked against the registry
+        # they are applied to
+        order = _plan_import_renames(hass, planned)
+        # Cycles are applied through temporary IDs; roll back rather than
+        # leave an entity parked on one
+        transaction = _registry_transaction(hass, atomic=bool(order.temporary))
+        for entity_id, (_, changes) in planned.items():
+            if "new_entity_id" not in changes:
+                transaction.async_update(entity_id, **changes)
+        for old_id, new_id in order.steps:
+            # A row's other changes go with the first step of its rename
+            changes = planned[old_id][1] if old_id in planned else {}
+            transaction.async_update(old_id, **{**changes, "new_entity_id": new_id})
+        if not transaction:
+            return
+        results = await transaction.async_commit()
+
+        def row_entry(entity_id: str) -> dict[str, Any]:
+            return planned[order.temporary.get(entity_id, entity_id)][0]
+
+        for record in results["success"]:
+            row_entry(record["entity_id"])["result"] = "applied"
+        for failure in results["failed"]:
+            # A rolled-back cycle reports an entity twice; keep the first error
+            if (entry := row_entry(failure["entity_id"])).get("result") != "failed":
+                entry.update(result="failed", error=failure["error"])
+
+    claimed = {
+        entity_id
+        for old_id, (_, changes) in planned.items()
+        for entity_id in (old_id, changes.get("new_entity_id", old_id))
+    }
+    try:
+        await _mutations(hass).async_run(claimed, apply)
+    except MutationRejected as err:
+        for entry, _ in planned.values():
+            entry.update(result="failed", error=str(err))
+    return report
+
+
+def _plan_import_renames(
+    hass: HomeAssistant, planned: dict[str, tuple[dict[str, Any], dict[str, Any]]]
+) -> RenamePlan:
+    """Order the renames of planned rows; drop colliding rows as invalid.
+
+    Targets are checked like a bulk rename's: against the entity IDs in
+    use and against each other.
+    """
+    order = RenamePlan(
+        {
+            entity_id: changes["new_entity_id"]
+            for entity_id, (_, changes) in planned.items()
+            if "new_entity_id" in changes
+        },
+        async_taken_entity_ids(hass),
+    )
+    for entity_id, error in order.collisions.items():
+        entry, _ = planned.pop(entity_id)
+        entry.update(result="invalid", error=error)
+    return order
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/auto_disable_rules",
+        vol.Optional("rules"): [RULE_SCHEMA],
+    }
+)
+@websocket_api.require_admin
+@ready_command()
+@metered_command
+@callback
+def handle_auto_disable_rules(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request for the auto-disable rules, replacing them when rules is given.
+
+    Also returns how many new entities the rules disabled since setup.
+    """
+    auto_disable: AutoDisabler = hass.data[DOMAIN][DATA_AUTO_DISABLE]
+    if "rules" in msg:
+        try:
+            auto_disable.async_set_rules(msg["rules"])
+        except AutoDisableRuleError as err:
+            connection.send_error(msg["id"], "invalid_rule", str(err))
+            return
+    connection.send_result(
+        msg["id"], {"rules": auto_disable.matcher.rules, "disabled": auto_disable.disabled}
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/apply_auto_disable_rules",
+        vol.Optional("rules"): [RULE_SCHEMA],
+        vol.Optional("dry_run", default=False): bool,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+@ready_command(DATA_JOURNAL)
+@metered_command
+async def handle_apply_auto_disable_rules(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a request to disable the existing entities matching auto-disable rules.
+
+    Uses the stored rules unless rules is given. Every enabled entity is
+    matched, and the matches are disabled in one transaction through the
+    mutation queue and journaled as one operation. dry_run only reports
+    the matches.
+    """
+    auto_disable: AutoDisabler = hass.data[DOMAIN][DATA_AUTO_DISABLE]
+    matcher = auto_disable.matcher
+    if "rules" in msg:
+        try:
+            matcher = RuleMatcher(msg["rules"])
+        except AutoDisableRuleError as err:
+            connection.send_error(msg["id"], "invalid_rule", str(err))
+            return
+    matches = auto_disable.async_matching(matcher, er.async_get(hass).entities.values())
+    matched = [{"entity_id": entity_id, "rule": rule} for entity_id, rule in matches]
+    if msg["dry_run"]:
+        connection.send_result(msg["id"], {"matched": matched})
+        return
+    entity_ids = [entity_id for entity_id, _ in matches]
+    transaction = _disabled_by_transaction(hass, "disable", entity_ids)
+    try:
+        results = await _mutations(hass).async_run(entity_ids, transaction.async_commit)
+    except MutationRejected as err:
+        connection.send_error(msg["id"], err.code, str(err))
+        return
+    connection.send_result(
+        msg["id"],
+        {
+            "matched": matched,
+            **_entity_id_results(results),
+            **_async_journal(hass, msg["type"], results),
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_manager/stats",
+        vol.Optional("reset", default=False): bool,
+    }
+)
+@websocket_api.require_admin
+@ready_command()
+@callback
+def handle_stats(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle a metrics request.
+
+    Returns call counts, errors, latency percentiles and histogram, event
+    loop blocking time (of @callback commands), entities addressed and
+    payload bytes per command, service and intent, plus their totals, the
+    shared read hit counts and the pending mutations, and the setup time
+    and deferred build stages.
+    reset=True clears the counters after the snapshot is taken.
+    """
+    metrics: Metrics = hass.data[DOMAIN][DATA_METRICS]
+    reads: SharedReads = hass.data[DOMAIN][DATA_READS]
+    mutations: MutationQueue = hass.data[DOMAIN][DATA_MUTATIONS]
+    startup: StagedStartup = hass.data[DOMAIN][DATA_STARTUP]
+    connection.send_result(
+        msg["id"],
+        {
+            **metrics.async_snapshot(),
+            "shared_reads": {"hits": reads.hits, "misses": reads.misses},
+            "mutations": mutations.async_status(),
+            "startup": startup.async_report(),
+        },
+    )
+    if msg["reset"]:
+        metrics.async_reset()
+        reads.hits = reads.misses = 0